@@ -767,10 +767,11 @@ class RealtimeAnalysisWidget:
 class UICustomizer:
     """UI 커스터마이징 설정"""
 
-    def __init__(self, root, db, user_id):
+    def __init__(self, root, db, user_id, settings=None):
         self.root = root
         self.db = db
         self.user_id = user_id
+        self.settings = settings  # UserSettings (있으면 지연 저장)
 
         self.window = tk.Toplevel(root)
         self.window.title("UI 커스터마이징")
@@ -810,7 +811,7 @@ class UICustomizer:
             bg='white'
         ).pack(side=tk.LEFT, padx=20, pady=10)
 
-        font_size_var = tk.IntVar(value=12)
+        font_size_var = tk.IntVar(value=self.settings.get('font_size') if self.settings else 12)
         tk.Scale(
             font_frame,
             from_=10,
@@ -862,6 +863,9 @@ class UICustomizer:
 
     def apply_settings(self, font_size):
         """설정 적용"""
-        self.db.update_user_settings(self.user_id, font_size=font_size)
+        if self.settings:
+            self.settings.set(font_size=font_size)
+        else:
+            self.db.update_user_settings(self.user_id, font_size=font_size)
         messagebox.showinfo("적용 완료", "설정이 적용되었습니다!\n재시작 후 적용됩니다.")
         self.window.destroy()
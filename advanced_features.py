@@ -194,7 +194,7 @@ class ThemeManager:
 class ThemeSelectorDialog:
     """테마 선택 다이얼로그"""
 
-    def __init__(self, parent, database, user_id, callback=None):
+    def __init__(self, parent, database, user_id, callback=None, settings=None):
         self.window = tk.Toplevel(parent)
         self.window.title("테마 선택")
         self.window.geometry("500x600")
@@ -205,6 +205,7 @@ class ThemeSelectorDialog:
         self.db = database
         self.user_id = user_id
         self.callback = callback
+        self.settings = settings  # UserSettings (있으면 지연 저장)
 
         self.create_widgets()
 
@@ -254,7 +255,9 @@ class ThemeSelectorDialog:
 
     def select_theme(self, theme_name):
         """테마 선택"""
-        if self.user_id:
+        if self.settings:
+            self.settings.set(theme=theme_name)
+        elif self.user_id:
             self.db.update_theme(self.user_id, theme_name)
 
         if self.callback:
@@ -267,6 +270,9 @@ class ThemeSelectorDialog:
 class CustomPracticeMode(BasePractice):
     """사용자 정의 연습 모드"""
 
+    # 한 번 연습할 때 리스트에서 무작위로 뽑는 최대 단어 수
+    PRACTICE_WORD_COUNT = 100
+
     def __init__(self, parent, database, user_id):
         self.db = database
         self.user_id = user_id
@@ -355,7 +361,7 @@ class CustomPracticeMode(BasePractice):
         self.lists_listbox.delete(0, tk.END)
 
         for lst in self.custom_lists:
-            self.lists_listbox.insert(tk.END, f"{lst['list_name']} ({len(lst['words'])}개 단어)")
+            self.lists_listbox.insert(tk.END, f"{lst['list_name']} ({lst['word_count']:,}개 단어)")
 
     def create_word_list(self):
         """새 단어 리스트 생성"""
@@ -407,8 +413,13 @@ class CustomPracticeMode(BasePractice):
             return
 
         idx = selection[0]
-        self.current_word_list = self.custom_lists[idx]['words']
-        random.shuffle(self.current_word_list)
+        # 전체 리스트를 읽지 않고 연습할 단어만 무작위로 뽑음
+        self.current_word_list = self.db.sample_custom_words(
+            self.custom_lists[idx]['list_id'], self.PRACTICE_WORD_COUNT
+        )
+        if not self.current_word_list:
+            messagebox.showerror("오류", "리스트에 단어가 없습니다.")
+            return
 
         self.current_word_index = 0
         self.typed_chars = 0
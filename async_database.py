@@ -0,0 +1,120 @@
+"""
+비동기 데이터베이스 모듈
+DB 작업을 전용 작업 스레드에서 실행하고, 결과 콜백을 Tk 이벤트 루프에서 호출한다.
+기존 Database의 동기 API는 그대로 두고, 창마다 필요한 메서드만 골라 비동기로 호출한다.
+"""
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class AsyncDatabase:
+    """Tk 메인 스레드용 Database 비동기 실행기
+
+    요청은 큐를 거쳐 하나의 작업 스레드에서 순서대로 실행된다.
+    완료된 요청은 root.after 폴링으로 Tk 스레드에서 callback/errback 을 호출한다.
+    폴링은 대기 중인 요청이 있을 때만 예약된다.
+    """
+
+    def __init__(self, db, root, poll_interval=20):
+        """
+        Args:
+            db: Database 인스턴스
+            root: 콜백을 실행할 Tk 위젯 (after 사용)
+            poll_interval: 완료 확인 주기 (ms)
+        """
+        self.db = db
+        self.root = root
+        self.poll_interval = poll_interval
+
+        self._requests = queue.Queue()
+        self._completions = queue.Queue()
+        self._pending = 0
+        self._polling = False
+        self._closed = False
+
+        self._worker = threading.Thread(target=self._run, name='db-worker', daemon=True)
+        self._worker.start()
+
+    def call(self, method_name, *args, callback=None, errback=None, **kwargs):
+        """Database 메서드를 작업 스레드에서 호출 (Future 반환)
+
+        Args:
+            method_name: Database 메서드 이름
+            callback: 성공 시 결과를 인자로 Tk 스레드에서 호출
+            errback: 실패 시 예외를 인자로 Tk 스레드에서 호출
+        """
+        return self.submit(getattr(self.db, method_name), *args,
+                           callback=callback, errback=errback, **kwargs)
+
+    def submit(self, func, *args, callback=None, errback=None, **kwargs):
+        """임의의 함수를 작업 스레드에서 실행 (여러 조회를 묶을 때 사용, Tk 스레드에서 호출)"""
+        if self._closed:
+            raise RuntimeError("비동기 DB 실행기가 이미 종료되었습니다")
+
+        future = Future()
+        self._requests.put((future, func, args, kwargs, callback, errback))
+        self._pending += 1
+        self._schedule_poll()
+        return future
+
+    def close(self, timeout=5.0):
+        """남은 요청을 처리한 뒤 작업 스레드 종료"""
+        if self._closed:
+            return
+        self._closed = True
+        self._requests.put(None)
+        self._worker.join(timeout)
+
+    def _run(self):
+        """작업 스레드: 요청을 순서대로 실행"""
+        while True:
+            item = self._requests.get()
+            if item is None:
+                break
+
+            future, func, args, kwargs, _, _ = item
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+
+            self._completions.put(item)
+
+    def _schedule_poll(self):
+        """완료 확인 예약 (이미 예약되어 있으면 무시)"""
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """완료된 요청의 콜백을 Tk 스레드에서 실행"""
+        self._polling = False
+
+        while True:
+            try:
+                future, _, _, _, callback, errback = self._completions.get_nowait()
+            except queue.Empty:
+                break
+
+            self._pending -= 1
+            if future.cancelled():
+                continue
+
+            error = future.exception()
+            try:
+                if error is not None:
+                    if errback:
+                        errback(error)
+                    else:
+                        print(f"DB 비동기 작업 오류: {error}")
+                elif callback:
+                    callback(future.result())
+            except Exception as e:
+                print(f"DB 콜백 오류: {e}")
+
+        if self._pending:
+            self._schedule_poll()
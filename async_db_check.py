@@ -0,0 +1,115 @@
+"""
+비동기 DB 실행기 점검 도구
+작업 스레드의 SQLite 연결에 500ms 지연을 주입한 뒤,
+조회가 끝날 때까지 Tk 이벤트 루프가 계속 이벤트를 처리하는지 확인한다.
+
+사용법:
+    python async_db_check.py
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+import tkinter as tk
+
+from database import Database
+from async_database import AsyncDatabase
+
+
+DELAY = 0.5          # 주입할 SQLite 지연 (초)
+TICK_MS = 10         # 이벤트 루프 확인 주기
+MAX_GAP = 0.1        # 허용하는 최대 이벤트 간격 (초)
+
+
+def inject_delay(db, seconds):
+    """현재 스레드 연결의 SELECT 문마다 지연 주입 (작업 스레드에서 호출)"""
+    def slow_trace(sql):
+        if sql.lstrip().upper().startswith('SELECT'):
+            time.sleep(seconds)
+    db.get_connection().set_trace_callback(slow_trace)
+
+
+def create_root():
+    """Tk 루트 생성 (디스플레이가 없으면 Tcl 인터프리터로 이벤트 루프만 사용)"""
+    try:
+        root = tk.Tk()
+        root.withdraw()
+        return root
+    except tk.TclError:
+        return tk.Tcl()
+
+
+def run_check(db):
+    """지연된 조회 중 이벤트 루프 간격 측정"""
+    root = create_root()
+    async_db = AsyncDatabase(db, root, poll_interval=TICK_MS)
+    ticks = []
+    state = {'done': False, 'result': None, 'thread': None, 'finished_at': None}
+
+    def tick():
+        ticks.append(time.perf_counter())
+        if not state['done']:
+            root.after(TICK_MS, tick)
+
+    def on_done(result):
+        state.update(done=True, result=result, thread=threading.current_thread(),
+                     finished_at=time.perf_counter())
+
+    def on_error(error):
+        state.update(done=True, result=error, thread=threading.current_thread(),
+                     finished_at=time.perf_counter())
+
+    async_db.submit(inject_delay, db, DELAY).result()
+    started_at = time.perf_counter()
+    async_db.call('get_leaderboard', None, 10, callback=on_done, errback=on_error)
+    root.after(TICK_MS, tick)
+
+    while not state['done']:
+        root.tk.dooneevent(0)
+
+    async_db.close()
+
+    gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+    return {
+        'elapsed': state['finished_at'] - started_at,
+        'ticks': len(ticks),
+        'max_gap': max(gaps) if gaps else float('inf'),
+        'result': state['result'],
+        'main_thread': state['thread'] is threading.main_thread()
+    }
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, 'async_check.db'))
+        try:
+            db.create_user('alice', 'pw')
+            report = run_check(db)
+        finally:
+            db.close()
+
+    print(f"조회 완료까지: {report['elapsed'] * 1000:.0f}ms (주입 지연 {DELAY * 1000:.0f}ms)")
+    print(f"처리된 이벤트: {report['ticks']}회, 최대 간격 {report['max_gap'] * 1000:.1f}ms")
+    print(f"콜백 실행 스레드: {'메인' if report['main_thread'] else '다른 스레드'}")
+
+    failures = []
+    if isinstance(report['result'], BaseException):
+        failures.append(f"조회 실패: {report['result']}")
+    if report['elapsed'] < DELAY:
+        failures.append("지연이 주입되지 않았습니다")
+    if report['max_gap'] > MAX_GAP:
+        failures.append(f"이벤트 루프가 {report['max_gap'] * 1000:.0f}ms 동안 멈췄습니다")
+    if not report['main_thread']:
+        failures.append("콜백이 Tk 스레드에서 실행되지 않았습니다")
+
+    for failure in failures:
+        print(f"[실패] {failure}")
+    if failures:
+        return 1
+    print("통과: 지연된 조회 중에도 이벤트 루프가 계속 동작")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
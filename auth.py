@@ -18,7 +18,7 @@ class AuthScreen:
         """
         self.root = root
         self.on_login_success = on_login_success
-        self.db = Database()
+        self.db = Database(use_daemon=True)
 
         # 폰트 설정
         self.title_font = font.Font(family="맑은 고딕", size=20, weight="bold")
@@ -0,0 +1,148 @@
+"""
+온라인 백업 점검 도구
+연습 기록이 계속 저장되는 DB 를 백업하면서 쓰기 커밋 지연을 측정해
+백업이 쓰기를 얼마나 멈추게 하는지 (백업 전 구간 대비 최대 지연) 보고하고,
+만든 백업의 검사와 복원, 손상된 백업 거부가 되는지 확인한다.
+
+사용법:
+    python backup_check.py [--records 200000] [--pages 256] [--think-ms 5] [--max-pause-ms 100]
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from database import Database
+from db_backup import BackupJob, restore_backup, verify_backup
+from db_benchmark import RECORDS_PER_USER, generate_database
+
+
+BASELINE_SECONDS = 1.0
+
+
+def percentile(sorted_values, q):
+    """정렬된 값의 분위수 (최근접 순위)"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class Writer(threading.Thread):
+    """연습 종료 작업을 쉬지 않고 반복하며 커밋 지연 시간 기록"""
+
+    def __init__(self, db, user_id, think_time):
+        super().__init__(name='backup-check-writer', daemon=True)
+        self.db = db
+        self.user_id = user_id
+        self.think_time = think_time
+        self.samples = []   # (시작 시각, 지연 시간)
+        self.running = True
+
+    def run(self):
+        while self.running:
+            start = time.perf_counter()
+            self.db.finalize_session(self.user_id, {
+                'mode_name': '낱말 연습', 'score': 100, 'accuracy': 95.0, 'speed': 300, 'practice_time': 1
+            })
+            self.samples.append((start, time.perf_counter() - start))
+            time.sleep(self.think_time)
+
+    def window(self, start, end):
+        """구간 안에서 시작한 커밋의 지연 시간 (ms, 정렬)"""
+        return sorted(latency * 1000 for at, latency in self.samples if start <= at < end)
+
+
+def count_records(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute('SELECT COUNT(*) FROM practice_records').fetchone()[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="온라인 백업 점검")
+    parser.add_argument('--records', type=int, default=200000, help="미리 채울 연습 기록 수")
+    parser.add_argument('--pages', type=int, default=256, help="백업 한 단계에 복사할 페이지 수")
+    parser.add_argument('--think-ms', type=float, default=5, help="쓰기 사이 간격 (ms)")
+    parser.add_argument('--max-pause-ms', type=float, default=100,
+                        help="허용하는 백업 중 최대 커밋 지연 증가 (ms)")
+    args = parser.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'backup_check.db')
+        backup_dir = os.path.join(tmp_dir, 'backups')
+        db = Database(db_path)
+        try:
+            generate_database(db, max(50, args.records // RECORDS_PER_USER), args.records)
+            db.get_connection().execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+            writer = Writer(db, 1, args.think_ms / 1000)
+            writer.start()
+            time.sleep(BASELINE_SECONDS)
+            backup_start = time.perf_counter()
+            report = BackupJob(db, backup_dir, pages_per_step=args.pages).run()
+            backup_end = time.perf_counter()
+            time.sleep(0.2)
+            writer.running = False
+            writer.join()
+
+            baseline = writer.window(backup_start - BASELINE_SECONDS, backup_start)
+            during = writer.window(backup_start, backup_end)
+            pause = max(0.0, (during[-1] if during else 0.0) - (baseline[-1] if baseline else 0.0))
+
+            print(f"백업: {report['pages']:,}페이지 ({report['size']:,}바이트), {report['steps']}단계, "
+                  f"{report['elapsed']:.2f}초, 최대 단계 {report['max_step_ms']:.1f}ms, "
+                  f"{'스냅샷 고정' if report['snapshot'] else '단계별 잠금'}, 다시 시작 {report['restarts']}회")
+            print(f"백업 전 커밋 {len(baseline)}건: p50 {percentile(baseline, 0.5):.1f} / "
+                  f"p99 {percentile(baseline, 0.99):.1f} / 최대 {baseline[-1] if baseline else 0:.1f} ms")
+            print(f"백업 중 커밋 {len(during)}건: p50 {percentile(during, 0.5):.1f} / "
+                  f"p99 {percentile(during, 0.99):.1f} / 최대 {during[-1] if during else 0:.1f} ms")
+            print(f"백업으로 늘어난 최대 쓰기 지연: {pause:.1f}ms")
+            if pause > args.max_pause_ms:
+                failures.append(f"최대 쓰기 지연 증가 {pause:.1f}ms 가 기준 {args.max_pause_ms:.0f}ms 를 넘었습니다")
+            if not during:
+                failures.append("백업 중 커밋된 쓰기가 없습니다 (쓰기가 막혔을 수 있음)")
+
+            problems = verify_backup(report['path'])
+            if problems:
+                failures.append(f"백업 파일 검사 실패: {problems[0]}")
+            backup_records = count_records(report['path'])
+
+            # 손상된 백업은 복원하지 않아야 함
+            damaged_path = os.path.join(tmp_dir, 'damaged.db')
+            shutil.copyfile(report['path'], damaged_path)
+            with open(damaged_path, 'r+b') as f:
+                f.seek(report['size'] // 2)
+                f.write(b'\xff' * 4096)
+            live_records = count_records(db_path)
+            try:
+                restore_backup(db, damaged_path)
+                failures.append("손상된 백업이 복원되었습니다")
+            except ValueError:
+                if count_records(db_path) != live_records:
+                    failures.append("손상된 백업 복원 시도 후 DB 가 바뀌었습니다")
+
+            result = restore_backup(db, report['path'])
+            restored = count_records(db_path)
+            print(f"복원: 연습 기록 {live_records:,}건 -> {restored:,}건 "
+                  f"(백업 시점 {backup_records:,}건), 복원 전 백업 {os.path.basename(result['safety_backup'])}")
+            if restored != backup_records:
+                failures.append(f"복원 후 기록 수 {restored:,} 가 백업 {backup_records:,} 와 다릅니다")
+            if db.get_user_info(1) is None:
+                failures.append("복원 후 사용자 조회 실패")
+        finally:
+            db.close()
+
+    for failure in failures:
+        print(f"[실패] {failure}")
+    if failures:
+        return 1
+    print("통과: 백업 중에도 쓰기 계속, 손상된 백업 거부, 복원 정상")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+데이터베이스 데몬 분류 점검 도구
+데몬을 띄우고 새 사용자로 이름은 조회지만 행을 쓰는 메서드 (WRITE_METHODS: 기본 행을 처음 만드는 get_*,
+마지막 로그인을 기록하는 verify_user) 를 호출해, 모두 쓰기 스레드에서 처리되는지 (데몬 쓰기/읽기 수) 와
+만든 기본 행이 남는지 확인한다. 읽기 스레드 연결은 query_only 라 잘못 분류되면 오류가 난다.
+이어서 UserSettings.flush() 가 데몬을 거쳐 잠금 대기 없이 설정과 테마를 저장하는지 확인한다.
+
+사용법:
+    python daemon_check.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from database import Database
+from db_daemon import WRITE_METHODS, DatabaseDaemon, is_read_method
+from user_settings import UserSettings
+
+
+# 설정 저장이 이보다 오래 걸리면 잠금을 기다린 것으로 봄 (busy_timeout 5초보다 짧게)
+MAX_FLUSH_SECONDS = 2.0
+
+
+def call_write_methods(db, user_id, password):
+    """WRITE_METHODS 를 새 사용자로 한 번씩 호출"""
+    return {
+        'get_daily_goal': db.get_daily_goal(user_id),
+        'get_user_level': db.get_user_level(user_id),
+        'get_user_settings': db.get_user_settings(user_id),
+        'get_season_pass': db.get_season_pass(user_id),
+        'verify_user': db.verify_user('daemon_check', password),
+    }
+
+
+def check_settings_flush(db, user_id):
+    """데몬을 거쳐 설정을 바꾸고 flush() (문제 목록, 걸린 시간 반환)"""
+    settings = UserSettings(db, user_id)
+    settings.set(volume=70, theme='dark')
+    start = time.perf_counter()
+    try:
+        settings.flush()
+    except Exception as e:
+        return [f"설정 저장 실패: {e!r}"], time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+
+    problems = []
+    if elapsed > MAX_FLUSH_SECONDS:
+        problems.append(f"설정 저장에 {elapsed:.1f}초 걸렸습니다 (쓰기 잠금 대기)")
+    stored = (db.get_user_settings(user_id)['volume'], db.get_user_theme(user_id))
+    if stored != (70, 'dark'):
+        problems.append(f"저장된 설정이 다릅니다: 음량/테마 {stored}")
+    return problems, elapsed
+
+
+def created_rows(db_path, user_id):
+    """기본 행이 만들어졌는지 (테이블 -> 행 수)"""
+    db = Database(db_path)
+    try:
+        conn = db.get_connection()
+        return {
+            table: conn.execute(f'SELECT COUNT(*) FROM {table} WHERE user_id = ?', (user_id,)).fetchone()[0]
+            for table in ('daily_goals', 'user_levels', 'user_settings', 'season_pass')
+        }
+    finally:
+        db.close()
+
+
+def main():
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'daemon_check.db')
+        daemon = DatabaseDaemon(db_path)
+        daemon.start()
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+        client = Database(db_path, use_daemon=True)
+        try:
+            if client.daemon is None:
+                print("[실패] 데이터베이스 데몬에 연결하지 못했습니다")
+                return 1
+            _, user_id = client.create_user('daemon_check', 'pw')
+            before = daemon.stats()
+            try:
+                results = call_write_methods(client, user_id, 'pw')
+            except Exception as e:
+                failures.append(f"쓰는 메서드를 데몬에서 실행하지 못함: {e!r}")
+                results = {}
+            after = daemon.stats()
+            flush_problems, flush_seconds = check_settings_flush(client, user_id)
+        finally:
+            client.close()
+            daemon.shutdown()
+
+        writes = after['writes'] - before['writes']
+        reads = after['reads'] - before['reads']
+        print(f"호출 {len(WRITE_METHODS)}개: 쓰기 스레드 {writes}건, 읽기 스레드 {reads}건")
+        if results and (writes != len(WRITE_METHODS) or reads):
+            failures.append(f"쓰는 메서드가 읽기 스레드로 갔습니다 (쓰기 {writes}건, 읽기 {reads}건)")
+        if results and not results['verify_user'][0]:
+            failures.append("데몬을 거친 로그인 실패")
+
+        print(f"설정 저장 (flush): {flush_seconds * 1000:.1f}ms")
+        failures.extend(flush_problems)
+
+        rows = created_rows(db_path, user_id)
+        print(f"만들어진 기본 행: {rows}")
+        failures.extend(f"{table} 기본 행이 없습니다" for table, count in rows.items() if count != 1)
+
+    misrouted = sorted(name for name in WRITE_METHODS if is_read_method(name))
+    if misrouted:
+        failures.append(f"읽기로 분류된 쓰는 메서드: {', '.join(misrouted)}")
+
+    for failure in failures:
+        print(f"[실패] {failure}")
+    if failures:
+        return 1
+    print("통과: 기본 행을 만드는 조회와 설정 저장도 쓰기 스레드 한 곳에서 커밋")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
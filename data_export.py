@@ -0,0 +1,154 @@
+"""
+사용자 데이터 내보내기 모듈
+사용자별 테이블을 fetchmany 로 조금씩 읽어 zip 아카이브 안의 CSV 또는
+gzip JSON Lines 파일로 바로 쓴다. 기록이 얼마나 많든 메모리 사용량은 일정하다.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import zipfile
+from datetime import datetime
+
+
+# 내보낼 테이블: (파일 이름, user_id 하나를 받는 SELECT)
+EXPORT_TABLES = [
+    ('practice_records', '''
+        SELECT record_id, mode_name, score, accuracy, speed, practice_time, created_at
+        FROM practice_records
+        WHERE user_id = ?
+        ORDER BY created_at
+    '''),
+    ('high_scores', '''
+        SELECT mode_name, high_score, best_accuracy, best_speed, achieved_at
+        FROM high_scores
+        WHERE user_id = ?
+    '''),
+    ('key_statistics', '''
+        SELECT key_char, total_presses, correct_presses, incorrect_presses, avg_time, last_updated
+        FROM key_statistics
+        WHERE user_id = ?
+    '''),
+    ('finger_statistics', '''
+        SELECT finger_name, total_presses, correct_presses, avg_speed
+        FROM finger_statistics
+        WHERE user_id = ?
+    '''),
+    ('achievements', '''
+        SELECT achievement_name, achievement_description, achieved_at
+        FROM achievements
+        WHERE user_id = ?
+    '''),
+    ('daily_goals', '''
+        SELECT goal_date, target_time, target_score, achieved_time, achieved_score, completed
+        FROM daily_goals
+        WHERE user_id = ?
+    '''),
+    ('custom_word_lists', '''
+        SELECT list_id, list_name, word_count, total_chars, created_at
+        FROM custom_word_lists
+        WHERE user_id = ?
+        ORDER BY created_at
+    '''),
+    ('custom_words', '''
+        SELECT w.list_id, w.position, w.word
+        FROM custom_word_lists l
+        JOIN custom_words w ON w.list_id = l.list_id
+        WHERE l.user_id = ?
+        ORDER BY w.list_id, w.position
+    '''),
+    ('practice_passages', '''
+        SELECT passage_id, title, content, char_count, created_at
+        FROM practice_passages
+        WHERE user_id = ?
+        ORDER BY passage_id
+    '''),
+]
+
+FORMATS = ('csv', 'jsonl')
+
+
+def fetch_batches(cursor, batch_size=1000):
+    """실행된 커서의 결과를 batch_size 행씩 반환"""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def write_csv(archive, name, cursor, batch_size):
+    """커서 결과를 zip 안의 CSV 파일로 기록 (행 수 반환)"""
+    columns = [column[0] for column in cursor.description]
+    count = 0
+    with archive.open(name, 'w', force_zip64=True) as raw:
+        with io.TextIOWrapper(raw, encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for rows in fetch_batches(cursor, batch_size):
+                writer.writerows(tuple(row) for row in rows)
+                count += len(rows)
+    return count
+
+
+def write_jsonl_gz(archive, name, cursor, batch_size):
+    """커서 결과를 zip 안의 gzip JSON Lines 파일로 기록 (행 수 반환)"""
+    columns = [column[0] for column in cursor.description]
+    count = 0
+    # 이미 gzip 으로 압축하므로 zip 에는 압축 없이 저장
+    info = zipfile.ZipInfo(name, date_time=datetime.now().timetuple()[:6])
+    with archive.open(info, 'w', force_zip64=True) as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as gz:
+            with io.TextIOWrapper(gz, encoding='utf-8') as f:
+                for rows in fetch_batches(cursor, batch_size):
+                    f.writelines(
+                        json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n'
+                        for row in rows
+                    )
+                    count += len(rows)
+    return count
+
+
+def export_user_data(db, user_id, filepath, fmt='csv', batch_size=1000):
+    """사용자 데이터 전체를 zip 아카이브로 내보내기
+
+    모든 테이블을 한 읽기 트랜잭션에서 읽으므로 내보내는 동안 기록이 바뀌어도
+    테이블 사이의 내용이 어긋나지 않는다. 임시 파일에 쓴 뒤 완료되면 이름을 바꾼다.
+
+    Args:
+        fmt: 'csv' 또는 'jsonl' (gzip JSON Lines)
+
+    Returns:
+        {테이블 이름: 행 수}
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+
+    writer = write_csv if fmt == 'csv' else write_jsonl_gz
+    extension = '.csv' if fmt == 'csv' else '.jsonl.gz'
+    counts = {}
+    tmp_path = filepath + '.tmp'
+
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            with db.transaction() as cursor:
+                for name, sql in EXPORT_TABLES:
+                    cursor.execute(sql, (user_id,))
+                    counts[name] = writer(archive, name + extension, cursor, batch_size)
+
+            archive.writestr('manifest.json', json.dumps({
+                'user_id': user_id,
+                'format': fmt,
+                'schema_version': db.get_schema_version(),
+                'exported_at': datetime.now().isoformat(timespec='seconds'),
+                'tables': counts
+            }, ensure_ascii=False, indent=2))
+
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return counts
@@ -4,252 +4,1540 @@ SQLite를 사용한 사용자 정보 관리
 """
 import sqlite3
 import hashlib
+import itertools
+import random
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
-
-
-class Database:
-    """데이터베이스 관리 클래스"""
-
-    def __init__(self, db_name='typing_practice.db'):
-        """데이터베이스 초기화"""
-        self.db_name = db_name
-        self.init_database()
-
-    def get_connection(self):
-        """데이터베이스 연결 생성"""
-        conn = sqlite3.connect(self.db_name)
-        conn.row_factory = sqlite3.Row
-        return conn
-
-    def init_database(self):
-        """데이터베이스 테이블 초기화"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        # 사용자 테이블 생성
+from functools import wraps
+
+from db_client import DaemonClient, default_socket_path
+from db_instrumentation import Instrumentation
+from key_latency import bucket_index, latency_summary, merge_blobs, new_histogram, to_blob
+from keystroke_log import encode_events, iter_events
+
+
+# 업적 규칙: (지표, 기준값, 이름, 설명)
+# 지표 값이 기준값 이상이 되면 해제된다. 지표가 바뀌는 쓰기 메서드에서
+# 해당 지표의 규칙만 평가한다.
+ACHIEVEMENT_RULES = [
+    ('total_practice_time', 1, "첫 발자국", "첫 연습을 완료하였습니다"),
+    ('total_score', 1000, "타자 초보", "총 점수 1000점 달성"),
+    ('total_score', 10000, "타자 고수", "총 점수 10000점 달성"),
+    ('total_score', 50000, "타자 마스터", "총 점수 50000점 달성"),
+    ('total_practice_time', 60, "연습벌레", "총 1시간 이상 연습"),
+    ('total_practice_time', 600, "끈기왕", "총 10시간 이상 연습"),
+    ('login_streak', 7, "일주일 연속", "7일 연속 로그인"),
+    ('login_streak', 30, "한 달 연속", "30일 연속 로그인"),
+]
+
+
+# practice_records 에서 일별 집계 테이블을 한 번에 다시 채우는 SQL
+DAILY_STATS_BACKFILL_SQL = '''
+    INSERT INTO daily_user_stats
+    (user_id, stat_date, mode_name, session_count, score_sum, accuracy_sum, speed_sum, time_sum)
+    SELECT user_id, DATE(created_at), mode_name, COUNT(*), SUM(score),
+           SUM(accuracy), SUM(speed), SUM(practice_time)
+    FROM practice_records
+    GROUP BY user_id, DATE(created_at), mode_name
+'''
+
+# 정리(retention)되지 않은 날짜 이후만 다시 채우는 SQL (기준일 하나를 받음)
+DAILY_STATS_REBUILD_SQL = '''
+    INSERT INTO daily_user_stats
+    (user_id, stat_date, mode_name, session_count, score_sum, accuracy_sum, speed_sum, time_sum)
+    SELECT user_id, DATE(created_at), mode_name, COUNT(*), SUM(score),
+           SUM(accuracy), SUM(speed), SUM(practice_time)
+    FROM practice_records
+    WHERE created_at >= ?
+    GROUP BY user_id, DATE(created_at), mode_name
+'''
+
+# 원본 기록 수보다 집계된 세션 수가 적은 (사용자, 날짜, 모드) - created_at < 기준일 범위만
+UNCOVERED_DAILY_STATS_SQL = '''
+    SELECT r.user_id, r.stat_date, r.mode_name
+    FROM (
+        SELECT user_id, DATE(created_at) AS stat_date, mode_name, COUNT(*) AS sessions
+        FROM practice_records
+        WHERE created_at < ?
+        GROUP BY user_id, DATE(created_at), mode_name
+    ) AS r
+    LEFT JOIN daily_user_stats d
+        ON d.user_id = r.user_id AND d.stat_date = r.stat_date AND d.mode_name = r.mode_name
+    WHERE COALESCE(d.session_count, 0) < r.sessions
+'''
+
+
+# 파생 값을 유지하는 트리거 (마이그레이션 10)
+# users.total_score/total_practice_time = daily_user_stats 의 score_sum/time_sum 합계
+# high_scores = practice_records 의 모드별 최고값 (기록을 정리해도 최고 기록은 남음)
+# clans.total_members = clan_members 행 수, season_pass.tier = season_exp / 100
+DERIVED_TRIGGERS = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_daily_user_stats_insert
+    AFTER INSERT ON daily_user_stats
+    BEGIN
+        UPDATE users
+        SET total_score = total_score + NEW.score_sum,
+            total_practice_time = total_practice_time + NEW.time_sum
+        WHERE user_id = NEW.user_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_daily_user_stats_update
+    AFTER UPDATE OF score_sum, time_sum ON daily_user_stats
+    WHEN OLD.user_id = NEW.user_id
+    BEGIN
+        UPDATE users
+        SET total_score = total_score + NEW.score_sum - OLD.score_sum,
+            total_practice_time = total_practice_time + NEW.time_sum - OLD.time_sum
+        WHERE user_id = NEW.user_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_daily_user_stats_move
+    AFTER UPDATE OF user_id ON daily_user_stats
+    WHEN OLD.user_id IS NOT NEW.user_id
+    BEGIN
+        UPDATE users
+        SET total_score = total_score - OLD.score_sum,
+            total_practice_time = total_practice_time - OLD.time_sum
+        WHERE user_id = OLD.user_id;
+        UPDATE users
+        SET total_score = total_score + NEW.score_sum,
+            total_practice_time = total_practice_time + NEW.time_sum
+        WHERE user_id = NEW.user_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_daily_user_stats_delete
+    AFTER DELETE ON daily_user_stats
+    BEGIN
+        UPDATE users
+        SET total_score = total_score - OLD.score_sum,
+            total_practice_time = total_practice_time - OLD.time_sum
+        WHERE user_id = OLD.user_id;
+    END
+    ''',
+    # 새 사용자의 누적 값은 넘겨받은 값 대신 집계에서 계산
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_users_insert
+    AFTER INSERT ON users
+    BEGIN
+        UPDATE users
+        SET total_score = (SELECT COALESCE(SUM(score_sum), 0) FROM daily_user_stats
+                           WHERE user_id = NEW.user_id),
+            total_practice_time = (SELECT COALESCE(SUM(time_sum), 0) FROM daily_user_stats
+                                   WHERE user_id = NEW.user_id)
+        WHERE user_id = NEW.user_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_practice_records_insert
+    AFTER INSERT ON practice_records
+    BEGIN
+        INSERT INTO high_scores (user_id, mode_name, high_score, best_accuracy, best_speed, achieved_at)
+        VALUES (NEW.user_id, NEW.mode_name, NEW.score, NEW.accuracy, NEW.speed, NEW.created_at)
+        ON CONFLICT(user_id, mode_name)
+        DO UPDATE SET
+            high_score = MAX(high_score, excluded.high_score),
+            best_accuracy = MAX(best_accuracy, excluded.best_accuracy),
+            best_speed = MAX(best_speed, excluded.best_speed),
+            achieved_at = CASE
+                WHEN excluded.high_score > high_score THEN excluded.achieved_at
+                ELSE achieved_at
+            END;
+    END
+    ''',
+    # 새 클랜은 멤버 0명에서 시작하고 clan_members 트리거가 더함
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_clans_insert
+    AFTER INSERT ON clans
+    BEGIN
+        UPDATE clans
+        SET total_members = (SELECT COUNT(*) FROM clan_members WHERE clan_id = NEW.clan_id)
+        WHERE clan_id = NEW.clan_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_clan_members_insert
+    AFTER INSERT ON clan_members
+    BEGIN
+        UPDATE clans SET total_members = total_members + 1 WHERE clan_id = NEW.clan_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_clan_members_move
+    AFTER UPDATE OF clan_id ON clan_members
+    WHEN OLD.clan_id IS NOT NEW.clan_id
+    BEGIN
+        UPDATE clans SET total_members = total_members - 1 WHERE clan_id = OLD.clan_id;
+        UPDATE clans SET total_members = total_members + 1 WHERE clan_id = NEW.clan_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_clan_members_delete
+    AFTER DELETE ON clan_members
+    BEGIN
+        UPDATE clans SET total_members = total_members - 1 WHERE clan_id = OLD.clan_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_season_pass_insert
+    AFTER INSERT ON season_pass
+    WHEN NEW.tier IS NOT NEW.season_exp / 100
+    BEGIN
+        UPDATE season_pass SET tier = season_exp / 100 WHERE pass_id = NEW.pass_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_season_pass_update
+    AFTER UPDATE OF season_exp, tier ON season_pass
+    WHEN NEW.tier IS NOT NEW.season_exp / 100
+    BEGIN
+        UPDATE season_pass SET tier = season_exp / 100 WHERE pass_id = NEW.pass_id;
+    END
+    ''',
+]
+
+# 파생 값 점검/재계산: (이름, 어긋난 행을 찾는 SELECT, 바로잡는 문장 목록)
+# rebuild_derived 는 SELECT 결과를 temp.derived_drift 에 담은 뒤 바로잡는 문장을 실행한다.
+# 이름 있는 인자:
+#   :since  원본 기록이 남아 있는 첫 날짜 (정리한 적 없으면 '')
+#   :exact  정리된 기록이 없으면 1 - 최고 기록을 남은 기록만으로 계산하고 기록 없는 행은 삭제
+#           (0 이면 기록에서 계산한 값이 더 클 때만 올림)
+# 순서대로 실행하며, 일별 집계를 먼저 고쳐야 누적 값이 맞게 계산된다.
+DERIVED_VALUES = [
+    # 기록과 집계를 한 번에 묶어 비교 (expected_* 가 NULL 이면 기록 없는 집계 행)
+    # 정리 기준일 이전은 원본이 일부만 남으므로 원본이 집계보다 많은 (빠진) 경우만 찾음
+    ('daily_user_stats', '''
+        SELECT user_id, stat_date, mode_name,
+               SUM(CASE WHEN is_daily THEN sessions END) AS session_count,
+               SUM(CASE WHEN is_daily THEN score END) AS score_sum,
+               SUM(CASE WHEN is_daily THEN practice_time END) AS time_sum,
+               SUM(CASE WHEN NOT is_daily THEN sessions END) AS expected_sessions,
+               SUM(CASE WHEN NOT is_daily THEN score END) AS expected_score,
+               SUM(CASE WHEN NOT is_daily THEN accuracy END) AS expected_accuracy,
+               SUM(CASE WHEN NOT is_daily THEN speed END) AS expected_speed,
+               SUM(CASE WHEN NOT is_daily THEN practice_time END) AS expected_time
+        FROM (
+            SELECT user_id, DATE(created_at) AS stat_date, mode_name, 0 AS is_daily,
+                   1 AS sessions, score, accuracy, speed, practice_time
+            FROM practice_records
+            UNION ALL
+            SELECT user_id, stat_date, mode_name, 1, session_count, score_sum, accuracy_sum,
+                   speed_sum, time_sum
+            FROM daily_user_stats
+        )
+        GROUP BY user_id, stat_date, mode_name
+        HAVING CASE WHEN stat_date >= :since THEN
+                   session_count IS NOT expected_sessions
+                   OR score_sum IS NOT expected_score
+                   OR time_sum IS NOT expected_time
+                   OR SUM(CASE WHEN is_daily THEN speed END) IS NOT expected_speed
+                   OR ABS(SUM(CASE WHEN is_daily THEN accuracy END) - expected_accuracy) > 1e-6
+               ELSE expected_sessions > COALESCE(session_count, 0)
+               END
+    ''', ['''
+        INSERT INTO daily_user_stats
+        (user_id, stat_date, mode_name, session_count, score_sum, accuracy_sum, speed_sum, time_sum)
+        SELECT user_id, stat_date, mode_name, expected_sessions, expected_score,
+               expected_accuracy, expected_speed, expected_time
+        FROM temp.derived_drift
+        WHERE expected_sessions IS NOT NULL
+        ON CONFLICT(user_id, stat_date, mode_name)
+        DO UPDATE SET
+            session_count = excluded.session_count,
+            score_sum = excluded.score_sum,
+            accuracy_sum = excluded.accuracy_sum,
+            speed_sum = excluded.speed_sum,
+            time_sum = excluded.time_sum
+    ''', '''
+        DELETE FROM daily_user_stats
+        WHERE (user_id, stat_date, mode_name) IN (
+            SELECT user_id, stat_date, mode_name FROM temp.derived_drift
+            WHERE expected_sessions IS NULL
+        )
+    ''']),
+    ('users', '''
+        SELECT u.user_id, u.total_score, u.total_practice_time,
+               COALESCE(d.score_sum, 0) AS expected_score, COALESCE(d.time_sum, 0) AS expected_time
+        FROM users u
+        LEFT JOIN (
+            SELECT user_id, SUM(score_sum) AS score_sum, SUM(time_sum) AS time_sum
+            FROM daily_user_stats
+            GROUP BY user_id
+        ) d ON d.user_id = u.user_id
+        WHERE u.total_score IS NOT COALESCE(d.score_sum, 0)
+           OR u.total_practice_time IS NOT COALESCE(d.time_sum, 0)
+    ''', ['''
+        UPDATE users
+        SET total_score = drift.expected_score, total_practice_time = drift.expected_time
+        FROM temp.derived_drift AS drift
+        WHERE users.user_id = drift.user_id
+    ''']),
+    # 달성 시각은 최고 점수를 처음 기록한 시각 (어긋난 행만 계산, expected_* 가 NULL 이면 기록 없는 행)
+    ('high_scores', '''
+        SELECT e.user_id, e.mode_name, h.high_score, h.best_accuracy, h.best_speed,
+               CASE WHEN :exact OR h.user_id IS NULL THEN e.high_score
+                    ELSE MAX(h.high_score, e.high_score) END AS expected_high_score,
+               CASE WHEN :exact OR h.user_id IS NULL THEN e.best_accuracy
+                    ELSE MAX(h.best_accuracy, e.best_accuracy) END AS expected_accuracy,
+               CASE WHEN :exact OR h.user_id IS NULL THEN e.best_speed
+                    ELSE MAX(h.best_speed, e.best_speed) END AS expected_speed,
+               CASE WHEN h.user_id IS NULL OR e.high_score > h.high_score
+                         OR (:exact AND e.high_score < h.high_score)
+                    THEN (SELECT MIN(created_at) FROM practice_records p
+                          WHERE p.user_id = e.user_id AND p.mode_name = e.mode_name
+                            AND p.score = e.high_score)
+                    ELSE h.achieved_at END AS expected_achieved_at
+        FROM (
+            SELECT user_id, mode_name, MAX(score) AS high_score,
+                   MAX(accuracy) AS best_accuracy, MAX(speed) AS best_speed
+            FROM practice_records
+            GROUP BY user_id, mode_name
+        ) e
+        LEFT JOIN high_scores h ON h.user_id = e.user_id AND h.mode_name = e.mode_name
+        WHERE h.user_id IS NULL
+           OR CASE WHEN :exact
+                   THEN e.high_score IS NOT h.high_score OR e.best_accuracy IS NOT h.best_accuracy
+                        OR e.best_speed IS NOT h.best_speed
+                   ELSE e.high_score > h.high_score OR e.best_accuracy > h.best_accuracy
+                        OR e.best_speed > h.best_speed
+              END
+        UNION ALL
+        SELECT h.user_id, h.mode_name, h.high_score, h.best_accuracy, h.best_speed,
+               NULL, NULL, NULL, NULL
+        FROM high_scores h
+        WHERE :exact
+          AND NOT EXISTS (SELECT 1 FROM practice_records p
+                          WHERE p.user_id = h.user_id AND p.mode_name = h.mode_name)
+    ''', ['''
+        INSERT INTO high_scores (user_id, mode_name, high_score, best_accuracy, best_speed, achieved_at)
+        SELECT user_id, mode_name, expected_high_score, expected_accuracy, expected_speed,
+               expected_achieved_at
+        FROM temp.derived_drift
+        WHERE expected_high_score IS NOT NULL
+        ON CONFLICT(user_id, mode_name)
+        DO UPDATE SET
+            high_score = excluded.high_score,
+            best_accuracy = excluded.best_accuracy,
+            best_speed = excluded.best_speed,
+            achieved_at = excluded.achieved_at
+    ''', '''
+        DELETE FROM high_scores
+        WHERE (user_id, mode_name) IN (
+            SELECT user_id, mode_name FROM temp.derived_drift
+            WHERE expected_high_score IS NULL
+        )
+    ''']),
+    ('clans', '''
+        SELECT c.clan_id, c.total_members, COUNT(m.user_id) AS expected_members
+        FROM clans c
+        LEFT JOIN clan_members m ON m.clan_id = c.clan_id
+        GROUP BY c.clan_id
+        HAVING c.total_members IS NOT COUNT(m.user_id)
+    ''', ['''
+        UPDATE clans
+        SET total_members = drift.expected_members
+        FROM temp.derived_drift AS drift
+        WHERE clans.clan_id = drift.clan_id
+    ''']),
+    ('season_pass', '''
+        SELECT pass_id, user_id, season_number, tier, season_exp / 100 AS expected_tier
+        FROM season_pass
+        WHERE tier IS NOT season_exp / 100
+    ''', ['''
+        UPDATE season_pass
+        SET tier = drift.expected_tier
+        FROM temp.derived_drift AS drift
+        WHERE season_pass.pass_id = drift.pass_id
+    ''']),
+]
+
+
+def fix_derived_values(cursor, params):
+    """DERIVED_VALUES 항목마다 어긋난 행을 temp.derived_drift 에 담아 그 행만 고침 (항목별 고친 행 수 반환)"""
+    fixed = {}
+    for name, drift_sql, fix_sqls in DERIVED_VALUES:
+        cursor.execute('DROP TABLE IF EXISTS temp.derived_drift')
+        cursor.execute(f'CREATE TEMP TABLE derived_drift AS {drift_sql}', params)
+        cursor.execute('SELECT COUNT(*) FROM temp.derived_drift')
+        fixed[name] = cursor.fetchone()[0]
+        if fixed[name]:
+            for sql in fix_sqls:
+                cursor.execute(sql)
+    cursor.execute('DROP TABLE temp.derived_drift')
+    return fixed
+
+
+def reconcile_derived_values(cursor):
+    """트리거를 설치하기 전에 쌓인 파생 값 (누적 점수, 최고 기록 등) 을 원본 행에 맞춤 (마이그레이션 10)"""
+    cursor.execute("SELECT value FROM maintenance_state WHERE key = 'compacted_before'")
+    row = cursor.fetchone()
+    since = row[0] if row else None
+    fix_derived_values(cursor, {'since': since or '', 'exact': int(since is None)})
+
+
+# 전문 검색 색인 (마이그레이션 11)
+# unicode61 토크나이저는 공백/문장부호로 나누므로 한글 어절 하나가 토큰 하나가 된다.
+# 조사가 붙은 어절은 접두어 검색으로 찾는다 ("학교*" -> 학교에, 학교를).
+# trigram 은 세 글자보다 짧은 검색어를 찾지 못해 두 글자 낱말이 많은 한글에는 쓰지 않는다.
+# custom_words 는 rowid 가 없으므로 list_id * 2^32 + position 을 rowid 로 쓰는 contentless 색인이다.
+WORD_ROWID_BASE = 4294967296
+SEARCH_TOKENIZE = "tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3'"
+# BM25 는 일치하는 지문마다 계산하므로 흔한 낱말은 최근 지문 이만큼만 순위를 매긴다
+SEARCH_RANK_CANDIDATES = 1000
+
+SEARCH_INDEX = [
+    f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS practice_passages_fts USING fts5(
+        title, content,
+        content = 'practice_passages', content_rowid = 'passage_id',
+        {SEARCH_TOKENIZE}
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_practice_passages_insert
+    AFTER INSERT ON practice_passages
+    BEGIN
+        INSERT INTO practice_passages_fts (rowid, title, content)
+        VALUES (NEW.passage_id, NEW.title, NEW.content);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_practice_passages_update
+    AFTER UPDATE OF title, content ON practice_passages
+    BEGIN
+        INSERT INTO practice_passages_fts (practice_passages_fts, rowid, title, content)
+        VALUES ('delete', OLD.passage_id, OLD.title, OLD.content);
+        INSERT INTO practice_passages_fts (rowid, title, content)
+        VALUES (NEW.passage_id, NEW.title, NEW.content);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_practice_passages_delete
+    AFTER DELETE ON practice_passages
+    BEGIN
+        INSERT INTO practice_passages_fts (practice_passages_fts, rowid, title, content)
+        VALUES ('delete', OLD.passage_id, OLD.title, OLD.content);
+    END
+    ''',
+    f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS custom_words_fts USING fts5(
+        word, content = '', {SEARCH_TOKENIZE}
+    )
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_custom_words_insert
+    AFTER INSERT ON custom_words
+    BEGIN
+        INSERT INTO custom_words_fts (rowid, word)
+        VALUES (NEW.list_id * {WORD_ROWID_BASE} + NEW.position, NEW.word);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_custom_words_update
+    AFTER UPDATE ON custom_words
+    BEGIN
+        INSERT INTO custom_words_fts (custom_words_fts, rowid, word)
+        VALUES ('delete', OLD.list_id * {WORD_ROWID_BASE} + OLD.position, OLD.word);
+        INSERT INTO custom_words_fts (rowid, word)
+        VALUES (NEW.list_id * {WORD_ROWID_BASE} + NEW.position, NEW.word);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_custom_words_delete
+    AFTER DELETE ON custom_words
+    BEGIN
+        INSERT INTO custom_words_fts (custom_words_fts, rowid, word)
+        VALUES ('delete', OLD.list_id * {WORD_ROWID_BASE} + OLD.position, OLD.word);
+    END
+    ''',
+]
+
+
+def fts_query(text, prefix=True, phrase=False):
+    """검색어를 FTS5 MATCH 식으로 변환 (검색할 낱말이 없으면 None)
+
+    낱말마다 큰따옴표로 감싸므로 사용자가 입력한 연산자 (AND, OR, NEAR, *, -) 는
+    일반 글자로 취급된다.
+
+    Args:
+        prefix: 각 낱말을 접두어로 검색 (조사가 붙은 어절도 찾음)
+        phrase: 낱말이 입력한 순서대로 붙어 있는 경우만 찾음 (아니면 모든 낱말을 포함)
+    """
+    words = re.findall(r'[^\W_]+', unicodedata.normalize('NFC', text))
+    if not words:
+        return None
+    suffix = '*' if prefix else ''
+    terms = [f'"{word}"{suffix}' for word in words]
+    return ' + '.join(terms) if phrase else ' '.join(terms)
+
+
+def split_legacy_word_lists(cursor):
+    """쉼표로 이어 붙여 저장된 기존 단어 리스트를 custom_words 행으로 옮김"""
+    cursor.execute("SELECT list_id, words FROM custom_word_lists WHERE words != ''")
+    for list_id, words_str in cursor.fetchall():
+        words = [word.strip() for word in words_str.split(',') if word.strip()]
+        cursor.executemany('''
+            INSERT INTO custom_words (list_id, position, word) VALUES (?, ?, ?)
+        ''', [(list_id, position, word) for position, word in enumerate(words)])
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                email TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP,
-                last_practice_date DATE,
-                total_score INTEGER DEFAULT 0,
-                total_practice_time INTEGER DEFAULT 0,
-                login_streak INTEGER DEFAULT 0,
-                theme TEXT DEFAULT 'light'
-            )
-        ''')
-
+            UPDATE custom_word_lists
+            SET words = '', word_count = ?, total_chars = ?
+            WHERE list_id = ?
+        ''', (len(words), sum(len(word) for word in words), list_id))
+
+
+# 초기 버전의 users 테이블에 없던 컬럼 (CREATE TABLE IF NOT EXISTS 로는 추가되지 않음)
+LATE_USER_COLUMNS = [
+    ('last_practice_date', 'DATE'),
+    ('login_streak', 'INTEGER DEFAULT 0'),
+    ('theme', "TEXT DEFAULT 'light'"),
+]
+
+
+def add_missing_user_columns(cursor):
+    """오래된 데이터베이스의 users 테이블에 빠진 컬럼 추가"""
+    cursor.execute('PRAGMA table_info(users)')
+    existing = {row[1] for row in cursor.fetchall()}
+    for name, definition in LATE_USER_COLUMNS:
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE users ADD COLUMN {name} {definition}')
+
+
+# 순위 점수 (high_scores.high_score, users.total_score) 가 바뀌면 버전을 올리는 트리거 (마이그레이션 12)
+# 어느 프로세스가 썼든 같은 값을 보므로 LeaderboardIndex 가 반영하지 못한 변경을 알 수 있다.
+LEADERBOARD_VERSION_BUMP = "UPDATE maintenance_state SET value = value + 1 WHERE key = 'leaderboard_version';"
+
+LEADERBOARD_VERSION_TRIGGERS = [
+    "INSERT OR IGNORE INTO maintenance_state (key, value) VALUES ('leaderboard_version', 0)",
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_high_scores_rank_insert
+    AFTER INSERT ON high_scores
+    BEGIN {LEADERBOARD_VERSION_BUMP} END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_high_scores_rank_update
+    AFTER UPDATE OF high_score ON high_scores
+    WHEN NEW.high_score IS NOT OLD.high_score
+    BEGIN {LEADERBOARD_VERSION_BUMP} END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_high_scores_rank_delete
+    AFTER DELETE ON high_scores
+    BEGIN {LEADERBOARD_VERSION_BUMP} END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_users_rank_insert
+    AFTER INSERT ON users
+    BEGIN {LEADERBOARD_VERSION_BUMP} END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_users_rank_update
+    AFTER UPDATE OF total_score ON users
+    WHEN NEW.total_score IS NOT OLD.total_score
+    BEGIN {LEADERBOARD_VERSION_BUMP} END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_users_rank_delete
+    AFTER DELETE ON users
+    BEGIN {LEADERBOARD_VERSION_BUMP} END
+    ''',
+]
+
+
+# 스키마 마이그레이션 목록: (버전, 단계 목록)
+# 단계는 SQL 문자열 또는 cursor를 받는 함수이다.
+# PRAGMA user_version 보다 높은 버전만 순서대로 한 트랜잭션에서 적용하며,
+# 버전은 항상 증가하는 순서로 뒤에 추가한다 (기존 항목 수정 금지).
+MIGRATIONS = [
+    # 1: 기본 테이블
+    (1, [
+        # 사용자 테이블 생성
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            email TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_login TIMESTAMP,
+            last_practice_date DATE,
+            total_score INTEGER DEFAULT 0,
+            total_practice_time INTEGER DEFAULT 0,
+            login_streak INTEGER DEFAULT 0,
+            theme TEXT DEFAULT 'light'
+        )
+        ''',
         # 연습 기록 테이블 생성
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS practice_records (
-                record_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                mode_name TEXT NOT NULL,
-                score INTEGER DEFAULT 0,
-                accuracy REAL DEFAULT 0,
-                speed INTEGER DEFAULT 0,
-                practice_time INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id)
-            )
-        ''')
-
+        '''
+        CREATE TABLE IF NOT EXISTS practice_records (
+            record_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            mode_name TEXT NOT NULL,
+            score INTEGER DEFAULT 0,
+            accuracy REAL DEFAULT 0,
+            speed INTEGER DEFAULT 0,
+            practice_time INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+        ''',
         # 최고 기록 테이블 생성
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS high_scores (
-                highscore_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                mode_name TEXT NOT NULL,
-                high_score INTEGER DEFAULT 0,
-                best_accuracy REAL DEFAULT 0,
-                best_speed INTEGER DEFAULT 0,
-                achieved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                UNIQUE(user_id, mode_name)
-            )
-        ''')
-
+        '''
+        CREATE TABLE IF NOT EXISTS high_scores (
+            highscore_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            mode_name TEXT NOT NULL,
+            high_score INTEGER DEFAULT 0,
+            best_accuracy REAL DEFAULT 0,
+            best_speed INTEGER DEFAULT 0,
+            achieved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            UNIQUE(user_id, mode_name)
+        )
+        ''',
         # 업적 테이블 생성
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS achievements (
-                achievement_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                achievement_name TEXT NOT NULL,
-                achievement_description TEXT,
-                achieved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                UNIQUE(user_id, achievement_name)
-            )
-        ''')
-
+        '''
+        CREATE TABLE IF NOT EXISTS achievements (
+            achievement_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            achievement_name TEXT NOT NULL,
+            achievement_description TEXT,
+            achieved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            UNIQUE(user_id, achievement_name)
+        )
+        ''',
         # 일일 목표 테이블 생성
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS daily_goals (
-                goal_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                goal_date DATE DEFAULT CURRENT_DATE,
-                target_time INTEGER DEFAULT 30,
-                target_score INTEGER DEFAULT 100,
-                achieved_time INTEGER DEFAULT 0,
-                achieved_score INTEGER DEFAULT 0,
-                completed INTEGER DEFAULT 0,
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                UNIQUE(user_id, goal_date)
-            )
-        ''')
-
+        '''
+        CREATE TABLE IF NOT EXISTS daily_goals (
+            goal_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            goal_date DATE DEFAULT CURRENT_DATE,
+            target_time INTEGER DEFAULT 30,
+            target_score INTEGER DEFAULT 100,
+            achieved_time INTEGER DEFAULT 0,
+            achieved_score INTEGER DEFAULT 0,
+            completed INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            UNIQUE(user_id, goal_date)
+        )
+        ''',
         # 키 통계 테이블 생성
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS key_statistics (
-                stat_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                key_char TEXT NOT NULL,
-                total_presses INTEGER DEFAULT 0,
-                correct_presses INTEGER DEFAULT 0,
-                incorrect_presses INTEGER DEFAULT 0,
-                avg_time REAL DEFAULT 0,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                UNIQUE(user_id, key_char)
-            )
-        ''')
-
+        '''
+        CREATE TABLE IF NOT EXISTS key_statistics (
+            stat_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            key_char TEXT NOT NULL,
+            total_presses INTEGER DEFAULT 0,
+            correct_presses INTEGER DEFAULT 0,
+            incorrect_presses INTEGER DEFAULT 0,
+            avg_time REAL DEFAULT 0,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            UNIQUE(user_id, key_char)
+        )
+        ''',
         # 사용자 정의 단어 리스트 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS custom_word_lists (
-                list_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                list_name TEXT NOT NULL,
-                words TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id)
-            )
-        ''')
-
+        '''
+        CREATE TABLE IF NOT EXISTS custom_word_lists (
+            list_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            list_name TEXT NOT NULL,
+            words TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+        ''',
         # 설정 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_settings (
-                setting_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                sound_enabled INTEGER DEFAULT 1,
-                volume INTEGER DEFAULT 50,
-                font_size INTEGER DEFAULT 12,
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                UNIQUE(user_id)
-            )
-        ''')
-
+        '''
+        CREATE TABLE IF NOT EXISTS user_settings (
+            setting_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            sound_enabled INTEGER DEFAULT 1,
+            volume INTEGER DEFAULT 50,
+            font_size INTEGER DEFAULT 12,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            UNIQUE(user_id)
+        )
+        ''',
         # 레벨 시스템 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_levels (
-                level_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                current_level INTEGER DEFAULT 1,
-                current_exp INTEGER DEFAULT 0,
-                total_exp INTEGER DEFAULT 0,
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                UNIQUE(user_id)
-            )
-        ''')
-
+        '''
+        CREATE TABLE IF NOT EXISTS user_levels (
+            level_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            current_level INTEGER DEFAULT 1,
+            current_exp INTEGER DEFAULT 0,
+            total_exp INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            UNIQUE(user_id)
+        )
+        ''',
         # 친구 시스템 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS friendships (
-                friendship_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                friend_id INTEGER NOT NULL,
-                status TEXT DEFAULT 'pending',
-                requested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                accepted_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                FOREIGN KEY (friend_id) REFERENCES users (user_id),
-                UNIQUE(user_id, friend_id)
-            )
-        ''')
-
+        '''
+        CREATE TABLE IF NOT EXISTS friendships (
+            friendship_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            friend_id INTEGER NOT NULL,
+            status TEXT DEFAULT 'pending',
+            requested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            accepted_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            FOREIGN KEY (friend_id) REFERENCES users (user_id),
+            UNIQUE(user_id, friend_id)
+        )
+        ''',
         # 클랜/그룹 시스템 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS clans (
-                clan_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                clan_name TEXT UNIQUE NOT NULL,
-                description TEXT,
-                leader_id INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                total_members INTEGER DEFAULT 1,
-                FOREIGN KEY (leader_id) REFERENCES users (user_id)
-            )
-        ''')
+        '''
+        CREATE TABLE IF NOT EXISTS clans (
+            clan_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            clan_name TEXT UNIQUE NOT NULL,
+            description TEXT,
+            leader_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            total_members INTEGER DEFAULT 1,
+            FOREIGN KEY (leader_id) REFERENCES users (user_id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS clan_members (
+            member_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            clan_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            role TEXT DEFAULT 'member',
+            joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            contribution INTEGER DEFAULT 0,
+            FOREIGN KEY (clan_id) REFERENCES clans (clan_id),
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            UNIQUE(user_id)
+        )
+        ''',
+        # 시즌 패스 테이블
+        '''
+        CREATE TABLE IF NOT EXISTS season_pass (
+            pass_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            season_number INTEGER NOT NULL,
+            tier INTEGER DEFAULT 0,
+            season_exp INTEGER DEFAULT 0,
+            is_premium INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            UNIQUE(user_id, season_number)
+        )
+        ''',
+        # 손가락별 통계 테이블
+        '''
+        CREATE TABLE IF NOT EXISTS finger_statistics (
+            stat_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            finger_name TEXT NOT NULL,
+            total_presses INTEGER DEFAULT 0,
+            correct_presses INTEGER DEFAULT 0,
+            avg_speed REAL DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            UNIQUE(user_id, finger_name)
+        )
+        ''',
+    ]),
+    # 2: 조회 패턴별 보조 인덱스
+    (2, [
+        # get_user_records, get_practice_history
+        'CREATE INDEX IF NOT EXISTS idx_practice_records_user_created '
+        'ON practice_records (user_id, created_at)',
+        # get_mode_distribution
+        'CREATE INDEX IF NOT EXISTS idx_practice_records_user_mode '
+        'ON practice_records (user_id, mode_name)',
+        # get_leaderboard (모드별)
+        'CREATE INDEX IF NOT EXISTS idx_high_scores_mode_score '
+        'ON high_scores (mode_name, high_score DESC)',
+        # get_leaderboard (전체)
+        'CREATE INDEX IF NOT EXISTS idx_users_total_score '
+        'ON users (total_score DESC)',
+        # get_friend_requests
+        'CREATE INDEX IF NOT EXISTS idx_friendships_friend_status '
+        'ON friendships (friend_id, status)',
+        # get_level_leaderboard
+        'CREATE INDEX IF NOT EXISTS idx_user_levels_rank '
+        'ON user_levels (current_level DESC, total_exp DESC)',
+        # get_clan_members
+        'CREATE INDEX IF NOT EXISTS idx_clan_members_clan '
+        'ON clan_members (clan_id, contribution DESC)',
+        # get_custom_word_lists
+        'CREATE INDEX IF NOT EXISTS idx_custom_word_lists_user '
+        'ON custom_word_lists (user_id, created_at)',
+    ]),
+    # 3: 리더보드 키셋 페이지 조회용 (동점자는 user_id 순)
+    (3, [
+        'DROP INDEX IF EXISTS idx_high_scores_mode_score',
+        'CREATE INDEX IF NOT EXISTS idx_high_scores_mode_rank '
+        'ON high_scores (mode_name, high_score DESC, user_id)',
+    ]),
+    # 4: 일별 연습 집계 (통계 대시보드/리포트용)
+    (4, [
+        '''
+        CREATE TABLE IF NOT EXISTS daily_user_stats (
+            user_id INTEGER NOT NULL,
+            stat_date DATE NOT NULL,
+            mode_name TEXT NOT NULL,
+            session_count INTEGER DEFAULT 0,
+            score_sum INTEGER DEFAULT 0,
+            accuracy_sum REAL DEFAULT 0,
+            speed_sum INTEGER DEFAULT 0,
+            time_sum INTEGER DEFAULT 0,
+            PRIMARY KEY (user_id, stat_date, mode_name)
+        ) WITHOUT ROWID
+        ''',
+        'DELETE FROM daily_user_stats',
+        DAILY_STATS_BACKFILL_SQL,
+    ]),
+    # 5: 사용자 정의 단어를 행 단위로 저장 (custom_word_lists.words 는 더 이상 사용하지 않음)
+    (5, [
+        '''
+        CREATE TABLE IF NOT EXISTS custom_words (
+            list_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            word TEXT NOT NULL,
+            PRIMARY KEY (list_id, position),
+            FOREIGN KEY (list_id) REFERENCES custom_word_lists (list_id)
+        ) WITHOUT ROWID
+        ''',
+        'ALTER TABLE custom_word_lists ADD COLUMN word_count INTEGER DEFAULT 0',
+        'ALTER TABLE custom_word_lists ADD COLUMN total_chars INTEGER DEFAULT 0',
+        split_legacy_word_lists,
+    ]),
+    # 6: 초기 버전 데이터베이스의 users 컬럼 보완 (다른 PC 데이터 병합 시 필요)
+    (6, [
+        add_missing_user_columns,
+    ]),
+    # 7: 세션별 키 입력 로그 (keystroke_log 형식 BLOB, 점수 기록이 없는 세션은 record_id NULL)
+    (7, [
+        '''
+        CREATE TABLE IF NOT EXISTS session_keystrokes (
+            session_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            mode_name TEXT NOT NULL,
+            record_id INTEGER,
+            event_count INTEGER NOT NULL,
+            duration_ms INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            data BLOB NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            FOREIGN KEY (record_id) REFERENCES practice_records (record_id)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_session_keystrokes_user_created '
+        'ON session_keystrokes (user_id, created_at)',
+    ]),
+    # 8: 유지보수 작업 상태 (compacted_before: 이 날짜 이전 기록은 일별 집계로만 남음)
+    (8, [
+        '''
+        CREATE TABLE IF NOT EXISTS maintenance_state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID
+        ''',
+    ]),
+    # 9: 키별 입력 간격 히스토그램 (key_latency 형식 BLOB, 이전 기록은 NULL)
+    (9, [
+        'ALTER TABLE key_statistics ADD COLUMN latency_hist BLOB',
+    ]),
+    # 10: 파생 값을 원본 테이블 트리거로 유지 (트리거는 증분만 반영하므로 기존 값을 먼저 원본에 맞춤)
+    (10, [
+        reconcile_derived_values,
+        *DERIVED_TRIGGERS,
+    ]),
+    # 11: 가져온 연습 지문 (user_id NULL 은 모든 사용자 공용) 과 전문 검색 색인
+    (11, [
+        '''
+        CREATE TABLE IF NOT EXISTS practice_passages (
+            passage_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            title TEXT NOT NULL,
+            content TEXT NOT NULL,
+            char_count INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_practice_passages_user '
+        'ON practice_passages (user_id, created_at)',
+        *SEARCH_INDEX,
+        # 기존 단어 색인
+        f'''
+        INSERT INTO custom_words_fts (rowid, word)
+        SELECT list_id * {WORD_ROWID_BASE} + position, word FROM custom_words
+        ''',
+    ]),
+    # 12: 순위에 쓰는 점수가 바뀔 때마다 올라가는 버전 (LeaderboardIndex 무효화용)
+    (12, LEADERBOARD_VERSION_TRIGGERS),
+]
+
+
+class KeyStatsBuffer:
+    """키/손가락 통계 쓰기 버퍼
+
+    키 입력마다 DB에 쓰지 않고 (user_id, 키) 단위로 메모리에 누적한 뒤
+    크기나 시간 임계값에 도달하면 executemany 한 번으로 반영한다.
+    """
+
+    def __init__(self, db, max_pending=200, flush_interval=5.0):
+        """
+        Args:
+            db: Database 인스턴스
+            max_pending: 자동 반영 전까지 모아둘 최대 입력 수
+            flush_interval: 자동 반영 주기 (초)
+        """
+        self.db = db
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._keys = {}      # (user_id, key_char) -> [입력 수, 정타, 오타, 시간 합, 시간 히스토그램]
+        self._fingers = {}   # (user_id, finger_name) -> [입력 수, 정타, 시간 합]
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def add_key(self, user_id, key_char, is_correct, press_time=0):
+        """키 입력 누적"""
+        with self._lock:
+            stat = self._keys.get((user_id, key_char))
+            if stat is None:
+                stat = self._keys[(user_id, key_char)] = [0, 0, 0, 0.0, new_histogram()]
+            stat[0] += 1
+            stat[1 if is_correct else 2] += 1
+            stat[3] += press_time
+            if press_time > 0:  # 첫 입력(간격 0)은 히스토그램에서 제외
+                stat[4][bucket_index(press_time)] += 1
+            self._pending += 1
+        self._maybe_flush()
+
+    def add_finger(self, user_id, finger_name, is_correct, press_time=0):
+        """손가락 입력 누적"""
+        with self._lock:
+            stat = self._fingers.setdefault((user_id, finger_name), [0, 0, 0.0])
+            stat[0] += 1
+            if is_correct:
+                stat[1] += 1
+            stat[2] += press_time
+            self._pending += 1
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        """임계값 도달 시 반영"""
+        if (self._pending >= self.max_pending or
+                time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """누적된 통계를 한 트랜잭션으로 반영 (반영한 행 수 반환)"""
+        with self._lock:
+            keys, self._keys = self._keys, {}
+            fingers, self._fingers = self._fingers, {}
+            self._pending = 0
+            self._last_flush = time.monotonic()
+
+        if not keys and not fingers:
+            return 0
+
+        key_rows = [(user_id, key_char, total, correct, incorrect, time_sum / total, to_blob(hist))
+                    for (user_id, key_char), (total, correct, incorrect, time_sum, hist) in keys.items()]
+        finger_rows = [(user_id, finger_name, total, correct, time_sum / total)
+                       for (user_id, finger_name), (total, correct, time_sum) in fingers.items()]
+        try:
+            self.db.apply_key_stats(key_rows, finger_rows)
+        except Exception:
+            # 반영 실패 시 누적분을 되돌려 다음 반영 때 다시 시도
+            self._restore(keys, fingers)
+            raise
+
+        return len(keys) + len(fingers)
+
+    def _restore(self, keys, fingers):
+        """반영하지 못한 누적분 복원"""
+        with self._lock:
+            for key, values in keys.items():
+                stat = self._keys.get(key)
+                if stat is None:
+                    stat = self._keys[key] = [0, 0, 0, 0.0, new_histogram()]
+                for i, value in enumerate(values[:4]):
+                    stat[i] += value
+                for i, count in enumerate(values[4]):
+                    stat[4][i] += count
+                self._pending += values[0]
+            for key, values in fingers.items():
+                stat = self._fingers.setdefault(key, [0, 0, 0.0])
+                for i, value in enumerate(values):
+                    stat[i] += value
+                self._pending += values[0]
+
+
+class LeaderboardIndex:
+    """점수 순위 인덱스 (메모리)
+
+    모드별 점수를 정렬 리스트로 유지하여 순위를 이진 탐색(O(log n))으로 구한다.
+    처음 조회할 때 인덱스를 한 번 읽어 채우고, 이후에는 커밋된 변경분만 반영한다.
+    mode_name이 None이면 users.total_score 기준 전체 순위이다.
+
+    점수가 바뀔 때마다 트리거가 maintenance_state 의 leaderboard_version 을 올린다.
+    이 프로세스의 쓰기는 쓰기 전후 버전과 함께 커밋 후 apply() 로 반영하고,
+    조회한 버전이 반영한 버전보다 앞서 있으면 (다른 프로세스/도구의 변경) 다시 읽는다.
+    연결/스레드와 무관한 DB 전체 버전이라 다른 스레드의 커밋으로 목록을 버리지 않는다.
+    적재와 반영은 같은 잠금 안에서 실행되고, 커밋 후 콜백이 있는 트랜잭션은
+    COMMIT 과 apply() 사이에 다른 스레드가 끼어 목록을 버리지 않도록 이 잠금을 잡고 커밋한다 (lock).
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._scores = {}          # mode_name -> 오름차순 점수 리스트
+        self._version = -1         # 적재된 목록에 반영된 leaderboard_version
+        self.loads = 0
+        self.applied = 0
 
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS clan_members (
-                member_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                clan_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                role TEXT DEFAULT 'member',
-                joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                contribution INTEGER DEFAULT 0,
-                FOREIGN KEY (clan_id) REFERENCES clans (clan_id),
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                UNIQUE(user_id)
-            )
-        ''')
+    @staticmethod
+    def read_version(cursor):
+        """현재 트랜잭션에서 본 leaderboard_version"""
+        cursor.execute("SELECT value FROM maintenance_state WHERE key = 'leaderboard_version'")
+        row = cursor.fetchone()
+        return int(row[0]) if row else 0
+
+    def _load(self, cursor, mode_name):
+        """모드의 점수 목록 읽기 (인덱스 순서대로 읽음)"""
+        if mode_name is None:
+            cursor.execute('SELECT total_score FROM users ORDER BY total_score DESC')
+        else:
+            cursor.execute('''
+                SELECT high_score FROM high_scores
+                WHERE mode_name = ?
+                ORDER BY high_score DESC
+            ''', (mode_name,))
+        scores = [row[0] for row in cursor.fetchall()]
+        scores.reverse()
+        self.loads += 1
+        return scores
+
+    def rank(self, cursor, mode_name, score):
+        """점수의 순위와 전체 인원 반환 (더 높은 점수 수 + 1)"""
+        version = self.read_version(cursor)
+        with self.lock:
+            if version > self._version:
+                # 반영하지 못한 변경이 있음 (다른 프로세스, 관리 도구 등)
+                self._scores.clear()
+                self._version = version
+            scores = self._scores.get(mode_name)
+            if scores is None:
+                scores = self._load(cursor, mode_name)
+                # 이 트랜잭션이 시작된 뒤 커밋된 변경이 반영되어 있으면 저장하지 않음
+                if version == self._version:
+                    self._scores[mode_name] = scores
+            return len(scores) - bisect_right(scores, score) + 1, len(scores)
+
+    def apply(self, version_before, version_after, changes):
+        """이 프로세스가 커밋한 점수 변경 반영
+
+        Args:
+            version_before: 쓰기 전에 읽은 leaderboard_version
+            version_after: 쓰기 후 (커밋 전) 에 읽은 leaderboard_version
+            changes: [(mode_name, 이전 점수 또는 None(신규), 새 점수)]
+        """
+        with self.lock:
+            if version_after <= self._version:
+                return  # 이미 커밋 후의 목록을 읽어 둠
+            if version_before != self._version:
+                # 사이에 반영하지 못한 변경이 있으면 다음 조회 때 다시 읽음
+                self._scores.clear()
+                self._version = version_after
+                return
+            self._version = version_after
+            self.applied += 1
+            for mode_name, old_score, new_score in changes:
+                scores = self._scores.get(mode_name)
+                if scores is None or old_score == new_score:
+                    continue
+                if old_score is not None:
+                    index = bisect_left(scores, old_score)
+                    if index < len(scores) and scores[index] == old_score:
+                        del scores[index]
+                    else:
+                        del self._scores[mode_name]
+                        continue
+                insort(scores, new_score)
+
+    def invalidate(self, mode_name=None, all_modes=False):
+        """적재된 점수 목록 제거"""
+        with self.lock:
+            if all_modes:
+                self._scores.clear()
+            else:
+                self._scores.pop(mode_name, None)
+
+    def stats(self):
+        """적재/증분 반영 횟수"""
+        with self.lock:
+            return {
+                'loads': self.loads,
+                'applied': self.applied,
+                'modes_loaded': len(self._scores),
+                'version': self._version
+            }
+
+
+class QueryCache:
+    """읽기 메서드 결과 캐시 (테이블 버전 기반 무효화, LRU)
+
+    항목마다 조회 직전의 테이블 버전을 함께 저장한다. 쓰기 메서드가 커밋되면
+    해당 테이블의 버전이 올라가고, 버전이 맞지 않는 항목은 다음 조회 때 다시 읽는다.
+    버전을 조회 전에 읽으므로 조회와 커밋이 겹쳐도 오래된 값은 재사용되지 않는다.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (버전 튜플, 결과)
+        self._versions = {}             # 테이블 -> 버전
+        self._generation = 0            # clear() 마다 증가
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, tables, load):
+        """캐시된 결과 반환 (없거나 오래되었으면 load() 결과를 저장)"""
+        try:
+            hash(key)
+        except TypeError:
+            return load()  # 해시할 수 없는 인자는 캐시하지 않음
+
+        with self._lock:
+            versions = (self._generation,) + tuple(self._versions.get(table, 0) for table in tables)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(entry[1])
+            self.misses += 1
+
+        value = load()
+
+        with self._lock:
+            self._entries[key] = (versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return self._copy(value)
+
+    def bump(self, tables):
+        """테이블 버전 증가 (해당 테이블을 읽은 항목 무효화)"""
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def clear(self):
+        """모든 항목 무효화 (쓰기 메서드를 거치지 않고 DB를 바꾼 뒤 호출)"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self):
+        """적중/실패 횟수 등 튜닝용 통계"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
 
-        # 시즌 패스 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS season_pass (
-                pass_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                season_number INTEGER NOT NULL,
-                tier INTEGER DEFAULT 0,
-                season_exp INTEGER DEFAULT 0,
-                is_premium INTEGER DEFAULT 0,
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                UNIQUE(user_id, season_number)
-            )
-        ''')
+    @staticmethod
+    def _copy(value):
+        """결과 복사본 (호출한 쪽에서 수정해도 캐시가 바뀌지 않도록)"""
+        if isinstance(value, dict):
+            return dict(value)
+        if isinstance(value, list):
+            return [dict(item) if isinstance(item, dict) else item for item in value]
+        return value
+
+
+class ContentionStats:
+    """쓰기 잠금 경합 통계 (BEGIN IMMEDIATE 대기 시간, 재시도 횟수)"""
+
+    WAIT_THRESHOLD = 0.001  # 이보다 오래 걸린 잠금 획득은 대기로 셈 (초)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """통계 비우기"""
+        with self._lock:
+            self.write_transactions = 0
+            self.waits = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.retries = 0
+            self.failures = 0
+
+    def record(self, waited, retries, failed=False):
+        """잠금 획득 한 번의 결과 기록"""
+        with self._lock:
+            self.write_transactions += 1
+            self.retries += retries
+            if failed:
+                self.failures += 1
+            if waited >= self.WAIT_THRESHOLD:
+                self.waits += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def stats(self):
+        """통계 스냅샷 (시간 단위 ms)"""
+        with self._lock:
+            return {
+                'write_transactions': self.write_transactions,
+                'waits': self.waits,
+                'wait_total_ms': round(self.wait_total * 1000, 3),
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+                'retries': self.retries,
+                'failures': self.failures
+            }
+
+
+def is_busy_error(error):
+    """다른 연결이 잠금을 쥐고 있어 실패한 오류인지 (SQLITE_BUSY/SQLITE_LOCKED)"""
+    code = getattr(error, 'sqlite_errorcode', None)
+    if code is not None:
+        return code & 0xFF in (SQLITE_BUSY, SQLITE_LOCKED)
+    return 'database is locked' in str(error) or 'database is busy' in str(error)
+
+
+def cached_read(*tables):
+    """읽기 메서드 결과를 인자별로 캐시 (tables: 결과가 의존하는 테이블)"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if getattr(self._local, 'depth', 0):
+                # 트랜잭션 안에서는 커밋 전 변경이 보이므로 캐시를 거치지 않음
+                return method(self, *args, **kwargs)
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            return self.cache.get_or_load(key, tables, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def writes(*tables):
+    """쓰기 메서드 표시 (커밋되면 tables 를 읽은 캐시 항목 무효화)"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                # 바깥 트랜잭션 안이면 커밋 시점에, 아니면 바로 실행
+                self.call_on_commit(lambda: self.cache.bump(tables))
+        return wrapper
+    return decorator
+
+
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+# busy_timeout 동안 기다려도 쓰기 잠금을 못 얻으면 무작위 지연 후 다시 시도
+# (지연: 0 ~ min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2^시도) 초)
+WRITE_RETRIES = 3
+RETRY_BASE_DELAY = 0.05
+RETRY_MAX_DELAY = 1.0
+
+# Database(':memory:') 마다 고유한 메모리 DB 이름
+_memory_db_ids = itertools.count(1)
 
-        # 손가락별 통계 테이블
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS finger_statistics (
-                stat_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                finger_name TEXT NOT NULL,
-                total_presses INTEGER DEFAULT 0,
-                correct_presses INTEGER DEFAULT 0,
-                avg_speed REAL DEFAULT 0,
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                UNIQUE(user_id, finger_name)
+
+class Database:
+    """데이터베이스 관리 클래스
+
+    스레드마다 하나의 연결을 열어 두고 재사용한다 (WAL 모드).
+    모든 쿼리는 transaction() 컨텍스트를 거쳐 실행된다.
+    """
+
+    def __init__(self, db_name='typing_practice.db', busy_timeout=5000, use_daemon=False):
+        """데이터베이스 초기화
+
+        Args:
+            db_name: SQLite 파일 경로 (':memory:' 면 파일 없이 메모리에만 저장)
+            busy_timeout: 잠금 대기 시간 (밀리초)
+            use_daemon: 같은 파일의 데이터베이스 데몬 (db_daemon.py) 이 실행 중이면
+                        공개 메서드 호출을 데몬으로 보냄 (없으면 직접 접근)
+        """
+        self.db_name = db_name
+        self.in_memory = db_name == ':memory:'
+        # 일반 ':memory:' 는 연결마다 다른 DB 이므로 스레드별 연결이 같은 DB를 보도록
+        # memdb VFS 의 이름 있는 메모리 DB 사용 (마지막 연결이 닫히면 사라짐)
+        self._connect_target = (f'file:/typing_memory_{next(_memory_db_ids)}?vfs=memdb'
+                                if self.in_memory else db_name)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._cursor_factory = sqlite3.Cursor
+        self.instrumentation = None  # enable_instrumentation() 으로 켬
+        self.contention = ContentionStats()
+        self.cache = QueryCache()
+        self.key_stats = KeyStatsBuffer(self)
+        self.leaderboard = LeaderboardIndex()
+        self.daemon = None
+        if use_daemon and not self.in_memory:
+            self.daemon = DaemonClient.connect(default_socket_path(db_name))
+        if self.daemon is not None:
+            self.daemon.install(self)  # 스키마는 데몬이 이미 최신으로 맞춰 둠
+        else:
+            self.init_database()
+
+    def get_connection(self):
+        """현재 스레드의 데이터베이스 연결 반환 (없으면 생성)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self._connect_target,
+                timeout=self.busy_timeout / 1000,
+                isolation_level=None,
+                check_same_thread=False,
+                uri=self.in_memory
             )
-        ''')
+            conn.row_factory = sqlite3.Row
+            conn.create_function('latency_hist_merge', 2, merge_blobs, deterministic=True)
+            conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout)}')
+            # 설정이 필요할 때만 실행 (다른 프로세스가 쓰는 중이면 바로 잠금 오류가 나므로)
+            # auto_vacuum 은 새 파일에만 적용됨 (기존 파일은 retention.enable_incremental_vacuum 으로 전환)
+            if conn.execute('PRAGMA page_count').fetchone()[0] == 0:
+                conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            if conn.execute('PRAGMA journal_mode').fetchone()[0] != 'wal':
+                conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+
+            self._local.conn = conn
+            self._local.depth = 0
+            self._local.on_commit = []
+            with self._connections_lock:
+                self._connections.append(conn)
+            if self.instrumentation:
+                self.instrumentation.attach(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate=False):
+        """트랜잭션 컨텍스트 (커서 반환)
 
-        conn.commit()
-        conn.close()
+        정상 종료 시 커밋, 예외 발생 시 롤백한다.
+        중첩 호출은 SAVEPOINT로 처리되어 바깥 트랜잭션에 합쳐진다.
+
+        Args:
+            immediate: 시작 시점에 쓰기 잠금 획득 (BEGIN IMMEDIATE).
+                       쓰기 트랜잭션은 항상 immediate 로 열어야 본문 실행 중에
+                       잠금 오류가 나지 않는다 (잠금 대기/재시도는 시작 시점에만).
+        """
+        conn = self.get_connection()
+        depth = self._local.depth
+        savepoint = f'sp_{depth}'
+        on_commit = self._local.on_commit
+        pending_callbacks = len(on_commit)
+
+        if depth == 0:
+            if immediate:
+                self._begin_immediate(conn)
+            else:
+                conn.execute('BEGIN')
+        else:
+            conn.execute(f'SAVEPOINT {savepoint}')
+
+        self._local.depth = depth + 1
+        cursor = conn.cursor(self._cursor_factory)
+        try:
+            yield cursor
+        except BaseException:
+            self._local.depth = depth
+            del on_commit[pending_callbacks:]
+            if depth == 0:
+                conn.execute('ROLLBACK')
+            else:
+                conn.execute(f'ROLLBACK TO {savepoint}')
+                conn.execute(f'RELEASE {savepoint}')
+            raise
+        else:
+            self._local.depth = depth
+            if depth == 0:
+                callbacks = on_commit[:]
+                del on_commit[:]
+                if callbacks:
+                    # 순위 인덱스 반영이 끝나기 전에 다른 스레드가 이 커밋을 보고 목록을 버리지 않도록
+                    with self.leaderboard.lock:
+                        conn.execute('COMMIT')
+                        for callback in callbacks:
+                            callback()
+                else:
+                    conn.execute('COMMIT')
+            else:
+                conn.execute(f'RELEASE {savepoint}')
+        finally:
+            cursor.close()
+
+    def _begin_immediate(self, conn):
+        """쓰기 잠금을 잡고 트랜잭션 시작
+
+        잠금 대기는 busy_timeout 동안 SQLite 가 처리한다 (다른 프로세스가 쓰는 중이면
+        잠들었다 깨며 기다림). 그래도 SQLITE_BUSY 이면 WRITE_RETRIES 번까지
+        무작위 지연(지수 증가) 후 다시 시도하고, 대기 시간과 재시도 횟수를 기록한다.
+        """
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                break
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e):
+                    raise
+                if attempt >= WRITE_RETRIES:
+                    self.contention.record(time.perf_counter() - start, attempt, failed=True)
+                    raise
+                time.sleep(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)))
+                attempt += 1
+        self.contention.record(time.perf_counter() - start, attempt)
+
+    def call_on_commit(self, callback):
+        """현재 트랜잭션이 커밋된 뒤 실행할 함수 등록 (롤백 시 버려짐)"""
+        if getattr(self._local, 'depth', 0):
+            self._local.on_commit.append(callback)
+        else:
+            callback()
+
+    def use_direct_access(self):
+        """데몬 대신 SQLite 에 직접 접근 (데몬이 내려갔을 때 클라이언트가 호출)"""
+        if self.daemon is None:
+            return
+        daemon, self.daemon = self.daemon, None
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            instrumentation.uninstall()
+        daemon.uninstall(self)
+        daemon.close()
+        if instrumentation is not None:
+            instrumentation.install()
+        self.cache.clear()
+        self.leaderboard.invalidate(all_modes=True)
+        self.init_database()
+
+    def close(self):
+        """버퍼를 반영하고 열려 있는 모든 연결 (데몬 소켓 포함) 종료"""
+        self.flush_key_stats()
+        if self.daemon is not None:
+            self.daemon.close()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    # ========== 계측 ==========
+    def enable_instrumentation(self, slow_ms=50, progress_steps=1000):
+        """메서드/SQL 계측 켜기 (이미 켜져 있으면 그대로 반환)
+
+        Args:
+            slow_ms: 이 시간(ms) 이상 걸린 SQL 문은 느린 쿼리 로그에 남김
+            progress_steps: SQLite progress 콜백 간격 (VM 명령 수)
+        """
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation(self, slow_ms, progress_steps)
+            self.instrumentation.install()
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        """계측 끄기 (감싼 메서드와 콜백 제거)"""
+        if self.instrumentation is not None:
+            self.instrumentation.uninstall()
+            self.instrumentation = None
+
+    def stats(self):
+        """계측/캐시/쓰기 경합 통계 스냅샷 (클라이언트 모드면 데몬 쪽 통계)"""
+        snapshot = {
+            'enabled': self.instrumentation is not None,
+            'cache': self.cache.stats(),
+            'contention': self.contention.stats(),
+            'leaderboard': self.leaderboard.stats()
+        }
+        if self.instrumentation is not None:
+            snapshot.update(self.instrumentation.snapshot())
+        return snapshot
+
+    def init_database(self):
+        """데이터베이스 스키마 초기화 (대기 중인 마이그레이션만 적용)"""
+        self.migrate()
+
+    def get_schema_version(self):
+        """현재 스키마 버전 (PRAGMA user_version)"""
+        return self.get_connection().execute('PRAGMA user_version').fetchone()[0]
+
+    def migrate(self):
+        """대기 중인 스키마 마이그레이션 적용 (적용 후 버전 반환)
+
+        이미 최신 버전이면 PRAGMA 한 번만 읽고 돌아간다.
+        """
+        latest_version = MIGRATIONS[-1][0]
+        version = self.get_schema_version()
+        if version >= latest_version:
+            return version
+
+        # 다른 프로세스와 동시에 적용하지 않도록 쓰기 잠금을 먼저 잡고 다시 확인
+        with self.transaction(immediate=True) as cursor:
+            version = cursor.execute('PRAGMA user_version').fetchone()[0]
+
+            for target_version, steps in MIGRATIONS:
+                if target_version <= version:
+                    continue
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+                cursor.execute(f'PRAGMA user_version = {int(target_version)}')
+                version = target_version
+
+        return version
 
     @staticmethod
     def hash_password(password):
         """비밀번호 해싱"""
         return hashlib.sha256(password.encode()).hexdigest()
 
+    @writes('users')
     def create_user(self, username, password, email=None):
         """새 사용자 생성"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
+            with self.transaction(immediate=True) as cursor:
+                hashed_pw = self.hash_password(password)
+                version_before = self.leaderboard.read_version(cursor)
 
-            hashed_pw = self.hash_password(password)
-
-            cursor.execute('''
-                INSERT INTO users (username, password, email)
-                VALUES (?, ?, ?)
-            ''', (username, hashed_pw, email))
-
-            conn.commit()
-            user_id = cursor.lastrowid
-            conn.close()
+                cursor.execute('''
+                    INSERT INTO users (username, password, email)
+                    VALUES (?, ?, ?)
+                ''', (username, hashed_pw, email))
+
+                user_id = cursor.lastrowid
+                # 새 사용자는 총 점수 0 으로 전체 순위에 들어감
+                version_after = self.leaderboard.read_version(cursor)
+                self.call_on_commit(
+                    lambda: self.leaderboard.apply(version_before, version_after, [(None, None, 0)]))
             return True, user_id
         except sqlite3.IntegrityError:
             return False, "이미 존재하는 사용자명입니다."
@@ -258,19 +1546,16 @@ class Database:
 
     def verify_user(self, username, password):
         """사용자 인증"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        hashed_pw = self.hash_password(password)
+        with self.transaction() as cursor:
+            hashed_pw = self.hash_password(password)
 
-        cursor.execute('''
-            SELECT user_id, username, total_score
-            FROM users
-            WHERE username = ? AND password = ?
-        ''', (username, hashed_pw))
+            cursor.execute('''
+                SELECT user_id, username, total_score
+                FROM users
+                WHERE username = ? AND password = ?
+            ''', (username, hashed_pw))
 
-        user = cursor.fetchone()
-        conn.close()
+            user = cursor.fetchone()
 
         if user:
             # 마지막 로그인 시간 업데이트
@@ -279,386 +1564,640 @@ class Database:
         else:
             return False, None
 
+    @writes('users')
     def update_last_login(self, user_id):
         """마지막 로그인 시간 업데이트"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            UPDATE users
-            SET last_login = CURRENT_TIMESTAMP
-            WHERE user_id = ?
-        ''', (user_id,))
-
-        conn.commit()
-        conn.close()
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                UPDATE users
+                SET last_login = CURRENT_TIMESTAMP
+                WHERE user_id = ?
+            ''', (user_id,))
 
+    @cached_read('users')
     def get_user_info(self, user_id):
         """사용자 정보 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT user_id, username, email, total_score,
-                   total_practice_time, created_at, last_login
-            FROM users
-            WHERE user_id = ?
-        ''', (user_id,))
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT user_id, username, email, total_score,
+                       total_practice_time, login_streak, created_at, last_login
+                FROM users
+                WHERE user_id = ?
+            ''', (user_id,))
 
-        user = cursor.fetchone()
-        conn.close()
+            user = cursor.fetchone()
 
         return dict(user) if user else None
 
+    @writes('users')
     def update_user_score(self, user_id, score_to_add):
-        """사용자 점수 업데이트"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        """사용자 점수 직접 조정 (새로 해제된 업적 이름 반환)
+
+        연습 점수는 save_practice_record 가 더하므로 따로 호출하지 않는다.
+        연습 기록에 없는 조정이라 rebuild_derived 를 실행하면 기록 기준 값으로 돌아간다.
+        """
+        with self.transaction(immediate=True) as cursor:
+            version_before = self.leaderboard.read_version(cursor)
+            cursor.execute('SELECT total_score FROM users WHERE user_id = ?', (user_id,))
+            row = cursor.fetchone()
+            if not row:
+                return []
 
-        cursor.execute('''
-            UPDATE users
-            SET total_score = total_score + ?
-            WHERE user_id = ?
-        ''', (score_to_add, user_id))
+            cursor.execute('''
+                UPDATE users
+                SET total_score = total_score + ?
+                WHERE user_id = ?
+            ''', (score_to_add, user_id))
 
-        conn.commit()
-        conn.close()
+            old_score = row['total_score']
+            version_after = self.leaderboard.read_version(cursor)
+            self.call_on_commit(lambda: self.leaderboard.apply(
+                version_before, version_after, [(None, old_score, old_score + score_to_add)]))
 
-    def save_practice_record(self, user_id, mode_name, score, accuracy, speed, practice_time):
-        """연습 기록 저장"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+            return self._unlock_by_metrics(cursor, user_id, {'total_score': old_score + score_to_add})
 
-        cursor.execute('''
-            INSERT INTO practice_records
-            (user_id, mode_name, score, accuracy, speed, practice_time)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (user_id, mode_name, score, accuracy, speed, practice_time))
+    @writes('users', 'high_scores')
+    def save_practice_record(self, user_id, mode_name, score, accuracy, speed, practice_time,
+                             keystrokes=None):
+        """연습 기록 저장 (새로 해제된 업적 이름 반환)
 
-        # 최고 기록 업데이트
-        cursor.execute('''
-            INSERT INTO high_scores (user_id, mode_name, high_score, best_accuracy, best_speed)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(user_id, mode_name)
-            DO UPDATE SET
-                high_score = MAX(high_score, ?),
-                best_accuracy = MAX(best_accuracy, ?),
-                best_speed = MAX(best_speed, ?),
-                achieved_at = CASE
-                    WHEN ? > high_score THEN CURRENT_TIMESTAMP
-                    ELSE achieved_at
-                END
-        ''', (user_id, mode_name, score, accuracy, speed,
-              score, accuracy, speed, score))
-
-        conn.commit()
-        conn.close()
+        최고 기록과 사용자 누적 점수/연습 시간은 트리거가 함께 갱신한다.
+
+        Args:
+            keystrokes: 세션 키 입력 이벤트 (있으면 기록과 연결해 함께 저장)
+        """
+        with self.transaction(immediate=True) as cursor:
+            version_before = self.leaderboard.read_version(cursor)
+            cursor.execute('''
+                SELECT u.total_score, u.total_practice_time, h.high_score
+                FROM users u
+                LEFT JOIN high_scores h ON h.user_id = u.user_id AND h.mode_name = ?
+                WHERE u.user_id = ?
+            ''', (mode_name, user_id))
+            before = cursor.fetchone()
+            old_high_score = before['high_score'] if before else None
+            new_high_score = score if old_high_score is None else max(old_high_score, score)
+
+            cursor.execute('''
+                INSERT INTO practice_records
+                (user_id, mode_name, score, accuracy, speed, practice_time)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (user_id, mode_name, score, accuracy, speed, practice_time))
+
+            if keystrokes:
+                self.save_session_keystrokes(user_id, mode_name, keystrokes,
+                                             record_id=cursor.lastrowid)
+
+            # 일별 집계 갱신 (트리거가 users 누적 값에 더함)
+            cursor.execute('''
+                INSERT INTO daily_user_stats
+                (user_id, stat_date, mode_name, session_count, score_sum, accuracy_sum, speed_sum, time_sum)
+                VALUES (?, DATE('now'), ?, 1, ?, ?, ?, ?)
+                ON CONFLICT(user_id, stat_date, mode_name)
+                DO UPDATE SET
+                    session_count = session_count + 1,
+                    score_sum = score_sum + excluded.score_sum,
+                    accuracy_sum = accuracy_sum + excluded.accuracy_sum,
+                    speed_sum = speed_sum + excluded.speed_sum,
+                    time_sum = time_sum + excluded.time_sum
+            ''', (user_id, mode_name, score, accuracy, speed, practice_time))
+
+            changes = [(mode_name, old_high_score, new_high_score)]
+            metrics = {}
+            if before:
+                old_score = before['total_score']
+                changes.append((None, old_score, old_score + score))
+                metrics['total_score'] = old_score + score
+                metrics['total_practice_time'] = before['total_practice_time'] + practice_time
+
+            version_after = self.leaderboard.read_version(cursor)
+            self.call_on_commit(lambda: self.leaderboard.apply(version_before, version_after, changes))
+            return self._unlock_by_metrics(cursor, user_id, metrics)
+
+    def finalize_session(self, user_id, result):
+        """연습 세션 종료 처리
+
+        기록 저장, 총 점수, 경험치, 일일 목표, 시즌 패스, 업적 갱신을
+        한 트랜잭션으로 반영한다. 중간에 실패하면 모두 롤백된다.
+
+        Args:
+            result: {'mode_name', 'score', 'accuracy', 'speed', 'practice_time'}
+                    선택 항목 'exp' (기본 score // 10), 'season_exp' (기본 exp),
+                    'keystrokes' (세션 키 입력 이벤트)
+
+        Returns:
+            {'new_high_score', 'previous_high_score', 'total_score', 'leveled_up',
+             'new_level', 'goal_completed', 'achievements'}
+        """
+        mode_name = result['mode_name']
+        score = result['score']
+        practice_time = result.get('practice_time', 0)
+        exp = result.get('exp', score // 10)
+        season_exp = result.get('season_exp', exp)
+
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                SELECT high_score FROM high_scores
+                WHERE user_id = ? AND mode_name = ?
+            ''', (user_id, mode_name))
+            row = cursor.fetchone()
+            previous_high_score = row['high_score'] if row else None
+
+            goal_before = self.get_daily_goal(user_id)
+
+            # 총 점수는 기록 저장 시 트리거가 더함
+            achievements = self.save_practice_record(
+                user_id, mode_name, score, result['accuracy'], result['speed'], practice_time,
+                keystrokes=result.get('keystrokes'))
+            level_result = self.add_exp(user_id, exp)
+            self.update_daily_goal(user_id, practice_time, score)
+            self.get_season_pass(user_id)
+            self.add_season_exp(user_id, season_exp)
+
+            goal_after = self.get_daily_goal(user_id)
+            cursor.execute('SELECT total_score FROM users WHERE user_id = ?', (user_id,))
+            row = cursor.fetchone()
+
+        return {
+            'new_high_score': previous_high_score is None or score > previous_high_score,
+            'previous_high_score': previous_high_score,
+            'total_score': row['total_score'] if row else None,
+            'leveled_up': bool(level_result and level_result['leveled_up']),
+            'new_level': level_result['new_level'] if level_result else None,
+            'goal_completed': bool(goal_after and goal_after['completed']
+                                   and not (goal_before and goal_before['completed'])),
+            'achievements': achievements
+        }
 
     def get_user_records(self, user_id, limit=10):
         """사용자 연습 기록 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT mode_name, score, accuracy, speed, practice_time, created_at
-            FROM practice_records
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-            LIMIT ?
-        ''', (user_id, limit))
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT mode_name, score, accuracy, speed, practice_time, created_at
+                FROM practice_records
+                WHERE user_id = ?
+                ORDER BY created_at DESC
+                LIMIT ?
+            ''', (user_id, limit))
 
-        records = cursor.fetchall()
-        conn.close()
+            records = cursor.fetchall()
 
         return [dict(record) for record in records]
 
+    @cached_read('high_scores')
     def get_high_scores(self, user_id):
         """사용자 최고 기록 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT mode_name, high_score, best_accuracy, best_speed, achieved_at
-            FROM high_scores
-            WHERE user_id = ?
-            ORDER BY high_score DESC
-        ''', (user_id,))
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT mode_name, high_score, best_accuracy, best_speed, achieved_at
+                FROM high_scores
+                WHERE user_id = ?
+                ORDER BY high_score DESC
+            ''', (user_id,))
 
-        records = cursor.fetchall()
-        conn.close()
+            records = cursor.fetchall()
 
         return [dict(record) for record in records]
 
+    @cached_read('users', 'high_scores')
     def get_leaderboard(self, mode_name=None, limit=10):
         """리더보드 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.transaction() as cursor:
+            if mode_name:
+                cursor.execute('''
+                    SELECT u.username, h.high_score, h.best_accuracy, h.best_speed, h.achieved_at
+                    FROM high_scores h
+                    JOIN users u ON h.user_id = u.user_id
+                    WHERE h.mode_name = ?
+                    ORDER BY h.high_score DESC
+                    LIMIT ?
+                ''', (mode_name, limit))
+            else:
+                cursor.execute('''
+                    SELECT u.username, u.total_score, u.total_practice_time
+                    FROM users u
+                    ORDER BY u.total_score DESC
+                    LIMIT ?
+                ''', (limit,))
+
+            records = cursor.fetchall()
+
+        return [dict(record) for record in records]
+
+    def get_user_rank(self, user_id, mode_name=None):
+        """사용자 순위 조회 (mode_name이 None이면 총 점수 기준)
+
+        Returns:
+            {'rank', 'score', 'total'} 또는 기록이 없으면 None
+        """
+        with self.transaction() as cursor:
+            if mode_name:
+                cursor.execute('''
+                    SELECT high_score AS score FROM high_scores
+                    WHERE user_id = ? AND mode_name = ?
+                ''', (user_id, mode_name))
+            else:
+                cursor.execute('SELECT total_score AS score FROM users WHERE user_id = ?', (user_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+
+            rank, total = self.leaderboard.rank(cursor, mode_name or None, row['score'])
 
+        return {'rank': rank, 'score': row['score'], 'total': total}
+
+    def get_leaderboard_page(self, mode_name, after_score=None, limit=10, after_user_id=None):
+        """리더보드 페이지 조회 (키셋 페이지네이션)
+
+        이전 페이지 마지막 행의 점수와 user_id를 넘기면 그 다음 행부터 반환한다.
+        정렬 없이 인덱스 순서대로 읽는다.
+        """
         if mode_name:
-            cursor.execute('''
-                SELECT u.username, h.high_score, h.best_accuracy, h.best_speed, h.achieved_at
+            query = '''
+                SELECT h.user_id, u.username, h.high_score, h.best_accuracy,
+                       h.best_speed, h.achieved_at
                 FROM high_scores h
                 JOIN users u ON h.user_id = u.user_id
-                WHERE h.mode_name = ?
-                ORDER BY h.high_score DESC
-                LIMIT ?
-            ''', (mode_name, limit))
+            '''
+            score_column, id_column = 'h.high_score', 'h.user_id'
+            conditions = ['h.mode_name = ?']
+            params = [mode_name]
         else:
-            cursor.execute('''
-                SELECT u.username, u.total_score, u.total_practice_time
+            query = '''
+                SELECT u.user_id, u.username, u.total_score, u.total_practice_time
                 FROM users u
-                ORDER BY u.total_score DESC
-                LIMIT ?
-            ''', (limit,))
+            '''
+            score_column, id_column = 'u.total_score', 'u.user_id'
+            conditions = []
+            params = []
+
+        if after_score is not None:
+            if after_user_id is None:
+                conditions.append(f'{score_column} < ?')
+                params.append(after_score)
+            else:
+                # 범위 조건을 따로 두어야 인덱스 탐색 범위가 좁혀진다
+                conditions.append(f'{score_column} <= ?')
+                conditions.append(f'({score_column} < ? OR {id_column} > ?)')
+                params.extend([after_score, after_score, after_user_id])
 
-        records = cursor.fetchall()
-        conn.close()
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += f' ORDER BY {score_column} DESC, {id_column} LIMIT ?'
+        params.append(limit)
+
+        with self.transaction() as cursor:
+            cursor.execute(query, params)
+            records = cursor.fetchall()
 
         return [dict(record) for record in records]
 
     # ========== 업적 관련 메서드 ==========
     def unlock_achievement(self, user_id, achievement_name, description):
-        """업적 해제"""
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-
+        """업적 해제 (이미 해제된 업적이면 False)"""
+        with self.transaction(immediate=True) as cursor:
             cursor.execute('''
-                INSERT INTO achievements (user_id, achievement_name, achievement_description)
+                INSERT OR IGNORE INTO achievements (user_id, achievement_name, achievement_description)
                 VALUES (?, ?, ?)
             ''', (user_id, achievement_name, description))
 
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.IntegrityError:
-            return False  # 이미 해제된 업적
+            return cursor.rowcount == 1
 
     def get_achievements(self, user_id):
         """사용자 업적 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT achievement_name, achievement_description, achieved_at
-            FROM achievements
-            WHERE user_id = ?
-            ORDER BY achieved_at DESC
-        ''', (user_id,))
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT achievement_name, achievement_description, achieved_at
+                FROM achievements
+                WHERE user_id = ?
+                ORDER BY achieved_at DESC
+            ''', (user_id,))
 
-        records = cursor.fetchall()
-        conn.close()
+            records = cursor.fetchall()
         return [dict(record) for record in records]
 
     def check_achievements(self, user_id):
-        """업적 달성 조건 체크 및 자동 해제"""
-        user_info = self.get_user_info(user_id)
-        if not user_info:
+        """업적 달성 조건 전체 체크 및 자동 해제 (새로 해제된 업적 이름 반환)"""
+        with self.transaction(immediate=True) as cursor:
+            metrics = self._get_achievement_metrics(cursor, user_id)
+            if metrics is None:
+                return []
+            return self._unlock_by_metrics(cursor, user_id, metrics)
+
+    def get_achievement_progress(self, user_id):
+        """업적 규칙별 진행도 조회 (잠긴 업적의 현재 값 포함)"""
+        with self.transaction() as cursor:
+            metrics = self._get_achievement_metrics(cursor, user_id) or {}
+            cursor.execute('''
+                SELECT achievement_name, achieved_at
+                FROM achievements
+                WHERE user_id = ?
+            ''', (user_id,))
+            achieved = {row['achievement_name']: row['achieved_at'] for row in cursor.fetchall()}
+
+        progress = []
+        for metric, threshold, name, description in ACHIEVEMENT_RULES:
+            current = metrics.get(metric) or 0
+            progress.append({
+                'name': name,
+                'description': description,
+                'metric': metric,
+                'threshold': threshold,
+                'current': current,
+                'progress': min(1.0, current / threshold) if threshold else 1.0,
+                'unlocked': name in achieved,
+                'achieved_at': achieved.get(name)
+            })
+        return progress
+
+    def _get_achievement_metrics(self, cursor, user_id):
+        """업적 규칙에 쓰이는 지표 값 조회"""
+        cursor.execute('''
+            SELECT total_score, total_practice_time, login_streak
+            FROM users
+            WHERE user_id = ?
+        ''', (user_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def _unlock_by_metrics(self, cursor, user_id, metrics):
+        """바뀐 지표 값에 해당하는 규칙만 평가하여 업적 일괄 해제
+
+        Args:
+            metrics: {지표 이름: 현재 값} - 바뀐 지표만 넘긴다
+
+        Returns:
+            새로 해제된 업적 이름 목록
+        """
+        candidates = [
+            (name, description)
+            for metric, threshold, name, description in ACHIEVEMENT_RULES
+            if metrics.get(metric) is not None and metrics[metric] >= threshold
+        ]
+        if not candidates:
             return []
 
-        unlocked = []
-
-        # 첫 발자국
-        if user_info['total_practice_time'] > 0:
-            if self.unlock_achievement(user_id, "첫 발자국", "첫 연습을 완료하였습니다"):
-                unlocked.append("첫 발자국")
-
-        # 타자 초보
-        if user_info['total_score'] >= 1000:
-            if self.unlock_achievement(user_id, "타자 초보", "총 점수 1000점 달성"):
-                unlocked.append("타자 초보")
-
-        # 타자 고수
-        if user_info['total_score'] >= 10000:
-            if self.unlock_achievement(user_id, "타자 고수", "총 점수 10000점 달성"):
-                unlocked.append("타자 고수")
-
-        # 타자 마스터
-        if user_info['total_score'] >= 50000:
-            if self.unlock_achievement(user_id, "타자 마스터", "총 점수 50000점 달성"):
-                unlocked.append("타자 마스터")
-
-        # 연습벌레
-        if user_info['total_practice_time'] >= 60:  # 1시간
-            if self.unlock_achievement(user_id, "연습벌레", "총 1시간 이상 연습"):
-                unlocked.append("연습벌레")
-
-        # 끈기왕
-        if user_info['total_practice_time'] >= 600:  # 10시간
-            if self.unlock_achievement(user_id, "끈기왕", "총 10시간 이상 연습"):
-                unlocked.append("끈기왕")
-
-        # 연속 로그인
-        if user_info['login_streak'] >= 7:
-            if self.unlock_achievement(user_id, "일주일 연속", "7일 연속 로그인"):
-                unlocked.append("일주일 연속")
+        cursor.execute('''
+            SELECT achievement_name FROM achievements WHERE user_id = ?
+        ''', (user_id,))
+        already_unlocked = {row['achievement_name'] for row in cursor.fetchall()}
 
-        if user_info['login_streak'] >= 30:
-            if self.unlock_achievement(user_id, "한 달 연속", "30일 연속 로그인"):
-                unlocked.append("한 달 연속")
+        new_achievements = [(name, description) for name, description in candidates
+                            if name not in already_unlocked]
+        if new_achievements:
+            cursor.executemany('''
+                INSERT OR IGNORE INTO achievements (user_id, achievement_name, achievement_description)
+                VALUES (?, ?, ?)
+            ''', [(user_id, name, description) for name, description in new_achievements])
 
-        return unlocked
+        return [name for name, _ in new_achievements]
 
     # ========== 일일 목표 관련 메서드 ==========
     def get_daily_goal(self, user_id):
         """오늘의 목표 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT goal_id, target_time, target_score, achieved_time, achieved_score, completed
-            FROM daily_goals
-            WHERE user_id = ? AND goal_date = DATE('now')
-        ''', (user_id,))
-
-        goal = cursor.fetchone()
-
-        if not goal:
-            # 오늘의 목표가 없으면 생성
-            cursor.execute('''
-                INSERT INTO daily_goals (user_id, goal_date, target_time, target_score)
-                VALUES (?, DATE('now'), 30, 100)
-            ''', (user_id,))
-            conn.commit()
-
+        with self.transaction() as cursor:
             cursor.execute('''
                 SELECT goal_id, target_time, target_score, achieved_time, achieved_score, completed
                 FROM daily_goals
                 WHERE user_id = ? AND goal_date = DATE('now')
             ''', (user_id,))
+
             goal = cursor.fetchone()
 
-        conn.close()
+        if not goal:
+            # 오늘의 목표가 없으면 생성 (쓰기 트랜잭션, 다른 프로세스가 먼저 만들었으면 그대로 사용)
+            with self.transaction(immediate=True) as cursor:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO daily_goals (user_id, goal_date, target_time, target_score)
+                    VALUES (?, DATE('now'), 30, 100)
+                ''', (user_id,))
+
+                cursor.execute('''
+                    SELECT goal_id, target_time, target_score, achieved_time, achieved_score, completed
+                    FROM daily_goals
+                    WHERE user_id = ? AND goal_date = DATE('now')
+                ''', (user_id,))
+                goal = cursor.fetchone()
+
         return dict(goal) if goal else None
 
     def update_daily_goal(self, user_id, time_to_add=0, score_to_add=0):
         """일일 목표 진행도 업데이트"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            UPDATE daily_goals
-            SET achieved_time = achieved_time + ?,
-                achieved_score = achieved_score + ?,
-                completed = CASE
-                    WHEN achieved_time + ? >= target_time AND achieved_score + ? >= target_score THEN 1
-                    ELSE 0
-                END
-            WHERE user_id = ? AND goal_date = DATE('now')
-        ''', (time_to_add, score_to_add, time_to_add, score_to_add, user_id))
-
-        conn.commit()
-        conn.close()
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                UPDATE daily_goals
+                SET achieved_time = achieved_time + ?,
+                    achieved_score = achieved_score + ?,
+                    completed = CASE
+                        WHEN achieved_time + ? >= target_time AND achieved_score + ? >= target_score THEN 1
+                        ELSE 0
+                    END
+                WHERE user_id = ? AND goal_date = DATE('now')
+            ''', (time_to_add, score_to_add, time_to_add, score_to_add, user_id))
 
     def set_daily_goal_targets(self, user_id, target_time, target_score):
         """일일 목표 설정"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            INSERT OR REPLACE INTO daily_goals
-            (user_id, goal_date, target_time, target_score, achieved_time, achieved_score)
-            VALUES (?, DATE('now'), ?, ?,
-                COALESCE((SELECT achieved_time FROM daily_goals WHERE user_id = ? AND goal_date = DATE('now')), 0),
-                COALESCE((SELECT achieved_score FROM daily_goals WHERE user_id = ? AND goal_date = DATE('now')), 0))
-        ''', (user_id, target_time, target_score, user_id, user_id))
-
-        conn.commit()
-        conn.close()
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                INSERT OR REPLACE INTO daily_goals
+                (user_id, goal_date, target_time, target_score, achieved_time, achieved_score)
+                VALUES (?, DATE('now'), ?, ?,
+                    COALESCE((SELECT achieved_time FROM daily_goals WHERE user_id = ? AND goal_date = DATE('now')), 0),
+                    COALESCE((SELECT achieved_score FROM daily_goals WHERE user_id = ? AND goal_date = DATE('now')), 0))
+            ''', (user_id, target_time, target_score, user_id, user_id))
 
     # ========== 키 통계 관련 메서드 ==========
     def update_key_stat(self, user_id, key_char, is_correct, press_time=0):
         """키 통계 업데이트"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        hist = new_histogram()
+        if press_time > 0:
+            hist[bucket_index(press_time)] += 1
 
-        cursor.execute('''
-            INSERT INTO key_statistics (user_id, key_char, total_presses, correct_presses, incorrect_presses, avg_time)
-            VALUES (?, ?, 1, ?, ?, ?)
-            ON CONFLICT(user_id, key_char)
-            DO UPDATE SET
-                total_presses = total_presses + 1,
-                correct_presses = correct_presses + ?,
-                incorrect_presses = incorrect_presses + ?,
-                avg_time = (avg_time * total_presses + ?) / (total_presses + 1),
-                last_updated = CURRENT_TIMESTAMP
-        ''', (user_id, key_char, 1 if is_correct else 0, 0 if is_correct else 1, press_time,
-              1 if is_correct else 0, 0 if is_correct else 1, press_time))
-
-        conn.commit()
-        conn.close()
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                INSERT INTO key_statistics
+                (user_id, key_char, total_presses, correct_presses, incorrect_presses, avg_time, latency_hist)
+                VALUES (?, ?, 1, ?, ?, ?, ?)
+                ON CONFLICT(user_id, key_char)
+                DO UPDATE SET
+                    total_presses = total_presses + 1,
+                    correct_presses = correct_presses + ?,
+                    incorrect_presses = incorrect_presses + ?,
+                    avg_time = (avg_time * total_presses + ?) / (total_presses + 1),
+                    latency_hist = latency_hist_merge(latency_hist, excluded.latency_hist),
+                    last_updated = CURRENT_TIMESTAMP
+            ''', (user_id, key_char, 1 if is_correct else 0, 0 if is_correct else 1, press_time, to_blob(hist),
+                  1 if is_correct else 0, 0 if is_correct else 1, press_time))
+
+    def record_key_stat(self, user_id, key_char, is_correct, press_time=0):
+        """키 통계 누적 (버퍼를 거쳐 일괄 반영)"""
+        self.key_stats.add_key(user_id, key_char, is_correct, press_time)
+
+    def flush_key_stats(self):
+        """누적된 키/손가락 통계 즉시 반영"""
+        return self.key_stats.flush()
+
+    def apply_key_stats(self, key_rows, finger_rows):
+        """키 통계 버퍼에서 모은 행을 한 트랜잭션으로 반영 (KeyStatsBuffer.flush 에서 호출)
+
+        Args:
+            key_rows: (user_id, key_char, 입력 수, 정타, 오타, 평균 시간, 히스토그램 BLOB) 목록
+            finger_rows: (user_id, finger_name, 입력 수, 정타, 평균 시간) 목록
+        """
+        with self.transaction(immediate=True) as cursor:
+            if key_rows:
+                cursor.executemany('''
+                    INSERT INTO key_statistics
+                    (user_id, key_char, total_presses, correct_presses, incorrect_presses, avg_time,
+                     latency_hist)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(user_id, key_char)
+                    DO UPDATE SET
+                        total_presses = total_presses + excluded.total_presses,
+                        correct_presses = correct_presses + excluded.correct_presses,
+                        incorrect_presses = incorrect_presses + excluded.incorrect_presses,
+                        avg_time = (avg_time * total_presses + excluded.avg_time * excluded.total_presses)
+                                   / (total_presses + excluded.total_presses),
+                        latency_hist = latency_hist_merge(latency_hist, excluded.latency_hist),
+                        last_updated = CURRENT_TIMESTAMP
+                ''', key_rows)
+
+            if finger_rows:
+                cursor.executemany('''
+                    INSERT INTO finger_statistics
+                    (user_id, finger_name, total_presses, correct_presses, avg_speed)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(user_id, finger_name)
+                    DO UPDATE SET
+                        total_presses = total_presses + excluded.total_presses,
+                        correct_presses = correct_presses + excluded.correct_presses,
+                        avg_speed = (avg_speed * total_presses + excluded.avg_speed * excluded.total_presses)
+                                    / (total_presses + excluded.total_presses)
+                ''', finger_rows)
 
     def get_key_statistics(self, user_id, limit=None):
         """키 통계 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        query = '''
-            SELECT key_char, total_presses, correct_presses, incorrect_presses, avg_time,
-                   ROUND(100.0 * correct_presses / total_presses, 2) as accuracy
-            FROM key_statistics
-            WHERE user_id = ?
-            ORDER BY total_presses DESC
-        '''
+        with self.transaction() as cursor:
+            query = '''
+                SELECT key_char, total_presses, correct_presses, incorrect_presses, avg_time,
+                       ROUND(100.0 * correct_presses / total_presses, 2) as accuracy
+                FROM key_statistics
+                WHERE user_id = ?
+                ORDER BY total_presses DESC
+            '''
 
-        if limit:
-            query += f' LIMIT {limit}'
+            if limit:
+                query += f' LIMIT {limit}'
 
-        cursor.execute(query, (user_id,))
-        records = cursor.fetchall()
-        conn.close()
+            cursor.execute(query, (user_id,))
+            records = cursor.fetchall()
 
         return [dict(record) for record in records]
 
     def get_weak_keys(self, user_id, limit=10):
         """약한 키 분석 (정확도 낮은 키)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT key_char, total_presses, correct_presses, incorrect_presses,
+                       ROUND(100.0 * correct_presses / total_presses, 2) as accuracy,
+                       avg_time
+                FROM key_statistics
+                WHERE user_id = ? AND total_presses >= 5
+                ORDER BY accuracy ASC, avg_time DESC
+                LIMIT ?
+            ''', (user_id, limit))
 
-        cursor.execute('''
-            SELECT key_char, total_presses, correct_presses, incorrect_presses,
-                   ROUND(100.0 * correct_presses / total_presses, 2) as accuracy,
-                   avg_time
-            FROM key_statistics
-            WHERE user_id = ? AND total_presses >= 5
-            ORDER BY accuracy ASC, avg_time DESC
-            LIMIT ?
-        ''', (user_id, limit))
-
-        records = cursor.fetchall()
-        conn.close()
+            records = cursor.fetchall()
         return [dict(record) for record in records]
 
-    def get_slow_keys(self, user_id, limit=10):
-        """느린 키 분석 (평균 시간 긴 키)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def get_key_latency(self, user_id, min_presses=5):
+        """키별 입력 간격 분위수 (p50/p90/p99 초, 일관성 점수)
 
-        cursor.execute('''
-            SELECT key_char, total_presses, avg_time,
-                   ROUND(100.0 * correct_presses / total_presses, 2) as accuracy
-            FROM key_statistics
-            WHERE user_id = ? AND total_presses >= 5
-            ORDER BY avg_time DESC
-            LIMIT ?
-        ''', (user_id, limit))
-
-        records = cursor.fetchall()
-        conn.close()
+        히스토그램이 없는 이전 기록은 분위수 대신 평균 시간을 쓰고 일관성은 None.
+        """
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT key_char, total_presses, avg_time, latency_hist,
+                       ROUND(100.0 * correct_presses / total_presses, 2) as accuracy
+                FROM key_statistics
+                WHERE user_id = ? AND total_presses >= ?
+            ''', (user_id, min_presses))
+            records = cursor.fetchall()
+
+        results = []
+        for record in records:
+            result = dict(record)
+            result.update(latency_summary(result.pop('latency_hist')))
+            if result['p50_time'] is None:
+                result['p50_time'] = result['p90_time'] = result['p99_time'] = result['avg_time']
+            results.append(result)
+        return results
+
+    def get_slow_keys(self, user_id, limit=10):
+        """느린 키 분석 (중앙값과 p90 의 평균이 긴 키)
+
+        평균 대신 분위수로 순위를 매기므로 한 번의 긴 멈춤에 흔들리지 않는다.
+        """
+        keys = self.get_key_latency(user_id)
+        keys.sort(key=lambda key: key['p50_time'] + key['p90_time'], reverse=True)
+        return keys[:limit]
+
+    # ========== 키 입력 로그 ==========
+    def save_session_keystrokes(self, user_id, mode_name, events, record_id=None):
+        """세션 키 입력 로그 저장 (session_id 반환)
+
+        Args:
+            events: (기대 글자, 입력 글자, 간격 ms) 목록
+            record_id: 연결할 practice_records 기록 (점수를 남기지 않는 세션은 None)
+        """
+        events = list(events)
+        data = encode_events(events)
+        duration_ms = sum(event[2] for event in events)
+
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                INSERT INTO session_keystrokes
+                (user_id, mode_name, record_id, event_count, duration_ms, data)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (user_id, mode_name, record_id, len(events), duration_ms, data))
+            return cursor.lastrowid
+
+    def get_keystroke_sessions(self, user_id, limit=20):
+        """키 입력 로그가 있는 최근 세션 목록 (BLOB 제외)"""
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT session_id, mode_name, record_id, event_count, duration_ms,
+                       LENGTH(data) as data_size, created_at
+                FROM session_keystrokes
+                WHERE user_id = ?
+                ORDER BY created_at DESC
+                LIMIT ?
+            ''', (user_id, limit))
+            records = cursor.fetchall()
         return [dict(record) for record in records]
 
+    def iter_session_keystrokes(self, session_id):
+        """세션의 키 입력 이벤트를 하나씩 반환 (기대 글자, 입력 글자, 간격 ms)"""
+        with self.transaction() as cursor:
+            cursor.execute('SELECT data FROM session_keystrokes WHERE session_id = ?', (session_id,))
+            row = cursor.fetchone()
+        if not row:
+            return iter(())
+        return iter_events(row['data'])
+
     # ========== 스트릭 관련 메서드 ==========
+    @writes('users')
     def update_login_streak(self, user_id):
-        """로그인 스트릭 업데이트"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        """로그인 스트릭 업데이트 (새로 해제된 업적 이름 반환)"""
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                SELECT last_practice_date, login_streak FROM users WHERE user_id = ?
+            ''', (user_id,))
 
-        cursor.execute('''
-            SELECT last_practice_date, login_streak FROM users WHERE user_id = ?
-        ''', (user_id,))
+            result = cursor.fetchone()
+            if not result:
+                return []
 
-        result = cursor.fetchone()
-        if result:
             last_date = result['last_practice_date']
             current_streak = result['login_streak']
 
@@ -670,272 +2209,521 @@ class Database:
 
                 if last_date_obj == today:
                     # 오늘 이미 로그인함
-                    pass
+                    return []
                 elif last_date_obj == today - timedelta(days=1):
                     # 어제 로그인 -> 스트릭 증가
                     current_streak += 1
-                    cursor.execute('''
-                        UPDATE users
-                        SET login_streak = ?, last_practice_date = DATE('now')
-                        WHERE user_id = ?
-                    ''', (current_streak, user_id))
                 else:
                     # 스트릭 끊김
-                    cursor.execute('''
-                        UPDATE users
-                        SET login_streak = 1, last_practice_date = DATE('now')
-                        WHERE user_id = ?
-                    ''', (user_id,))
+                    current_streak = 1
             else:
                 # 첫 로그인
-                cursor.execute('''
-                    UPDATE users
-                    SET login_streak = 1, last_practice_date = DATE('now')
-                    WHERE user_id = ?
-                ''', (user_id,))
+                current_streak = 1
+
+            cursor.execute('''
+                UPDATE users
+                SET login_streak = ?, last_practice_date = DATE('now')
+                WHERE user_id = ?
+            ''', (current_streak, user_id))
 
-        conn.commit()
-        conn.close()
+            return self._unlock_by_metrics(cursor, user_id, {'login_streak': current_streak})
 
     # ========== 사용자 정의 단어 리스트 ==========
     def create_custom_word_list(self, user_id, list_name, words):
-        """사용자 정의 단어 리스트 생성"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        """사용자 정의 단어 리스트 생성 (list_id 반환)
+
+        Args:
+            words: 단어 리스트 (문자열이면 쉼표로 구분)
+        """
+        if isinstance(words, str):
+            words = words.split(',')
+        return self.import_custom_words(user_id, list_name, words)['list_id']
+
+    def import_custom_words(self, user_id, list_name, lines):
+        """단어 대량 가져오기 (한 줄에 한 단어, 한 트랜잭션)
+
+        lines 를 순서대로 읽으며 바로 기록하므로 전체 단어를 메모리에 올리지 않는다.
+
+        Args:
+            lines: 단어 문자열 iterable (열린 텍스트 파일 등), 빈 줄은 건너뜀
+
+        Returns:
+            {'list_id', 'word_count', 'total_chars'}
+        """
+        totals = {'word_count': 0, 'total_chars': 0}
+
+        def word_rows(list_id):
+            for line in lines:
+                word = line.strip()
+                if not word:
+                    continue
+                yield list_id, totals['word_count'], word
+                totals['word_count'] += 1
+                totals['total_chars'] += len(word)
+
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                INSERT INTO custom_word_lists (user_id, list_name, words)
+                VALUES (?, ?, '')
+            ''', (user_id, list_name))
+            list_id = cursor.lastrowid
 
-        # 리스트를 쉼표로 구분된 문자열로 저장
-        words_str = ','.join(words) if isinstance(words, list) else words
+            cursor.executemany('''
+                INSERT INTO custom_words (list_id, position, word)
+                VALUES (?, ?, ?)
+            ''', word_rows(list_id))
 
-        cursor.execute('''
-            INSERT INTO custom_word_lists (user_id, list_name, words)
-            VALUES (?, ?, ?)
-        ''', (user_id, list_name, words_str))
+            cursor.execute('''
+                UPDATE custom_word_lists
+                SET word_count = ?, total_chars = ?
+                WHERE list_id = ?
+            ''', (totals['word_count'], totals['total_chars'], list_id))
 
-        conn.commit()
-        conn.close()
+        return {'list_id': list_id, **totals}
 
     def get_custom_word_lists(self, user_id):
-        """사용자의 커스텀 단어 리스트 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT list_id, list_name, words, created_at
-            FROM custom_word_lists
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-        ''', (user_id,))
+        """사용자의 커스텀 단어 리스트 목록 (단어 없이 메타데이터만)"""
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT list_id, list_name, word_count, total_chars, created_at
+                FROM custom_word_lists
+                WHERE user_id = ?
+                ORDER BY created_at DESC
+            ''', (user_id,))
 
-        records = cursor.fetchall()
-        conn.close()
+            records = cursor.fetchall()
 
-        result = []
-        for record in records:
-            data = dict(record)
-            data['words'] = data['words'].split(',')
-            result.append(data)
+        return [dict(record) for record in records]
 
-        return result
+    def get_custom_words(self, list_id, offset=0, limit=100):
+        """리스트의 단어를 위치 순서로 일부만 조회 (position >= offset)"""
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT word FROM custom_words
+                WHERE list_id = ? AND position >= ?
+                ORDER BY position
+                LIMIT ?
+            ''', (list_id, offset, limit))
+
+            return [row['word'] for row in cursor.fetchall()]
+
+    def sample_custom_words(self, list_id, count):
+        """리스트에서 무작위 단어 count개 (뽑은 위치만 조회)"""
+        with self.transaction() as cursor:
+            cursor.execute('SELECT word_count FROM custom_word_lists WHERE list_id = ?', (list_id,))
+            row = cursor.fetchone()
+            if not row:
+                return []
+
+            positions = random.sample(range(row['word_count']), min(count, row['word_count']))
+            words = {}
+            for start in range(0, len(positions), 500):
+                chunk = positions[start:start + 500]
+                cursor.execute(f'''
+                    SELECT position, word FROM custom_words
+                    WHERE list_id = ? AND position IN ({', '.join('?' * len(chunk))})
+                ''', (list_id, *chunk))
+                words.update((row['position'], row['word']) for row in cursor.fetchall())
+
+        return [words[position] for position in positions if position in words]
 
     def delete_custom_word_list(self, list_id):
         """커스텀 단어 리스트 삭제"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('DELETE FROM custom_words WHERE list_id = ?', (list_id,))
+            cursor.execute('DELETE FROM custom_word_lists WHERE list_id = ?', (list_id,))
+
+    def search_custom_words(self, user_id, query, prefix=True, limit=20):
+        """사용자의 단어 리스트에서 낱말 검색 (어느 리스트에 있는지)
 
-        cursor.execute('DELETE FROM custom_word_lists WHERE list_id = ?', (list_id,))
+        검색어와 같은 낱말, 짧은 낱말 순으로 반환한다.
 
-        conn.commit()
-        conn.close()
+        Returns:
+            [{'list_id', 'list_name', 'position', 'word'}]
+        """
+        match = fts_query(query, prefix=prefix)
+        if match is None:
+            return []
+        with self.transaction() as cursor:
+            cursor.execute(f'''
+                SELECT l.list_id, l.list_name, w.position, w.word
+                FROM custom_words_fts f
+                JOIN custom_words w
+                    ON w.list_id = f.rowid / {WORD_ROWID_BASE} AND w.position = f.rowid % {WORD_ROWID_BASE}
+                JOIN custom_word_lists l ON l.list_id = w.list_id
+                WHERE custom_words_fts MATCH ? AND l.user_id = ?
+                ORDER BY w.word != ?, LENGTH(w.word), l.list_id, w.position
+                LIMIT ?
+            ''', (match, user_id, unicodedata.normalize('NFC', query.strip()), limit))
+
+            return [dict(row) for row in cursor.fetchall()]
+
+    # ========== 연습 지문 ==========
+    def import_practice_passages(self, user_id, passages):
+        """연습 지문 대량 가져오기 (한 트랜잭션, 검색 색인은 트리거가 갱신)
+
+        Args:
+            user_id: 지문을 소유할 사용자 (None 이면 모든 사용자 공용)
+            passages: (제목, 본문) iterable, 본문이 빈 항목은 건너뜀
+
+        Returns:
+            {'passage_count', 'total_chars'}
+        """
+        totals = {'passage_count': 0, 'total_chars': 0}
+
+        def passage_rows():
+            for title, content in passages:
+                # 맥에서 만든 파일은 한글이 자모로 풀려 있을 수 있으므로 완성형으로 맞춤
+                content = unicodedata.normalize('NFC', content.strip())
+                if not content:
+                    continue
+                totals['passage_count'] += 1
+                totals['total_chars'] += len(content)
+                yield user_id, unicodedata.normalize('NFC', title.strip()), content, len(content)
+
+        with self.transaction(immediate=True) as cursor:
+            cursor.executemany('''
+                INSERT INTO practice_passages (user_id, title, content, char_count)
+                VALUES (?, ?, ?, ?)
+            ''', passage_rows())
+
+        return totals
+
+    def get_practice_passage(self, passage_id):
+        """연습 지문 하나 조회"""
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT passage_id, user_id, title, content, char_count, created_at
+                FROM practice_passages
+                WHERE passage_id = ?
+            ''', (passage_id,))
+
+            row = cursor.fetchone()
+
+        return dict(row) if row else None
+
+    def delete_practice_passage(self, passage_id):
+        """연습 지문 삭제"""
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('DELETE FROM practice_passages WHERE passage_id = ?', (passage_id,))
+
+    def search_practice_passages(self, query, user_id=None, prefix=True, phrase=False, limit=20):
+        """연습 지문 전문 검색 (관련도 순, BM25 - 제목 일치에 가중치)
+
+        일치하는 지문이 아주 많으면 최근 SEARCH_RANK_CANDIDATES 개 중에서 순위를 매긴다.
+
+        Args:
+            user_id: 공용 지문과 이 사용자의 지문만 검색 (None 이면 전체)
+            prefix: 낱말을 접두어로 검색 (조사가 붙은 어절도 찾음)
+            phrase: 낱말이 입력한 순서대로 붙어 있는 지문만 찾음
+
+        Returns:
+            [{'passage_id', 'title', 'char_count', 'snippet', 'score'}] - snippet 은 일치 부분을 [ ] 로 표시
+        """
+        match = fts_query(query, prefix=prefix, phrase=phrase)
+        if match is None:
+            return []
+        with self.transaction() as cursor:
+            # 일치하는 지문이 SEARCH_RANK_CANDIDATES 개를 넘으면 최근 지문부터 그만큼만 후보로
+            cursor.execute('''
+                SELECT practice_passages_fts.rowid AS cutoff
+                FROM practice_passages_fts
+                JOIN practice_passages p ON p.passage_id = practice_passages_fts.rowid
+                WHERE practice_passages_fts MATCH ?
+                  AND (? IS NULL OR p.user_id IS NULL OR p.user_id = ?)
+                ORDER BY practice_passages_fts.rowid DESC
+                LIMIT 1 OFFSET ?
+            ''', (match, user_id, user_id, SEARCH_RANK_CANDIDATES - 1))
+            row = cursor.fetchone()
+            cutoff = row['cutoff'] if row else 0
+
+            cursor.execute('''
+                SELECT p.passage_id, p.title, p.char_count,
+                       snippet(practice_passages_fts, 1, '[', ']', '…', 12) AS snippet,
+                       -bm25(practice_passages_fts, 3.0, 1.0) AS score
+                FROM practice_passages_fts
+                JOIN practice_passages p ON p.passage_id = practice_passages_fts.rowid
+                WHERE practice_passages_fts MATCH ?
+                  AND practice_passages_fts.rowid >= ?
+                  AND (? IS NULL OR p.user_id IS NULL OR p.user_id = ?)
+                ORDER BY score DESC
+                LIMIT ?
+            ''', (match, cutoff, user_id, user_id, limit))
+
+            return [dict(row) for row in cursor.fetchall()]
 
     # ========== 테마 설정 ==========
+    @writes('users')
     def update_theme(self, user_id, theme):
         """사용자 테마 업데이트"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            UPDATE users SET theme = ? WHERE user_id = ?
-        ''', (theme, user_id))
-
-        conn.commit()
-        conn.close()
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                UPDATE users SET theme = ? WHERE user_id = ?
+            ''', (theme, user_id))
 
+    @cached_read('users')
     def get_user_theme(self, user_id):
         """사용자 테마 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT theme FROM users WHERE user_id = ?', (user_id,))
-        result = cursor.fetchone()
-        conn.close()
+        with self.transaction() as cursor:
+            cursor.execute('SELECT theme FROM users WHERE user_id = ?', (user_id,))
+            result = cursor.fetchone()
 
         return result['theme'] if result else 'light'
 
     # ========== 사용자 설정 ==========
+    @cached_read('user_settings')
     def get_user_settings(self, user_id):
         """사용자 설정 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT sound_enabled, volume, font_size
-            FROM user_settings
-            WHERE user_id = ?
-        ''', (user_id,))
-
-        result = cursor.fetchone()
-
-        if not result:
-            # 기본 설정 생성
-            cursor.execute('''
-                INSERT INTO user_settings (user_id, sound_enabled, volume, font_size)
-                VALUES (?, 1, 50, 12)
-            ''', (user_id,))
-            conn.commit()
-
+        with self.transaction() as cursor:
             cursor.execute('''
                 SELECT sound_enabled, volume, font_size
                 FROM user_settings
                 WHERE user_id = ?
             ''', (user_id,))
+
             result = cursor.fetchone()
 
-        conn.close()
+        if not result:
+            # 기본 설정 생성
+            with self.transaction(immediate=True) as cursor:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO user_settings (user_id, sound_enabled, volume, font_size)
+                    VALUES (?, 1, 50, 12)
+                ''', (user_id,))
+
+                cursor.execute('''
+                    SELECT sound_enabled, volume, font_size
+                    FROM user_settings
+                    WHERE user_id = ?
+                ''', (user_id,))
+                result = cursor.fetchone()
+
         return dict(result) if result else None
 
+    @writes('user_settings')
     def update_user_settings(self, user_id, sound_enabled=None, volume=None, font_size=None):
         """사용자 설정 업데이트"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        updates = []
-        params = []
-
-        if sound_enabled is not None:
-            updates.append('sound_enabled = ?')
-            params.append(sound_enabled)
-        if volume is not None:
-            updates.append('volume = ?')
-            params.append(volume)
-        if font_size is not None:
-            updates.append('font_size = ?')
-            params.append(font_size)
-
-        if updates:
-            params.append(user_id)
-            query = f"UPDATE user_settings SET {', '.join(updates)} WHERE user_id = ?"
-            cursor.execute(query, params)
-            conn.commit()
-
-        conn.close()
+        with self.transaction(immediate=True) as cursor:
+            updates = []
+            params = []
+
+            if sound_enabled is not None:
+                updates.append('sound_enabled = ?')
+                params.append(sound_enabled)
+            if volume is not None:
+                updates.append('volume = ?')
+                params.append(volume)
+            if font_size is not None:
+                updates.append('font_size = ?')
+                params.append(font_size)
+
+            if updates:
+                params.append(user_id)
+                query = f"UPDATE user_settings SET {', '.join(updates)} WHERE user_id = ?"
+                cursor.execute(query, params)
+
+    def save_user_settings(self, user_id, theme=None, **settings):
+        """사용자 설정과 테마를 한 트랜잭션으로 저장 (데몬 사용 시 쓰기 요청 하나)"""
+        with self.transaction(immediate=True):
+            if settings:
+                self.update_user_settings(user_id, **settings)
+            if theme is not None:
+                self.update_theme(user_id, theme)
 
     # ========== 통계 대시보드용 데이터 ==========
     def get_practice_history(self, user_id, days=7):
-        """최근 N일간의 연습 기록"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        """최근 N일간의 연습 기록 (일별 집계 테이블 사용)"""
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT stat_date as practice_date,
+                       SUM(session_count) as session_count,
+                       SUM(score_sum) as total_score,
+                       SUM(accuracy_sum) / SUM(session_count) as avg_accuracy,
+                       1.0 * SUM(speed_sum) / SUM(session_count) as avg_speed,
+                       SUM(time_sum) as total_time
+                FROM daily_user_stats
+                WHERE user_id = ? AND stat_date >= DATE('now', '-' || ? || ' days')
+                GROUP BY stat_date
+                ORDER BY stat_date DESC
+            ''', (user_id, days))
+
+            records = cursor.fetchall()
 
-        cursor.execute('''
-            SELECT DATE(created_at) as practice_date,
-                   COUNT(*) as session_count,
-                   SUM(score) as total_score,
-                   AVG(accuracy) as avg_accuracy,
-                   AVG(speed) as avg_speed,
-                   SUM(practice_time) as total_time
-            FROM practice_records
-            WHERE user_id = ? AND created_at >= DATE('now', '-' || ? || ' days')
-            GROUP BY DATE(created_at)
-            ORDER BY practice_date DESC
-        ''', (user_id, days))
+        return [dict(record) for record in records]
 
-        records = cursor.fetchall()
-        conn.close()
+    def get_practice_summary(self, user_id, days=7):
+        """최근 N일간의 합계 (세션 수 가중 평균)"""
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT COALESCE(SUM(session_count), 0) as session_count,
+                       COALESCE(SUM(score_sum), 0) as total_score,
+                       COALESCE(SUM(time_sum), 0) as total_time,
+                       COALESCE(SUM(accuracy_sum) / SUM(session_count), 0) as avg_accuracy,
+                       COALESCE(1.0 * SUM(speed_sum) / SUM(session_count), 0) as avg_speed
+                FROM daily_user_stats
+                WHERE user_id = ? AND stat_date >= DATE('now', '-' || ? || ' days')
+            ''', (user_id, days))
 
-        return [dict(record) for record in records]
+            result = cursor.fetchone()
 
-    def get_mode_distribution(self, user_id):
-        """모드별 연습 분포"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        return dict(result)
 
-        cursor.execute('''
-            SELECT mode_name, COUNT(*) as count, SUM(practice_time) as total_time
-            FROM practice_records
-            WHERE user_id = ?
-            GROUP BY mode_name
-            ORDER BY count DESC
-        ''', (user_id,))
+    def get_mode_distribution(self, user_id):
+        """모드별 연습 분포 (일별 집계 테이블 사용)"""
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT mode_name, SUM(session_count) as count, SUM(time_sum) as total_time
+                FROM daily_user_stats
+                WHERE user_id = ?
+                GROUP BY mode_name
+                ORDER BY count DESC
+            ''', (user_id,))
 
-        records = cursor.fetchall()
-        conn.close()
+            records = cursor.fetchall()
 
         return [dict(record) for record in records]
 
+    def rebuild_daily_stats(self):
+        """일별 집계 테이블을 연습 기록에서 다시 계산 (집계 행 수 반환)
+
+        원본 기록이 정리된 날짜(compacted_before 이전)의 집계는 그대로 두되,
+        그 이전이라도 원본 기록이 집계보다 많이 남은 (사용자, 날짜, 모드) 는
+        집계가 빠진 것이므로 원본에서 다시 계산한다.
+        """
+        with self.transaction(immediate=True) as cursor:
+            since = self._get_compacted_before(cursor) or ''
+            cursor.execute('DELETE FROM daily_user_stats WHERE stat_date >= ?', (since,))
+            cursor.execute(DAILY_STATS_REBUILD_SQL, (since,))
+
+            if since:
+                cursor.execute('DROP TABLE IF EXISTS temp.uncovered_days')
+                cursor.execute(f'CREATE TEMP TABLE uncovered_days AS {UNCOVERED_DAILY_STATS_SQL}', (since,))
+                cursor.execute('''
+                    DELETE FROM daily_user_stats
+                    WHERE (user_id, stat_date, mode_name) IN (SELECT * FROM temp.uncovered_days)
+                ''')
+                cursor.execute('''
+                    INSERT INTO daily_user_stats
+                    (user_id, stat_date, mode_name, session_count, score_sum, accuracy_sum, speed_sum, time_sum)
+                    SELECT p.user_id, u.stat_date, p.mode_name, COUNT(*), SUM(p.score),
+                           SUM(p.accuracy), SUM(p.speed), SUM(p.practice_time)
+                    FROM temp.uncovered_days u
+                    JOIN practice_records p
+                        ON p.user_id = u.user_id AND p.mode_name = u.mode_name
+                       AND p.created_at >= u.stat_date AND p.created_at < DATE(u.stat_date, '+1 day')
+                    GROUP BY p.user_id, u.stat_date, p.mode_name
+                ''')
+                cursor.execute('DROP TABLE temp.uncovered_days')
+
+            # 집계 트리거가 누적 점수를 다시 썼으므로 메모리 캐시는 커밋 후 모두 버림
+            self.call_on_commit(self.cache.clear)
+            self.call_on_commit(lambda: self.leaderboard.invalidate(all_modes=True))
+            cursor.execute('SELECT COUNT(*) FROM daily_user_stats')
+            return cursor.fetchone()[0]
+
+    def _get_compacted_before(self, cursor):
+        """원본 기록이 정리된 기준일 (정리한 적 없으면 None)"""
+        cursor.execute("SELECT value FROM maintenance_state WHERE key = 'compacted_before'")
+        row = cursor.fetchone()
+        return row['value'] if row else None
+
+    # ========== 파생 값 ==========
+    def _derived_params(self, cursor):
+        """DERIVED_VALUES SQL 인자 (정리 기준일과 정확 계산 여부)"""
+        since = self._get_compacted_before(cursor)
+        return {'since': since or '', 'exact': int(since is None)}
+
+    def verify_derived(self, examples=5):
+        """파생 값이 원본 행과 어긋난 곳 점검 (바꾸지 않음)
+
+        Returns:
+            {항목: {'rows': 어긋난 행 수, 'examples': 앞쪽 행 목록 (examples 개까지)}}
+        """
+        report = {}
+        with self.transaction() as cursor:
+            params = self._derived_params(cursor)
+            for name, drift_sql, _ in DERIVED_VALUES:
+                cursor.execute(drift_sql, params)
+                rows = 0
+                samples = []
+                for row in cursor:
+                    rows += 1
+                    if len(samples) < examples:
+                        samples.append(dict(row))
+                report[name] = {'rows': rows, 'examples': samples}
+        return report
+
+    def rebuild_derived(self):
+        """파생 값 전체를 원본 행에서 한 트랜잭션으로 다시 계산 (항목별 고친 행 수 반환)
+
+        항목마다 어긋난 행을 한 번 계산해 임시 테이블에 담고 그 행만 고친다.
+        """
+        with self.transaction(immediate=True) as cursor:
+            fixed = fix_derived_values(cursor, self._derived_params(cursor))
+
+            # 점수가 바뀌었을 수 있으므로 메모리 캐시는 커밋 후 모두 버림
+            self.call_on_commit(self.cache.clear)
+            self.call_on_commit(lambda: self.leaderboard.invalidate(all_modes=True))
+        return fixed
+
     # ========== 레벨 시스템 ==========
     def get_user_level(self, user_id):
         """사용자 레벨 정보 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT current_level, current_exp, total_exp
-            FROM user_levels
-            WHERE user_id = ?
-        ''', (user_id,))
-
-        result = cursor.fetchone()
-
-        if not result:
-            # 레벨 정보가 없으면 생성
-            cursor.execute('''
-                INSERT INTO user_levels (user_id, current_level, current_exp, total_exp)
-                VALUES (?, 1, 0, 0)
-            ''', (user_id,))
-            conn.commit()
-
+        with self.transaction() as cursor:
             cursor.execute('''
                 SELECT current_level, current_exp, total_exp
                 FROM user_levels
                 WHERE user_id = ?
             ''', (user_id,))
+
             result = cursor.fetchone()
 
-        conn.close()
+        if not result:
+            # 레벨 정보가 없으면 생성
+            with self.transaction(immediate=True) as cursor:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO user_levels (user_id, current_level, current_exp, total_exp)
+                    VALUES (?, 1, 0, 0)
+                ''', (user_id,))
+
+                cursor.execute('''
+                    SELECT current_level, current_exp, total_exp
+                    FROM user_levels
+                    WHERE user_id = ?
+                ''', (user_id,))
+                result = cursor.fetchone()
+
         return dict(result) if result else None
 
     def add_exp(self, user_id, exp_amount):
         """경험치 추가 및 레벨업 처리"""
-        level_info = self.get_user_level(user_id)
-        if not level_info:
-            return None
-
-        current_level = level_info['current_level']
-        current_exp = level_info['current_exp']
-        total_exp = level_info['total_exp']
+        with self.transaction(immediate=True) as cursor:
+            # 조회와 갱신을 같은 트랜잭션에서 수행 (동시 갱신 손실 방지)
+            level_info = self.get_user_level(user_id)
+            if not level_info:
+                return None
 
-        new_current_exp = current_exp + exp_amount
-        new_total_exp = total_exp + exp_amount
+            current_level = level_info['current_level']
+            current_exp = level_info['current_exp']
+            total_exp = level_info['total_exp']
 
-        # 레벨업 계산 (각 레벨당 필요 경험치: level * 100)
-        leveled_up = False
-        new_level = current_level
+            new_current_exp = current_exp + exp_amount
+            new_total_exp = total_exp + exp_amount
 
-        while new_current_exp >= new_level * 100:
-            new_current_exp -= new_level * 100
-            new_level += 1
-            leveled_up = True
+            # 레벨업 계산 (각 레벨당 필요 경험치: level * 100)
+            leveled_up = False
+            new_level = current_level
 
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            UPDATE user_levels
-            SET current_level = ?, current_exp = ?, total_exp = ?
-            WHERE user_id = ?
-        ''', (new_level, new_current_exp, new_total_exp, user_id))
+            while new_current_exp >= new_level * 100:
+                new_current_exp -= new_level * 100
+                new_level += 1
+                leveled_up = True
 
-        conn.commit()
-        conn.close()
+            cursor.execute('''
+                UPDATE user_levels
+                SET current_level = ?, current_exp = ?, total_exp = ?
+                WHERE user_id = ?
+            ''', (new_level, new_current_exp, new_total_exp, user_id))
 
         return {
             'leveled_up': leveled_up,
@@ -946,110 +2734,88 @@ class Database:
 
     def get_level_leaderboard(self, limit=10):
         """레벨 리더보드"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT u.username, l.current_level, l.total_exp
-            FROM user_levels l
-            JOIN users u ON l.user_id = u.user_id
-            ORDER BY l.current_level DESC, l.total_exp DESC
-            LIMIT ?
-        ''', (limit,))
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT u.username, l.current_level, l.total_exp
+                FROM user_levels l
+                JOIN users u ON l.user_id = u.user_id
+                ORDER BY l.current_level DESC, l.total_exp DESC
+                LIMIT ?
+            ''', (limit,))
 
-        records = cursor.fetchall()
-        conn.close()
+            records = cursor.fetchall()
 
         return [dict(record) for record in records]
 
     # ========== 친구 시스템 ==========
     def send_friend_request(self, user_id, friend_username):
         """친구 요청 보내기"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        # 친구 ID 찾기
-        cursor.execute('SELECT user_id FROM users WHERE username = ?', (friend_username,))
-        friend = cursor.fetchone()
+        with self.transaction(immediate=True) as cursor:
+            # 친구 ID 찾기
+            cursor.execute('SELECT user_id FROM users WHERE username = ?', (friend_username,))
+            friend = cursor.fetchone()
 
-        if not friend:
-            conn.close()
-            return False, "사용자를 찾을 수 없습니다."
+            if not friend:
+                return False, "사용자를 찾을 수 없습니다."
 
-        friend_id = friend['user_id']
+            friend_id = friend['user_id']
 
-        if friend_id == user_id:
-            conn.close()
-            return False, "자기 자신에게 친구 요청을 보낼 수 없습니다."
+            if friend_id == user_id:
+                return False, "자기 자신에게 친구 요청을 보낼 수 없습니다."
 
-        try:
-            cursor.execute('''
-                INSERT INTO friendships (user_id, friend_id, status)
-                VALUES (?, ?, 'pending')
-            ''', (user_id, friend_id))
-            conn.commit()
-            conn.close()
-            return True, "친구 요청을 보냈습니다."
-        except sqlite3.IntegrityError:
-            conn.close()
-            return False, "이미 친구 요청을 보냈거나 친구입니다."
+            try:
+                cursor.execute('''
+                    INSERT INTO friendships (user_id, friend_id, status)
+                    VALUES (?, ?, 'pending')
+                ''', (user_id, friend_id))
+                return True, "친구 요청을 보냈습니다."
+            except sqlite3.IntegrityError:
+                return False, "이미 친구 요청을 보냈거나 친구입니다."
 
     def accept_friend_request(self, user_id, friend_id):
         """친구 요청 수락"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            UPDATE friendships
-            SET status = 'accepted', accepted_at = CURRENT_TIMESTAMP
-            WHERE friend_id = ? AND user_id = ? AND status = 'pending'
-        ''', (user_id, friend_id))
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                UPDATE friendships
+                SET status = 'accepted', accepted_at = CURRENT_TIMESTAMP
+                WHERE friend_id = ? AND user_id = ? AND status = 'pending'
+            ''', (user_id, friend_id))
 
-        # 양방향 친구 관계 생성
-        try:
+            # 양방향 친구 관계 생성 (반대 방향 요청이 이미 있으면 수락 상태로)
             cursor.execute('''
                 INSERT INTO friendships (user_id, friend_id, status, accepted_at)
                 VALUES (?, ?, 'accepted', CURRENT_TIMESTAMP)
+                ON CONFLICT(user_id, friend_id)
+                DO UPDATE SET status = 'accepted', accepted_at = COALESCE(accepted_at, excluded.accepted_at)
             ''', (user_id, friend_id))
-        except:
-            pass
-
-        conn.commit()
-        conn.close()
 
     def get_friends(self, user_id):
         """친구 목록 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT u.user_id, u.username, u.total_score, f.accepted_at
-            FROM friendships f
-            JOIN users u ON f.friend_id = u.user_id
-            WHERE f.user_id = ? AND f.status = 'accepted'
-            ORDER BY f.accepted_at DESC
-        ''', (user_id,))
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT u.user_id, u.username, u.total_score, f.accepted_at
+                FROM friendships f
+                JOIN users u ON f.friend_id = u.user_id
+                WHERE f.user_id = ? AND f.status = 'accepted'
+                ORDER BY f.accepted_at DESC
+            ''', (user_id,))
 
-        records = cursor.fetchall()
-        conn.close()
+            records = cursor.fetchall()
 
         return [dict(record) for record in records]
 
     def get_friend_requests(self, user_id):
         """받은 친구 요청 목록"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT u.user_id, u.username, u.total_score, f.requested_at
-            FROM friendships f
-            JOIN users u ON f.user_id = u.user_id
-            WHERE f.friend_id = ? AND f.status = 'pending'
-            ORDER BY f.requested_at DESC
-        ''', (user_id,))
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT u.user_id, u.username, u.total_score, f.requested_at
+                FROM friendships f
+                JOIN users u ON f.user_id = u.user_id
+                WHERE f.friend_id = ? AND f.status = 'pending'
+                ORDER BY f.requested_at DESC
+            ''', (user_id,))
 
-        records = cursor.fetchall()
-        conn.close()
+            records = cursor.fetchall()
 
         return [dict(record) for record in records]
 
@@ -1057,24 +2823,20 @@ class Database:
     def create_clan(self, clan_name, description, leader_id):
         """클랜 생성"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                INSERT INTO clans (clan_name, description, leader_id)
-                VALUES (?, ?, ?)
-            ''', (clan_name, description, leader_id))
+            with self.transaction(immediate=True) as cursor:
+                cursor.execute('''
+                    INSERT INTO clans (clan_name, description, leader_id)
+                    VALUES (?, ?, ?)
+                ''', (clan_name, description, leader_id))
 
-            clan_id = cursor.lastrowid
+                clan_id = cursor.lastrowid
 
-            # 리더를 멤버로 추가
-            cursor.execute('''
-                INSERT INTO clan_members (clan_id, user_id, role)
-                VALUES (?, ?, 'leader')
-            ''', (clan_id, leader_id))
+                # 리더를 멤버로 추가
+                cursor.execute('''
+                    INSERT INTO clan_members (clan_id, user_id, role)
+                    VALUES (?, ?, 'leader')
+                ''', (clan_id, leader_id))
 
-            conn.commit()
-            conn.close()
             return True, clan_id
         except sqlite3.IntegrityError:
             return False, "이미 존재하는 클랜 이름이거나 이미 클랜에 소속되어 있습니다."
@@ -1082,143 +2844,115 @@ class Database:
     def join_clan(self, clan_id, user_id):
         """클랜 가입"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                INSERT INTO clan_members (clan_id, user_id, role)
-                VALUES (?, ?, 'member')
-            ''', (clan_id, user_id))
-
-            cursor.execute('''
-                UPDATE clans
-                SET total_members = total_members + 1
-                WHERE clan_id = ?
-            ''', (clan_id,))
+            with self.transaction(immediate=True) as cursor:
+                # 멤버 수는 트리거가 갱신
+                cursor.execute('''
+                    INSERT INTO clan_members (clan_id, user_id, role)
+                    VALUES (?, ?, 'member')
+                ''', (clan_id, user_id))
 
-            conn.commit()
-            conn.close()
             return True
         except sqlite3.IntegrityError:
             return False
 
     def get_user_clan(self, user_id):
         """사용자가 속한 클랜 정보"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT c.clan_id, c.clan_name, c.description, c.total_members,
-                   cm.role, cm.contribution
-            FROM clan_members cm
-            JOIN clans c ON cm.clan_id = c.clan_id
-            WHERE cm.user_id = ?
-        ''', (user_id,))
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT c.clan_id, c.clan_name, c.description, c.total_members,
+                       cm.role, cm.contribution
+                FROM clan_members cm
+                JOIN clans c ON cm.clan_id = c.clan_id
+                WHERE cm.user_id = ?
+            ''', (user_id,))
 
-        result = cursor.fetchone()
-        conn.close()
+            result = cursor.fetchone()
 
         return dict(result) if result else None
 
     def get_clan_members(self, clan_id):
         """클랜 멤버 목록"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT u.username, cm.role, cm.contribution, cm.joined_at
-            FROM clan_members cm
-            JOIN users u ON cm.user_id = u.user_id
-            WHERE cm.clan_id = ?
-            ORDER BY cm.contribution DESC
-        ''', (clan_id,))
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT u.username, cm.role, cm.contribution, cm.joined_at
+                FROM clan_members cm
+                JOIN users u ON cm.user_id = u.user_id
+                WHERE cm.clan_id = ?
+                ORDER BY cm.contribution DESC
+            ''', (clan_id,))
 
-        records = cursor.fetchall()
-        conn.close()
+            records = cursor.fetchall()
 
         return [dict(record) for record in records]
 
     # ========== 시즌 패스 ==========
     def get_season_pass(self, user_id, season_number=1):
         """시즌 패스 정보 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT tier, season_exp, is_premium
-            FROM season_pass
-            WHERE user_id = ? AND season_number = ?
-        ''', (user_id, season_number))
-
-        result = cursor.fetchone()
-
-        if not result:
-            # 시즌 패스 정보가 없으면 생성
-            cursor.execute('''
-                INSERT INTO season_pass (user_id, season_number, tier, season_exp)
-                VALUES (?, ?, 0, 0)
-            ''', (user_id, season_number))
-            conn.commit()
-
+        with self.transaction() as cursor:
             cursor.execute('''
                 SELECT tier, season_exp, is_premium
                 FROM season_pass
                 WHERE user_id = ? AND season_number = ?
             ''', (user_id, season_number))
+
             result = cursor.fetchone()
 
-        conn.close()
-        return dict(result) if result else None
+        if not result:
+            # 시즌 패스 정보가 없으면 생성
+            with self.transaction(immediate=True) as cursor:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO season_pass (user_id, season_number, tier, season_exp)
+                    VALUES (?, ?, 0, 0)
+                ''', (user_id, season_number))
 
-    def add_season_exp(self, user_id, exp_amount, season_number=1):
-        """시즌 경험치 추가"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT tier, season_exp, is_premium
+                    FROM season_pass
+                    WHERE user_id = ? AND season_number = ?
+                ''', (user_id, season_number))
+                result = cursor.fetchone()
 
-        cursor.execute('''
-            UPDATE season_pass
-            SET season_exp = season_exp + ?,
-                tier = (season_exp + ?) / 100
-            WHERE user_id = ? AND season_number = ?
-        ''', (exp_amount, exp_amount, user_id, season_number))
+        return dict(result) if result else None
 
-        conn.commit()
-        conn.close()
+    def add_season_exp(self, user_id, exp_amount, season_number=1):
+        """시즌 경험치 추가 (티어는 트리거가 갱신)"""
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                UPDATE season_pass
+                SET season_exp = season_exp + ?
+                WHERE user_id = ? AND season_number = ?
+            ''', (exp_amount, user_id, season_number))
 
     # ========== 손가락별 통계 ==========
     def update_finger_stat(self, user_id, finger_name, is_correct, press_time=0):
         """손가락별 통계 업데이트"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            INSERT INTO finger_statistics (user_id, finger_name, total_presses, correct_presses, avg_speed)
-            VALUES (?, ?, 1, ?, ?)
-            ON CONFLICT(user_id, finger_name)
-            DO UPDATE SET
-                total_presses = total_presses + 1,
-                correct_presses = correct_presses + ?,
-                avg_speed = (avg_speed * total_presses + ?) / (total_presses + 1)
-        ''', (user_id, finger_name, 1 if is_correct else 0, press_time,
-              1 if is_correct else 0, press_time))
-
-        conn.commit()
-        conn.close()
+        with self.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                INSERT INTO finger_statistics (user_id, finger_name, total_presses, correct_presses, avg_speed)
+                VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT(user_id, finger_name)
+                DO UPDATE SET
+                    total_presses = total_presses + 1,
+                    correct_presses = correct_presses + ?,
+                    avg_speed = (avg_speed * total_presses + ?) / (total_presses + 1)
+            ''', (user_id, finger_name, 1 if is_correct else 0, press_time,
+                  1 if is_correct else 0, press_time))
+
+    def record_finger_stat(self, user_id, finger_name, is_correct, press_time=0):
+        """손가락별 통계 누적 (버퍼를 거쳐 일괄 반영)"""
+        self.key_stats.add_finger(user_id, finger_name, is_correct, press_time)
 
     def get_finger_statistics(self, user_id):
         """손가락별 통계 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT finger_name, total_presses, correct_presses, avg_speed,
-                   ROUND(100.0 * correct_presses / total_presses, 2) as accuracy
-            FROM finger_statistics
-            WHERE user_id = ?
-            ORDER BY total_presses DESC
-        ''', (user_id,))
+        with self.transaction() as cursor:
+            cursor.execute('''
+                SELECT finger_name, total_presses, correct_presses, avg_speed,
+                       ROUND(100.0 * correct_presses / total_presses, 2) as accuracy
+                FROM finger_statistics
+                WHERE user_id = ?
+                ORDER BY total_presses DESC
+            ''', (user_id,))
 
-        records = cursor.fetchall()
-        conn.close()
+            records = cursor.fetchall()
 
         return [dict(record) for record in records]
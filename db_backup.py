@@ -0,0 +1,278 @@
+"""
+온라인 백업 모듈
+SQLite 백업 API (sqlite3.Connection.backup) 로 앱이 쓰는 중에도 일관된 사본을 만든다.
+파일 복사와 달리 반쯤 쓰인 페이지가 섞이지 않는다.
+
+한 단계에 pages_per_step 페이지만 복사하고 단계 사이에 step_pause 만큼 쉰다.
+WAL 모드에서는 복사 내내 읽기 트랜잭션 하나를 열어 두어 모든 단계가 같은 시점을 복사하고,
+그동안 다른 연결의 쓰기는 WAL 에 계속 추가된다 (쓰기를 막지 않음).
+WAL 이 아니면 단계마다 읽기 잠금을 잡았다 놓으며, 복사 중 다른 연결이 DB 를 바꾸면
+SQLite 가 백업을 처음부터 다시 시작하므로 MAX_RESTARTS 번 넘게 다시 시작되면
+남은 복사를 한 단계로 끝낸다.
+
+백업 파일: <DB 폴더>/backups/<DB 이름>-YYYYMMDD-HHMMSS.db (최근 keep 개만 보관)
+복원 전에는 PRAGMA integrity_check 로 백업 파일을 검사하고, 현재 DB 를 먼저 백업한다.
+"""
+import os
+import sqlite3
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+from database import MIGRATIONS
+
+
+DEFAULT_PAGES_PER_STEP = 256   # 한 단계에 복사할 페이지 수 (4KB 페이지 기준 1MB)
+DEFAULT_STEP_PAUSE = 0.005     # 단계 사이 쉬는 시간 (초)
+DEFAULT_KEEP = 10              # 보관할 백업 파일 수
+MAX_RESTARTS = 3               # 이보다 많이 다시 시작되면 남은 복사를 한 단계로
+
+BACKUP_SUFFIX = '.db'
+TIMESTAMP_FORMAT = '%Y%m%d-%H%M%S'
+
+
+def default_backup_dir(db_name):
+    """DB 파일 옆의 backups 폴더"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_name)), 'backups')
+
+
+def _backup_prefix(db_name):
+    return os.path.splitext(os.path.basename(db_name))[0] + '-'
+
+
+def list_backups(db_name, backup_dir=None):
+    """백업 파일 경로 목록 (최신순)"""
+    backup_dir = backup_dir or default_backup_dir(db_name)
+    prefix = _backup_prefix(db_name)
+    try:
+        names = os.listdir(backup_dir)
+    except FileNotFoundError:
+        return []
+    backups = []
+    for name in names:
+        if not (name.startswith(prefix) and name.endswith(BACKUP_SUFFIX)):
+            continue
+        # 같은 초에 만든 백업은 '-2', '-3' ... 이 붙으므로 번호까지 비교
+        stem = name[len(prefix):-len(BACKUP_SUFFIX)]   # YYYYMMDD-HHMMSS[-N]
+        stamp, number = stem[:15], stem[16:]
+        backups.append(((stamp, int(number) if number.isdigit() else 1), name))
+    return [os.path.join(backup_dir, name) for _, name in sorted(backups, reverse=True)]
+
+
+def seconds_since_last_backup(db_name, backup_dir=None):
+    """가장 최근 백업 이후 지난 시간 (초, 백업이 없으면 None)"""
+    backups = list_backups(db_name, backup_dir)
+    if not backups:
+        return None
+    return max(0.0, time.time() - os.path.getmtime(backups[0]))
+
+
+def prune_backups(db_name, keep=DEFAULT_KEEP, backup_dir=None):
+    """최근 keep 개를 남기고 오래된 백업 삭제 (삭제한 경로 목록 반환)"""
+    removed = []
+    for path in list_backups(db_name, backup_dir)[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        removed.append(path)
+    return removed
+
+
+def _read_only_uri(path):
+    return f'file:{quote(os.path.abspath(path))}?mode=ro'
+
+
+def verify_backup(path):
+    """백업 파일 검사 (문제 목록 반환, 비어 있으면 정상)"""
+    if not os.path.isfile(path):
+        return [f"파일이 없습니다: {path}"]
+    try:
+        conn = sqlite3.connect(_read_only_uri(path), uri=True)
+    except sqlite3.Error as e:
+        return [str(e)]
+    try:
+        problems = [row[0] for row in conn.execute('PRAGMA integrity_check')]
+        if problems != ['ok']:
+            return problems
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version > MIGRATIONS[-1][0]:
+            return [f"이 프로그램보다 새 스키마 버전입니다 ({version})"]
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'users'").fetchone():
+            return ["타자 연습 데이터베이스가 아닙니다 (users 테이블 없음)"]
+        return []
+    except sqlite3.DatabaseError as e:
+        return [str(e)]
+    finally:
+        conn.close()
+
+
+class BackupCancelled(Exception):
+    """cancel() 로 중단된 백업"""
+
+
+class _RestartLimit(Exception):
+    """복사 중 변경이 너무 잦아 단계별 복사를 포기함"""
+
+
+class BackupJob:
+    """온라인 백업 한 번
+
+    run() 은 백업이 끝날 때까지 돌아오지 않으므로 Tk 스레드가 아닌
+    작업 스레드나 명령행 도구에서 실행한다. 중단은 다른 스레드에서 cancel().
+    """
+
+    def __init__(self, db, backup_dir=None, keep=DEFAULT_KEEP,
+                 pages_per_step=DEFAULT_PAGES_PER_STEP, step_pause=DEFAULT_STEP_PAUSE):
+        """
+        Args:
+            db: 백업할 Database 인스턴스 (파일 DB 만 가능)
+            backup_dir: 백업 폴더 (기본: DB 파일 옆 backups)
+            keep: 보관할 백업 파일 수 (None 이면 정리하지 않음)
+            pages_per_step: 한 단계에 복사할 페이지 수
+            step_pause: 단계 사이 쉬는 시간 (초)
+        """
+        if db.in_memory:
+            raise ValueError("메모리 데이터베이스는 백업할 수 없습니다")
+        self.db = db
+        self.backup_dir = backup_dir or default_backup_dir(db.db_name)
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.step_pause = step_pause
+        self._cancelled = False
+        self.report = {
+            'path': None,
+            'pages': 0,
+            'steps': 0,
+            'snapshot': False,      # 읽기 트랜잭션 하나로 같은 시점을 복사했는지 (WAL)
+            'restarts': 0,
+            'single_step': False,   # 다시 시작이 잦아 남은 복사를 한 단계로 끝냈는지
+            'max_step_ms': 0.0,     # 가장 오래 걸린 복사 단계
+            'elapsed': 0.0,
+            'size': 0,
+            'removed': []
+        }
+
+    def cancel(self):
+        """진행 중인 백업 중단 (다음 단계가 끝나면 멈추고 임시 파일 삭제)"""
+        self._cancelled = True
+
+    def run(self):
+        """백업 파일을 만들고 오래된 백업 정리 (결과 보고 반환)"""
+        os.makedirs(self.backup_dir, exist_ok=True)
+        path = self._new_path()
+        partial_path = f'{path}.{os.getpid()}.partial'
+        start = time.perf_counter()
+
+        source = sqlite3.connect(self.db.db_name, timeout=self.db.busy_timeout / 1000,
+                                 isolation_level=None)
+        try:
+            target = sqlite3.connect(partial_path)
+            try:
+                self._copy(source, target)
+                # 백업은 -wal 없이 파일 하나로 완결되도록
+                target.execute('PRAGMA journal_mode = DELETE')
+            finally:
+                target.close()
+            os.replace(partial_path, path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        finally:
+            source.close()
+
+        self.report['path'] = path
+        self.report['size'] = os.path.getsize(path)
+        self.report['elapsed'] = time.perf_counter() - start
+        if self.keep is not None:
+            self.report['removed'] = prune_backups(self.db.db_name, self.keep, self.backup_dir)
+        return self.report
+
+    def _new_path(self):
+        """겹치지 않는 타임스탬프 파일 이름"""
+        stamp = datetime.now().strftime(TIMESTAMP_FORMAT)
+        path = os.path.join(self.backup_dir, f'{_backup_prefix(self.db.db_name)}{stamp}{BACKUP_SUFFIX}')
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(self.backup_dir,
+                                f'{_backup_prefix(self.db.db_name)}{stamp}-{suffix}{BACKUP_SUFFIX}')
+        return path
+
+    def _copy(self, source, target):
+        """pages_per_step 페이지씩 복사 (단계 시간과 다시 시작 횟수 기록)"""
+        report = self.report
+        last = time.perf_counter()
+        remaining_before = None
+
+        def progress(status, remaining, total):
+            nonlocal last, remaining_before
+            report['steps'] += 1
+            report['pages'] = total
+            report['max_step_ms'] = max(report['max_step_ms'], (time.perf_counter() - last) * 1000)
+            # 복사에 성공한 단계인데 남은 페이지가 줄지 않았으면 처음부터 다시 시작된 것
+            if status == sqlite3.SQLITE_OK and remaining_before is not None and remaining >= remaining_before:
+                report['restarts'] += 1
+                if report['restarts'] > MAX_RESTARTS:
+                    raise _RestartLimit()
+            remaining_before = remaining
+            if self._cancelled:
+                raise BackupCancelled()
+            if remaining:
+                time.sleep(self.step_pause)
+            last = time.perf_counter()
+
+        if source.execute('PRAGMA journal_mode').fetchone()[0] == 'wal':
+            source.execute('BEGIN')
+            source.execute('SELECT 1 FROM sqlite_master LIMIT 1')  # 이 시점의 스냅샷 고정
+            report['snapshot'] = True
+        try:
+            source.backup(target, pages=self.pages_per_step, progress=progress)
+        except _RestartLimit:
+            report['single_step'] = True
+            last = time.perf_counter()
+            source.backup(target)
+            report['steps'] += 1
+            report['max_step_ms'] = max(report['max_step_ms'], (time.perf_counter() - last) * 1000)
+        finally:
+            if report['snapshot']:
+                source.execute('ROLLBACK')
+
+
+def restore_backup(db, backup_path, safety_backup=True):
+    """백업 파일을 검사한 뒤 현재 DB 에 덮어쓰기
+
+    백업 API 로 한 트랜잭션에 복사하므로 다른 연결은 복원 전이나 후의 DB 만 본다.
+    백업이 이전 스키마 버전이면 복원 후 마이그레이션을 적용한다.
+
+    Args:
+        db: 복원할 Database 인스턴스
+        backup_path: 백업 파일 경로
+        safety_backup: 복원 전에 현재 DB 를 백업 (오래된 백업 정리는 하지 않음)
+
+    Returns:
+        {'safety_backup': 현재 DB 백업 경로 또는 None, 'schema_version': 복원 후 버전}
+    """
+    problems = verify_backup(backup_path)
+    if problems:
+        raise ValueError(f"백업 파일 검사 실패: {'; '.join(problems[:5])}")
+
+    db.flush_key_stats()
+    safety_path = None
+    if safety_backup:
+        safety_path = BackupJob(db, keep=None).run()['path']
+
+    source = sqlite3.connect(_read_only_uri(backup_path), uri=True)
+    try:
+        target = sqlite3.connect(db.db_name, timeout=db.busy_timeout / 1000)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+    db.cache.clear()
+    db.leaderboard.invalidate(all_modes=True)
+    return {'safety_backup': safety_path, 'schema_version': db.migrate()}
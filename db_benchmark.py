@@ -0,0 +1,497 @@
+"""
+데이터베이스 성능 측정 도구
+1. 합성 데이터 생성기: 사용자, 연습 기록(모드/날짜 분포), 키/손가락 통계,
+   친구, 클랜을 실제 사용과 비슷한 분포로 채운다 (같은 시드면 같은 데이터).
+2. 측정기: Database 의 모든 공개 메서드를 규모별로 반복 호출하여
+   p50/p95/p99 지연 시간을 표와 JSON 으로 보고한다.
+
+사용법:
+    python db_benchmark.py [--scales 1000,100000,1000000] [--iterations 200]
+                           [--json result.json] [--compare baseline.json]
+                           [--data-dir bench_data] [--cold]
+"""
+import argparse
+import inspect
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from database import Database, MIGRATIONS
+from key_latency import BOUNDS, new_histogram, to_blob
+from keyboard_widget import VirtualKeyboard
+from query_plan_check import MAINTENANCE_METHODS, SKIPPED_METHODS
+
+
+DEFAULT_SCALES = (1000, 100000, 1000000)
+DEFAULT_ITERATIONS = 200
+WARMUP = 5
+SEED = 42
+HISTORY_DAYS = 730
+RECORDS_PER_USER = 200        # 규모별 사용자 수 = 기록 수 / RECORDS_PER_USER (최소 50명)
+INSERT_BATCH = 10000
+REGRESSION_RATIO = 1.5        # --compare 에서 이 배율 이상 느려지면 표시
+REGRESSION_MIN_MS = 0.05      # 단, 차이가 이보다 작으면 측정 오차로 보고 무시
+
+# 리더보드 탭과 같은 모드 이름, 선택 비율
+MODE_WEIGHTS = [
+    ('낱말연습', 30), ('자리연습', 25), ('짧은글연습', 15), ('긴글연습', 8),
+    ('산성비', 10), ('침략자', 6), ('자원캐기', 6),
+]
+
+KEYS = list('ㅂㅈㄷㄱㅅㅛㅕㅑㅐㅔㅁㄴㅇㄹㅎㅗㅓㅏㅣㅋㅌㅊㅍㅠㅜㅡ') + ['Space']
+FINGERS = sorted(set(VirtualKeyboard.KEY_FINGER_MAP.values()))
+
+
+# ========== 합성 데이터 생성 ==========
+def generate_database(db, users, records, seed=SEED):
+    """빈 데이터베이스에 합성 데이터 채우기
+
+    사용자 활동량은 파레토 분포 (소수의 사용자가 기록 대부분을 차지),
+    실력은 로그정규 분포, 연습 날짜는 최근일수록 많다.
+    """
+    rng = random.Random(seed)
+    conn = db.get_connection()
+    password = Database.hash_password('pw')
+
+    with db.transaction() as cursor:
+        cursor.executemany(
+            'INSERT INTO users (username, password, created_at) VALUES (?, ?, ?)',
+            ((f'user{i}', password, '2020-01-01 00:00:00') for i in range(users)))
+        cursor.execute('SELECT user_id FROM users ORDER BY user_id')
+        user_ids = [row[0] for row in cursor.fetchall()]
+
+    activity = list(itertools.accumulate(rng.paretovariate(1.2) for _ in user_ids))
+    skill = {user_id: rng.lognormvariate(0, 0.35) for user_id in user_ids}
+    modes = [mode for mode, _ in MODE_WEIGHTS]
+    mode_weights = list(itertools.accumulate(weight for _, weight in MODE_WEIGHTS))
+    now = datetime.now().replace(microsecond=0)
+
+    def record_rows(count):
+        chosen_users = rng.choices(user_ids, cum_weights=activity, k=count)
+        chosen_modes = rng.choices(modes, cum_weights=mode_weights, k=count)
+        for user_id, mode in zip(chosen_users, chosen_modes):
+            speed = max(30, int(rng.gauss(250, 40) * skill[user_id]))
+            accuracy = round(min(100.0, 80 + 20 * rng.betavariate(5, 1.5)), 1)
+            practice_time = rng.randint(1, 10)
+            score = int(speed * accuracy / 100 * practice_time / 2)
+            age = timedelta(days=HISTORY_DAYS * rng.random() ** 1.5,
+                            seconds=rng.randint(8 * 3600, 22 * 3600))
+            created_at = (now - age).strftime('%Y-%m-%d %H:%M:%S')
+            yield user_id, mode, score, accuracy, speed, practice_time, created_at
+
+    remaining = records
+    while remaining:
+        count = min(INSERT_BATCH, remaining)
+        with db.transaction() as cursor:
+            cursor.executemany('''
+                INSERT INTO practice_records
+                (user_id, mode_name, score, accuracy, speed, practice_time, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', record_rows(count))
+        remaining -= count
+
+    # 최고 기록은 기록 트리거가, 누적 점수/시간은 일별 집계 트리거가 채움
+    db.rebuild_daily_stats()
+    with db.transaction() as cursor:
+        cursor.execute('''
+            UPDATE users
+            SET last_login = totals.last_at, last_practice_date = DATE(totals.last_at)
+            FROM (
+                SELECT user_id, MAX(created_at) as last_at
+                FROM practice_records
+                GROUP BY user_id
+            ) as totals
+            WHERE users.user_id = totals.user_id
+        ''')
+        cursor.execute('''
+            INSERT INTO user_levels (user_id, current_level, current_exp, total_exp)
+            SELECT user_id, 1 + CAST(SQRT(total_score / 10 / 50.0) AS INTEGER), 0, total_score / 10
+            FROM users
+        ''')
+
+    with db.transaction() as cursor:
+        cursor.executemany('''
+            INSERT INTO key_statistics
+            (user_id, key_char, total_presses, correct_presses, incorrect_presses, avg_time, latency_hist)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', key_stat_rows(rng, user_ids, skill))
+        cursor.executemany('''
+            INSERT INTO finger_statistics (user_id, finger_name, total_presses, correct_presses, avg_speed)
+            VALUES (?, ?, ?, ?, ?)
+        ''', finger_stat_rows(rng, user_ids, skill))
+        cursor.executemany('''
+            INSERT OR IGNORE INTO friendships (user_id, friend_id, status, accepted_at)
+            VALUES (?, ?, 'accepted', CURRENT_TIMESTAMP)
+        ''', friendship_rows(rng, user_ids))
+        create_clans(rng, cursor, user_ids)
+
+    for user_id in user_ids:
+        db.check_achievements(user_id)
+
+    conn.execute('ANALYZE')
+    return user_ids
+
+
+def key_stat_rows(rng, user_ids, skill):
+    """키별 입력 횟수는 자주 쓰는 키일수록 많게 (지프 분포), 입력 간격은 로그 정규 분포"""
+    for user_id in user_ids:
+        volume = rng.randint(200, 20000)
+        error_rate = 0.02 + 0.08 / skill[user_id]
+        for rank, key in enumerate(KEYS, 1):
+            presses = max(1, int(volume / rank))
+            incorrect = int(presses * error_rate * rng.uniform(0.5, 1.5))
+            mu = rng.gauss(-1.6, 0.2) - math.log(skill[user_id])
+            sigma = rng.uniform(0.2, 0.6)
+            yield (user_id, key, presses, presses - incorrect, incorrect,
+                   round(math.exp(mu + sigma ** 2 / 2), 4), lognormal_histogram(presses, mu, sigma))
+
+
+def lognormal_histogram(presses, mu, sigma):
+    """로그 정규 분포 입력 간격 presses 개의 기대 히스토그램 (샘플링 없이 구간 확률로 계산)"""
+    dist = statistics.NormalDist(mu, sigma)
+    below = [dist.cdf(math.log(bound)) for bound in BOUNDS] + [1.0]
+    hist = new_histogram()
+    previous = 0.0
+    for i, cdf in enumerate(below):
+        hist[i] = round(presses * (cdf - previous))
+        previous = cdf
+    return to_blob(hist)
+
+
+def finger_stat_rows(rng, user_ids, skill):
+    """손가락별 통계"""
+    for user_id in user_ids:
+        for finger in FINGERS:
+            presses = rng.randint(100, 10000)
+            yield (user_id, finger, presses, int(presses * rng.uniform(0.85, 0.99)),
+                   round(rng.gauss(250, 40) * skill[user_id], 1))
+
+
+def friendship_rows(rng, user_ids):
+    """사용자마다 0~8명의 친구 (양방향 수락 상태)"""
+    for user_id in user_ids:
+        for friend_id in rng.sample(user_ids, min(len(user_ids), rng.randint(0, 8))):
+            if friend_id != user_id:
+                yield user_id, friend_id
+                yield friend_id, user_id
+
+
+def create_clans(rng, cursor, user_ids):
+    """사용자 25명당 클랜 하나, 사용자의 60%가 가입"""
+    members = rng.sample(user_ids, int(len(user_ids) * 0.6))
+    clan_count = max(1, len(user_ids) // 25)
+    leaders = members[:clan_count]
+
+    cursor.executemany('INSERT INTO clans (clan_name, description, leader_id) VALUES (?, ?, ?)',
+                       ((f'클랜{i}', '', leader) for i, leader in enumerate(leaders)))
+    cursor.execute('SELECT clan_id, leader_id FROM clans')
+    clans = cursor.fetchall()
+    clan_ids = [row[0] for row in clans]
+    leader_clan = {row[1]: row[0] for row in clans}
+
+    cursor.executemany('''
+        INSERT INTO clan_members (clan_id, user_id, role, contribution) VALUES (?, ?, ?, ?)
+    ''', ((leader_clan.get(user_id) or rng.choice(clan_ids), user_id,
+           'leader' if user_id in leader_clan else 'member', rng.randint(0, 5000))
+          for user_id in members))
+
+
+def prepare_database(records, data_dir, seed=SEED):
+    """규모별 원본 데이터베이스 생성 (data_dir 에 있으면 재사용, 경로 반환)"""
+    path = os.path.join(data_dir, f'bench_{records}_{seed}.db')
+    if os.path.exists(path):
+        with sqlite3.connect(path) as conn:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version == MIGRATIONS[-1][0]:
+            return path
+        os.remove(path)
+
+    users = max(50, records // RECORDS_PER_USER)
+    start = time.perf_counter()
+    tmp_path = path + '.tmp'
+    db = Database(tmp_path)
+    try:
+        generate_database(db, users, records, seed)
+        db.get_connection().execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    finally:
+        db.close()
+    os.replace(tmp_path, path)
+    print(f"  데이터 생성: 사용자 {users:,}명, 기록 {records:,}건 ({time.perf_counter() - start:.1f}초)")
+    return path
+
+
+# ========== 측정 ==========
+def build_context(db):
+    """측정 호출에 쓸 대상 선택 (기록이 가장 많은 사용자 기준)"""
+    conn = db.get_connection()
+    user_id = conn.execute('''
+        SELECT user_id FROM practice_records GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1
+    ''').fetchone()[0]
+    friend_id = conn.execute('SELECT MAX(user_id) FROM users').fetchone()[0]
+    clan_id = conn.execute('SELECT MIN(clan_id) FROM clans').fetchone()[0]
+    username = conn.execute('SELECT username FROM users WHERE user_id = ?', (user_id,)).fetchone()[0]
+    friend_name = conn.execute('SELECT username FROM users WHERE user_id = ?', (friend_id,)).fetchone()[0]
+
+    list_id = db.import_custom_words(user_id, '측정', (f'단어{i}' for i in range(2000)))['list_id']
+    db.import_practice_passages(None, ((f'지문{i}', f'측정 지문 {i}번: 학교에서 친구와 공부를 합니다.')
+                                       for i in range(2000)))
+    passage_id = db.search_practice_passages('지문')[0]['passage_id']
+    session_id = db.save_session_keystrokes(
+        user_id, '자리연습', [(key, key, 150) for key in KEYS * 20])
+
+    return {
+        'user_id': user_id, 'friend_id': friend_id, 'clan_id': clan_id,
+        'username': username, 'friend_name': friend_name,
+        'list_id': list_id, 'session_id': session_id, 'passage_id': passage_id,
+        'counter': itertools.count()
+    }
+
+
+def build_calls(db, ctx):
+    """메서드 이름 -> 한 번 호출하는 함수 (반복 호출해도 의미가 유지되도록 구성)"""
+    user_id, friend_id = ctx['user_id'], ctx['friend_id']
+    clan_id, list_id = ctx['clan_id'], ctx['list_id']
+    counter = ctx['counter']
+    session = {'mode_name': '낱말연습', 'score': 120, 'accuracy': 97.0, 'speed': 320, 'practice_time': 5}
+
+    def create_and_delete_list():
+        db.delete_custom_word_list(db.create_custom_word_list(user_id, '삭제', ['가', '나']))
+
+    def import_and_delete_passage():
+        db.import_practice_passages(user_id, [('삭제', '지울 지문입니다.')])
+        db.delete_practice_passage(db.search_practice_passages('지울 지문', user_id, phrase=True)[0]['passage_id'])
+
+    return {
+        'create_user': lambda: db.create_user(f'bench{next(counter)}', 'pw'),
+        'verify_user': lambda: db.verify_user(ctx['username'], 'pw'),
+        'update_last_login': lambda: db.update_last_login(user_id),
+        'get_user_info': lambda: db.get_user_info(user_id),
+        'update_user_score': lambda: db.update_user_score(user_id, 10),
+        'save_practice_record': lambda: db.save_practice_record(user_id, '낱말연습', 100, 95.0, 300, 60),
+        'finalize_session': lambda: db.finalize_session(user_id, session),
+        'get_user_records': lambda: db.get_user_records(user_id, limit=10),
+        'get_high_scores': lambda: db.get_high_scores(user_id),
+        'get_leaderboard': lambda: (db.get_leaderboard('낱말연습', 50), db.get_leaderboard(None, 50)),
+        'get_leaderboard_page': lambda: db.get_leaderboard_page('낱말연습', 100, 10, user_id),
+        'get_user_rank': lambda: (db.get_user_rank(user_id, '낱말연습'), db.get_user_rank(user_id)),
+        'unlock_achievement': lambda: db.unlock_achievement(user_id, '측정', '성능 측정'),
+        'get_achievements': lambda: db.get_achievements(user_id),
+        'check_achievements': lambda: db.check_achievements(user_id),
+        'get_achievement_progress': lambda: db.get_achievement_progress(user_id),
+        'get_daily_goal': lambda: db.get_daily_goal(user_id),
+        'update_daily_goal': lambda: db.update_daily_goal(user_id, 5, 50),
+        'set_daily_goal_targets': lambda: db.set_daily_goal_targets(user_id, 30, 100),
+        'update_key_stat': lambda: db.update_key_stat(user_id, 'ㄱ', True, 0.2),
+        'flush_key_stats': lambda: (db.record_key_stat(user_id, 'ㄴ', True, 0.2),
+                                    db.record_finger_stat(user_id, 'left_ring', True, 0.2),
+                                    db.flush_key_stats()),
+        'apply_key_stats': lambda: db.apply_key_stats(
+            [(user_id, 'ㄷ', 1, 1, 0, 0.2, None)], [(user_id, 'left_middle', 1, 1, 0.2)]),
+        'get_key_statistics': lambda: db.get_key_statistics(user_id, limit=10),
+        'get_weak_keys': lambda: db.get_weak_keys(user_id),
+        'get_key_latency': lambda: db.get_key_latency(user_id),
+        'get_slow_keys': lambda: db.get_slow_keys(user_id),
+        'save_session_keystrokes': lambda: db.save_session_keystrokes(
+            user_id, '자리연습', [(key, key, 150) for key in KEYS]),
+        'get_keystroke_sessions': lambda: db.get_keystroke_sessions(user_id),
+        'iter_session_keystrokes': lambda: sum(1 for _ in db.iter_session_keystrokes(ctx['session_id'])),
+        'update_login_streak': lambda: db.update_login_streak(user_id),
+        'create_custom_word_list': lambda: db.create_custom_word_list(user_id, '측정', ['가', '나']),
+        'get_custom_word_lists': lambda: db.get_custom_word_lists(user_id),
+        'import_custom_words': lambda: db.import_custom_words(user_id, '가져오기', ['다', '라', '마']),
+        'get_custom_words': lambda: db.get_custom_words(list_id, offset=1000, limit=100),
+        'sample_custom_words': lambda: db.sample_custom_words(list_id, 100),
+        'delete_custom_word_list': create_and_delete_list,
+        'search_custom_words': lambda: db.search_custom_words(user_id, '단어1'),
+        'import_practice_passages': lambda: db.import_practice_passages(None, [('측정', '학교에 갑니다.')]),
+        'get_practice_passage': lambda: db.get_practice_passage(ctx['passage_id']),
+        'search_practice_passages': lambda: db.search_practice_passages('학교', user_id),
+        'delete_practice_passage': import_and_delete_passage,
+        'update_theme': lambda: db.update_theme(user_id, 'dark'),
+        'get_user_theme': lambda: db.get_user_theme(user_id),
+        'get_user_settings': lambda: db.get_user_settings(user_id),
+        'update_user_settings': lambda: db.update_user_settings(user_id, volume=60),
+        'get_practice_history': lambda: db.get_practice_history(user_id, days=30),
+        'get_practice_summary': lambda: db.get_practice_summary(user_id, days=30),
+        'get_mode_distribution': lambda: db.get_mode_distribution(user_id),
+        'get_user_level': lambda: db.get_user_level(user_id),
+        'add_exp': lambda: db.add_exp(user_id, 50),
+        'get_level_leaderboard': lambda: db.get_level_leaderboard(10),
+        'send_friend_request': lambda: db.send_friend_request(user_id, ctx['friend_name']),
+        'accept_friend_request': lambda: db.accept_friend_request(friend_id, user_id),
+        'get_friends': lambda: db.get_friends(user_id),
+        'get_friend_requests': lambda: db.get_friend_requests(friend_id),
+        'create_clan': lambda: db.create_clan(f'측정 클랜{next(counter)}', '', friend_id),
+        'join_clan': lambda: db.join_clan(clan_id, user_id),
+        'get_user_clan': lambda: db.get_user_clan(user_id),
+        'get_clan_members': lambda: db.get_clan_members(clan_id),
+        'get_season_pass': lambda: db.get_season_pass(user_id),
+        'add_season_exp': lambda: db.add_season_exp(user_id, 10),
+        'update_finger_stat': lambda: db.update_finger_stat(user_id, 'left_index', True, 0.2),
+        'get_finger_statistics': lambda: db.get_finger_statistics(user_id),
+    }
+
+
+def percentile(sorted_values, fraction):
+    """정렬된 값의 백분위수 (선형 보간)"""
+    position = (len(sorted_values) - 1) * fraction
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def measure(func, iterations, before=None):
+    """함수를 반복 호출하여 지연 시간 통계 (ms) 반환"""
+    for _ in range(WARMUP):
+        func()
+
+    samples = []
+    for _ in range(iterations):
+        if before:
+            before()
+        start = time.perf_counter_ns()
+        func()
+        samples.append((time.perf_counter_ns() - start) / 1e6)
+
+    samples.sort()
+    return {
+        'p50': round(percentile(samples, 0.50), 4),
+        'p95': round(percentile(samples, 0.95), 4),
+        'p99': round(percentile(samples, 0.99), 4),
+        'mean': round(statistics.fmean(samples), 4),
+        'n': iterations
+    }
+
+
+def run_scale(source_path, iterations, cold=False):
+    """원본 DB 복사본에서 모든 공개 메서드 측정 ({메서드: 통계})"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'bench.db')
+        shutil.copy(source_path, path)
+        db = Database(path)
+        try:
+            ctx = build_context(db)
+            calls = build_calls(db, ctx)
+
+            public_methods = {
+                name for name, _ in inspect.getmembers(Database, callable)
+                if not name.startswith('_')
+            }
+            missing = sorted(public_methods - SKIPPED_METHODS - MAINTENANCE_METHODS - set(calls))
+            if missing:
+                raise RuntimeError(f"측정 호출이 정의되지 않은 메서드: {', '.join(missing)}")
+
+            # 조회 캐시를 끄고 매번 SQL 까지 측정하려면 cold
+            before = db.cache.clear if cold else None
+            return {name: measure(calls[name], iterations, before) for name in sorted(calls)}
+        finally:
+            db.close()
+
+
+# ========== 보고 ==========
+def git_revision():
+    """현재 커밋 (git 이 없으면 None)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, baseline=None):
+    """규모별 p50/p95/p99 표 출력 (기준 결과가 있으면 p95 배율 추가)"""
+    scales = list(results)
+    header = f"{'메서드':<28}" + ''.join(f"{f'{scale:,}건 p50/p95/p99 (ms)':>34}" for scale in scales)
+    print(header)
+    print('-' * len(header))
+
+    regressions = []
+    for name in sorted(next(iter(results.values()))):
+        line = f"{name:<28}"
+        for scale in scales:
+            stat = results[scale][name]
+            cell = f"{stat['p50']:.3f}/{stat['p95']:.3f}/{stat['p99']:.3f}"
+            base = (baseline or {}).get(str(scale), {}).get(name)
+            if base and base['p95'] > 0:
+                ratio = stat['p95'] / base['p95']
+                cell += f" x{ratio:.2f}"
+                if ratio >= REGRESSION_RATIO and stat['p95'] - base['p95'] >= REGRESSION_MIN_MS:
+                    cell += '!'
+                    regressions.append((scale, name, ratio))
+            line += f"{cell:>34}"
+        print(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Database 메서드 지연 시간 측정")
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help="연습 기록 수 목록 (쉼표 구분)")
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help="메서드당 측정 횟수")
+    parser.add_argument('--seed', type=int, default=SEED, help="데이터 생성 시드")
+    parser.add_argument('--data-dir', help="생성한 원본 DB 를 보관/재사용할 폴더")
+    parser.add_argument('--json', help="결과 JSON 파일 경로")
+    parser.add_argument('--compare', help="비교할 이전 결과 JSON (p95 배율 표시)")
+    parser.add_argument('--cold', action='store_true', help="매 호출 전 조회 캐시 비우기")
+    args = parser.parse_args(argv)
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or tmp_dir
+        os.makedirs(data_dir, exist_ok=True)
+
+        results = {}
+        for scale in scales:
+            print(f"[{scale:,}건]")
+            source_path = prepare_database(scale, data_dir, args.seed)
+            start = time.perf_counter()
+            results[scale] = run_scale(source_path, args.iterations, args.cold)
+            print(f"  측정: {time.perf_counter() - start:.1f}초")
+
+    print()
+    regressions = print_table(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'revision': git_revision(),
+                    'created_at': datetime.now().isoformat(timespec='seconds'),
+                    'seed': args.seed,
+                    'iterations': args.iterations,
+                    'cold': args.cold,
+                    'schema_version': MIGRATIONS[-1][0],
+                    'sqlite_version': sqlite3.sqlite_version,
+                    'python': platform.python_version(),
+                    'platform': platform.platform()
+                },
+                'results': {str(scale): stats for scale, stats in results.items()}
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\nJSON 저장: {args.json}")
+
+    if regressions:
+        print(f"\n느려진 메서드 (p95 {REGRESSION_RATIO}배 이상): {len(regressions)}개")
+        for scale, name, ratio in regressions:
+            print(f"  {scale:,}건 {name}: x{ratio:.2f}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+데이터베이스 데몬 클라이언트 모듈
+db_daemon.py 와 주고받는 메시지 형식과, Database 공개 메서드를 데몬으로 보내는 클라이언트.
+
+메시지 형식:
+    4바이트 길이 (빅 엔디언) + UTF-8 JSON
+    요청 = {"method": 이름, "args": [...], "kwargs": {...}}
+    응답 = {"ok": true, "result": 값} 또는 {"ok": false, "error": 예외 이름, "message": 내용}
+    bytes 값은 {"$b": base64} 로, 튜플과 이터레이터는 리스트로 보낸다.
+"""
+import base64
+import inspect
+import json
+import os
+import socket
+import sqlite3
+import struct
+import threading
+
+
+HEADER = struct.Struct('>I')
+MAX_MESSAGE = 64 * 1024 * 1024
+
+# 데몬으로 보내지 않고 클라이언트에서 처리하는 메서드 (연결/수명 관리, 키 통계 버퍼)
+LOCAL_METHODS = {
+    'get_connection', 'transaction', 'call_on_commit', 'close', 'init_database', 'migrate',
+    'hash_password', 'record_key_stat', 'record_finger_stat', 'flush_key_stats',
+    'enable_instrumentation', 'disable_instrumentation', 'use_direct_access',
+}
+
+# 데몬 오류를 같은 종류의 예외로 다시 발생시키기 위한 표
+ERROR_TYPES = {
+    cls.__name__: cls for cls in (
+        ValueError, TypeError, KeyError, LookupError, FileNotFoundError, PermissionError,
+        sqlite3.IntegrityError, sqlite3.OperationalError, sqlite3.DatabaseError, sqlite3.Error,
+    )
+}
+
+
+def default_socket_path(db_name):
+    """데이터베이스 파일에 대응하는 데몬 소켓 경로"""
+    return os.path.abspath(db_name) + '.sock'
+
+
+# ========== 메시지 ==========
+def _encode_default(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {'$b': base64.b64encode(value).decode('ascii')}
+    if hasattr(value, '__iter__'):
+        return list(value)
+    raise TypeError(f"보낼 수 없는 값입니다: {type(value).__name__}")
+
+
+def _decode_object(obj):
+    if len(obj) == 1 and '$b' in obj:
+        return base64.b64decode(obj['$b'])
+    return obj
+
+
+def encode(message):
+    """메시지를 JSON 바이트로"""
+    return json.dumps(message, default=_encode_default, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def decode(data):
+    """JSON 바이트를 메시지로"""
+    return json.loads(data, object_hook=_decode_object)
+
+
+def send_message(sock, payload):
+    """길이를 앞에 붙여 전송"""
+    sock.sendall(HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_message(sock):
+    """메시지 하나 수신 (상대가 연결을 닫았으면 None)"""
+    header = _recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+    (size,) = HEADER.unpack(header)
+    if size > MAX_MESSAGE:
+        raise ValueError(f"메시지가 너무 큽니다: {size:,}바이트")
+    return _recv_exact(sock, size) if size else b''
+
+
+def error_from_response(response):
+    """오류 응답을 예외로"""
+    error_type = ERROR_TYPES.get(response.get('error'), RuntimeError)
+    return error_type(response.get('message', ''))
+
+
+# ========== 클라이언트 ==========
+class DaemonUnavailable(ConnectionError):
+    """요청을 보내기 전에 데몬에 연결하지 못함 (직접 접근으로 다시 실행해도 안전)"""
+
+
+class DaemonClient:
+    """Database 공개 메서드를 데몬으로 보내는 클라이언트 (스레드마다 소켓 하나)"""
+
+    def __init__(self, socket_path, timeout=30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._sockets = []
+        self._sockets_lock = threading.Lock()
+        self._installed = []
+
+    @classmethod
+    def connect(cls, socket_path):
+        """데몬이 실행 중이면 클라이언트 반환 (아니면 None)"""
+        if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+            return None
+        client = cls(socket_path)
+        try:
+            client._socket()
+        except OSError:
+            return None
+        return client
+
+    def _socket(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+            with self._sockets_lock:
+                self._sockets.append(sock)
+        return sock
+
+    def _drop_socket(self):
+        sock = getattr(self._local, 'sock', None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def call(self, method, args=(), kwargs=None):
+        """데몬에서 메서드 실행 (데몬 쪽 예외는 같은 종류로 다시 발생)"""
+        payload = encode({'method': method, 'args': args, 'kwargs': kwargs or {}})
+        try:
+            sock = self._socket()
+            send_message(sock, payload)
+        except OSError as e:
+            self._drop_socket()
+            raise DaemonUnavailable(str(e)) from e
+
+        try:
+            data = recv_message(sock)
+        except OSError as e:
+            data = None
+        if data is None:
+            self._drop_socket()
+            raise sqlite3.OperationalError("데이터베이스 데몬 연결이 끊겼습니다 (요청 결과를 알 수 없음)")
+
+        response = decode(data)
+        if not response['ok']:
+            raise error_from_response(response)
+        return response['result']
+
+    # ========== Database 연결 ==========
+    def install(self, db):
+        """db 의 공개 메서드를 데몬으로 보내는 함수로 교체"""
+        for name, _ in inspect.getmembers(type(db), callable):
+            if name.startswith('_') or name in LOCAL_METHODS:
+                continue
+            setattr(db, name, self._forwarder(db, name))
+            self._installed.append(name)
+
+    def uninstall(self, db):
+        """교체한 메서드 복원"""
+        for name in self._installed:
+            db.__dict__.pop(name, None)
+        self._installed = []
+
+    def _forwarder(self, db, name):
+        def forward(*args, **kwargs):
+            try:
+                return self.call(name, args, kwargs)
+            except DaemonUnavailable:
+                # 데몬이 내려갔으면 직접 접근으로 전환 후 같은 호출을 다시 실행
+                db.use_direct_access()
+                return getattr(db, name)(*args, **kwargs)
+
+        forward.__name__ = name
+        forward.__doc__ = getattr(type(db), name).__doc__
+        return forward
+
+    def close(self):
+        """열린 소켓 모두 닫기"""
+        with self._sockets_lock:
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local = threading.local()
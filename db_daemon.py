@@ -0,0 +1,310 @@
+"""
+데이터베이스 데몬
+typing_practice.db 를 혼자 여는 프로세스 하나가 Database 공개 메서드를 Unix 소켓으로 제공한다.
+같은 PC 에서 여러 앱이 데몬을 쓰면 SQLite 쓰기 잠금 경합 대신
+쓰기 요청을 모아 한 번에 커밋하고 (group commit), 리더보드/사용자 정보 캐시를 함께 쓴다.
+
+    읽기 (get_/iter_/sample_/search_, verify_derived, stats): 읽기 스레드 풀에서 바로 실행
+          (읽기 스레드 연결은 PRAGMA query_only 라서 잘못 분류된 쓰기는 오류로 드러남)
+    쓰기 (그 외, WRITE_METHODS 포함): 쓰기 스레드 하나가 대기 중인 요청을 모두 꺼내 한 트랜잭션으로 실행
+                  (요청마다 SAVEPOINT 라서 실패한 요청만 되돌리고, 응답은 커밋 후에 보냄)
+
+데몬 밖에서 DB 파일이 바뀌면 (다른 PC, db_tools 등) PRAGMA data_version 으로 감지해
+EXTERNAL_CHECK_INTERVAL 안에 캐시를 비운다.
+메시지 형식은 db_client.py 참고. 앱은 Database(use_daemon=True) 로 연결한다.
+
+사용법:
+    python db_daemon.py [--db typing_practice.db] [--socket 경로]
+"""
+import argparse
+import os
+import queue
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from database import Database
+from db_client import LOCAL_METHODS, decode, default_socket_path, encode, recv_message, send_message
+
+
+READ_PREFIXES = ('get_', 'iter_', 'sample_', 'search_')
+READ_METHODS = {'verify_derived', 'stats'}
+# 읽기 이름이지만 쓰는 메서드 (기본 행을 처음 조회할 때 만들거나, 로그인 시간을 기록)
+WRITE_METHODS = {'get_daily_goal', 'get_user_level', 'get_user_settings', 'get_season_pass', 'verify_user'}
+READER_THREADS = 4
+MAX_BATCH = 64                    # 한 번에 커밋할 최대 쓰기 요청 수
+EXTERNAL_CHECK_INTERVAL = 0.5     # 외부 변경 확인 주기 (초)
+
+
+def is_read_method(name):
+    """읽기 스레드에서 실행할 메서드인지"""
+    if name in WRITE_METHODS:
+        return False
+    return name.startswith(READ_PREFIXES) or name in READ_METHODS
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """클라이언트 연결 하나 (요청을 하나씩 받아 응답)"""
+
+    def setup(self):
+        self.server.daemon.track_client(self.request, True)
+
+    def finish(self):
+        self.server.daemon.track_client(self.request, False)
+
+    def handle(self):
+        daemon = self.server.daemon
+        while True:
+            try:
+                data = recv_message(self.request)
+            except (OSError, ValueError):
+                return
+            if data is None:
+                return
+
+            try:
+                request = decode(data)
+                result = daemon.call(request['method'], request.get('args', []), request.get('kwargs', {}))
+                payload = encode({'ok': True, 'result': result})
+            except Exception as e:
+                payload = encode({'ok': False, 'error': type(e).__name__, 'message': str(e)})
+
+            try:
+                send_message(self.request, payload)
+            except OSError:
+                return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class DatabaseDaemon:
+    """Database 하나를 소유하고 소켓으로 메서드 호출을 받는 데몬"""
+
+    def __init__(self, db_name='typing_practice.db', socket_path=None):
+        self.db = Database(db_name)
+        self.socket_path = socket_path or default_socket_path(db_name)
+        self._server = None
+        self._serving = False
+        self._writes = queue.Queue()
+        self._readers = ThreadPoolExecutor(READER_THREADS, thread_name_prefix='db-read',
+                                           initializer=self._init_reader)
+        self._writer = None
+        self._running = False
+        self._lock = threading.Lock()
+        self._clients = set()
+        self.reads = 0
+        self.writes = 0
+        self.commits = 0
+        self.max_batch = 0
+        self.external_changes = 0
+
+    # ========== 실행 ==========
+    def start(self):
+        """소켓을 열고 쓰기 스레드 시작 (요청 처리는 serve_forever)"""
+        self._remove_stale_socket()
+        self._server = _Server(self.socket_path, _RequestHandler)
+        self._server.daemon = self
+        # DB 파일에 접근할 수 있는 사용자만 소켓을 쓰도록 권한을 맞춤
+        if os.path.exists(self.db.db_name):
+            os.chmod(self.socket_path, stat.S_IMODE(os.stat(self.db.db_name).st_mode))
+        self._running = True
+        self._writer = threading.Thread(target=self._writer_loop, name='db-write', daemon=True)
+        self._writer.start()
+
+    def serve_forever(self):
+        """종료 요청까지 클라이언트 요청 처리"""
+        if self._server is None:
+            self.start()
+        self._serving = True
+        self._server.serve_forever(poll_interval=0.5)
+
+    def shutdown(self):
+        """요청 처리를 멈추고 대기 중인 쓰기를 반영한 뒤 종료 (serve_forever 와 다른 스레드에서 호출)"""
+        if self._server is not None:
+            if self._serving:
+                self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        with self._lock:
+            clients, self._clients = self._clients, set()
+        for sock in clients:
+            # 연결된 클라이언트는 다음 요청에서 직접 접근으로 전환됨
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._running = False
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writer.join()
+            self._writer = None
+        self._readers.shutdown()
+        self.db.close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def track_client(self, sock, connected):
+        """연결된 클라이언트 소켓 기록 (종료할 때 끊기 위해)"""
+        with self._lock:
+            if connected:
+                self._clients.add(sock)
+            else:
+                self._clients.discard(sock)
+
+    def _remove_stale_socket(self):
+        """이전 데몬이 남긴 소켓 파일 제거 (실행 중인 데몬이 있으면 오류)"""
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+        else:
+            raise RuntimeError(f"이미 실행 중인 데몬이 있습니다: {self.socket_path}")
+        finally:
+            probe.close()
+
+    # ========== 요청 처리 ==========
+    def call(self, name, args, kwargs):
+        """메서드 실행 (읽기는 읽기 스레드, 쓰기는 다음 묶음 커밋 후 결과 반환)"""
+        if name.startswith('_') or name in LOCAL_METHODS or not callable(getattr(self.db, name, None)):
+            raise ValueError(f"데몬에서 실행할 수 없는 메서드입니다: {name}")
+
+        if is_read_method(name):
+            with self._lock:
+                self.reads += 1
+            return self._readers.submit(self._execute, name, args, kwargs).result()
+
+        future = Future()
+        self._writes.put((name, args, kwargs, future))
+        return future.result()
+
+    def _init_reader(self):
+        """읽기 스레드 연결을 읽기 전용으로 (쓰기는 쓰기 스레드 하나만)"""
+        self.db.get_connection().execute('PRAGMA query_only = ON')
+
+    def _execute(self, name, args, kwargs):
+        if name == 'stats':
+            return dict(self.db.stats(), daemon=self.stats())
+        result = getattr(self.db, name)(*args, **kwargs)
+        if hasattr(result, '__next__'):
+            result = list(result)  # 제너레이터는 연결을 잡고 있으므로 여기서 모두 읽음
+        return result
+
+    def _writer_loop(self):
+        """쓰기 요청을 모아 커밋하고, 쉬는 동안 외부 변경 확인"""
+        conn = self.db.get_connection()
+        data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+        last_check = time.monotonic()
+        while True:
+            try:
+                first = self._writes.get(timeout=EXTERNAL_CHECK_INTERVAL)
+            except queue.Empty:
+                first = None
+
+            if time.monotonic() - last_check >= EXTERNAL_CHECK_INTERVAL:
+                # 이 연결의 커밋으로는 바뀌지 않으므로 다른 연결/프로세스가 쓴 경우만 감지됨
+                current = conn.execute('PRAGMA data_version').fetchone()[0]
+                if current != data_version:
+                    data_version = current
+                    self.db.cache.clear()
+                    self.db.leaderboard.invalidate(all_modes=True)
+                    with self._lock:
+                        self.external_changes += 1
+                last_check = time.monotonic()
+
+            if first is None:
+                if not self._running:
+                    return
+                continue
+
+            batch = [first]
+            while len(batch) < MAX_BATCH:
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._writes.put(None)  # 남은 요청을 처리한 뒤 종료
+                    break
+                batch.append(item)
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch):
+        """쓰기 요청 묶음을 한 트랜잭션으로 실행하고 커밋 후 응답"""
+        outcomes = []
+        try:
+            with self.db.transaction(immediate=True):
+                for name, args, kwargs, future in batch:
+                    try:
+                        outcomes.append((future, True, self._execute(name, args, kwargs)))
+                    except Exception as e:
+                        outcomes.append((future, False, e))
+        except Exception as e:
+            # 잠금을 얻지 못했거나 커밋에 실패하면 묶음 전체가 실패
+            for _, _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self.writes += len(batch)
+            self.commits += 1
+            self.max_batch = max(self.max_batch, len(batch))
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def stats(self):
+        """요청/커밋 통계"""
+        with self._lock:
+            return {
+                'reads': self.reads,
+                'writes': self.writes,
+                'commits': self.commits,
+                'writes_per_commit': round(self.writes / self.commits, 2) if self.commits else 0.0,
+                'max_batch': self.max_batch,
+                'external_changes': self.external_changes
+            }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="타자 연습 데이터베이스 데몬")
+    parser.add_argument('--db', default='typing_practice.db', help="데이터베이스 파일")
+    parser.add_argument('--socket', default=None, help="소켓 경로 (기본: DB 파일 경로 + .sock)")
+    args = parser.parse_args(argv)
+
+    if not hasattr(socket, 'AF_UNIX'):
+        print("이 운영체제는 Unix 소켓을 지원하지 않습니다.", file=sys.stderr)
+        return 1
+
+    daemon = DatabaseDaemon(args.db, args.socket)
+    try:
+        daemon.start()
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    def stop(signum, frame):
+        threading.Thread(target=daemon.shutdown).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"데이터베이스 데몬 실행 중: {daemon.socket_path}")
+    daemon.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
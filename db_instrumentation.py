@@ -0,0 +1,330 @@
+"""
+데이터베이스 계측 모듈
+켜져 있는 동안에만 Database 공개 메서드를 감싸 호출 횟수와 시간을 모으고,
+커서 팩토리와 SQLite trace/progress 콜백으로 SQL 문별 시간, 행 수, 느린 쿼리를 기록한다.
+끄면 감싼 메서드와 콜백을 모두 제거하므로 꺼져 있을 때의 추가 비용은 없다.
+"""
+import inspect
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+# 감싸지 않는 메서드 (연결/트랜잭션 관리, 계측 자체)
+NOT_INSTRUMENTED = {
+    'get_connection', 'transaction', 'call_on_commit', 'close', 'init_database', 'migrate',
+    'hash_password', 'enable_instrumentation', 'disable_instrumentation', 'stats',
+    'use_direct_access',
+}
+
+SLOW_LOG_SIZE = 100
+TOP_STATEMENTS = 20
+
+
+class TimedCursor(sqlite3.Cursor):
+    """실행/조회 시간과 행 수를 계측기에 보고하는 커서"""
+
+    def __init__(self, connection, instrumentation):
+        super().__init__(connection)
+        self._instrumentation = instrumentation
+        self._statement = None
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._statement = self._instrumentation.begin_statement(
+                sql, parameters, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._statement = self._instrumentation.begin_statement(
+                sql, '<executemany>', time.perf_counter() - start)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows))
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(start, 0)
+            raise
+        self._fetched(start, 1)
+        return row
+
+    def _fetched(self, start, rows):
+        if self._statement is not None:
+            self._instrumentation.add_fetch(self._statement, time.perf_counter() - start, rows)
+
+
+class Instrumentation:
+    """Database 한 인스턴스의 메서드/SQL 계측
+
+    메서드 통계의 시간, 행 수, 문장 수, VM 단계는 안쪽 메서드 호출을 포함한다
+    (예: finalize_session 에는 save_practice_record 의 값이 함께 더해진다).
+    """
+
+    def __init__(self, db, slow_ms=50, progress_steps=1000):
+        """
+        Args:
+            db: 계측할 Database 인스턴스
+            slow_ms: 이 시간(ms) 이상 걸린 SQL 문은 느린 쿼리 로그에 남김
+            progress_steps: progress 콜백 간격 (SQLite VM 명령 수)
+        """
+        self.db = db
+        self.slow_ms = slow_ms
+        self.progress_steps = progress_steps
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._wrapped = []
+        self.reset()
+
+    # ========== 설치/제거 ==========
+    def install(self):
+        """공개 메서드를 감싸고 열린 연결에 콜백 등록"""
+        for name, _ in inspect.getmembers(type(self.db), callable):
+            if name.startswith('_') or name in NOT_INSTRUMENTED:
+                continue
+            # 이미 인스턴스 속성 (데몬 클라이언트 함수 등) 이면 제거할 때 되돌려 놓음
+            self._wrapped.append((name, self.db.__dict__.get(name)))
+            setattr(self.db, name, self._wrap(name, getattr(self.db, name)))
+
+        self.db._cursor_factory = lambda conn: TimedCursor(conn, self)
+        for conn in self._connections():
+            self.attach(conn)
+
+    def uninstall(self):
+        """감싼 메서드와 콜백 제거"""
+        for name, previous in self._wrapped:
+            if previous is None:
+                self.db.__dict__.pop(name, None)
+            else:
+                setattr(self.db, name, previous)
+        self._wrapped = []
+
+        self.db._cursor_factory = sqlite3.Cursor
+        for conn in self._connections():
+            conn.set_trace_callback(None)
+            conn.set_progress_handler(None, 0)
+
+    def attach(self, conn):
+        """연결에 trace/progress 콜백 등록 (새 연결이 만들어질 때도 호출됨)"""
+        conn.set_trace_callback(self._on_trace)
+        conn.set_progress_handler(self._on_progress, self.progress_steps)
+
+    def _connections(self):
+        with self.db._connections_lock:
+            return list(self.db._connections)
+
+    # ========== 수집 ==========
+    def reset(self):
+        """모은 통계 비우기"""
+        with self._lock:
+            self.since = datetime.now().isoformat(timespec='seconds')
+            self.methods = {}
+            self.statements = {}
+            self.slow_queries = deque(maxlen=SLOW_LOG_SIZE)
+
+    def _frames(self):
+        frames = getattr(self._local, 'frames', None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def _wrap(self, name, method):
+        """메서드 호출 시간 측정 래퍼"""
+        def wrapper(*args, **kwargs):
+            frames = self._frames()
+            frame = {'name': name, 'rows': 0, 'statements': 0, 'vm_steps': 0}
+            frames.append(frame)
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                frames.pop()
+                if frames:
+                    parent = frames[-1]
+                    parent['rows'] += frame['rows']
+                    parent['statements'] += frame['statements']
+                    parent['vm_steps'] += frame['vm_steps']
+                self._record_method(frame, elapsed)
+
+        wrapper.__name__ = name
+        wrapper.__doc__ = method.__doc__
+        return wrapper
+
+    def _record_method(self, frame, elapsed):
+        with self._lock:
+            stat = self.methods.get(frame['name'])
+            if stat is None:
+                stat = self.methods[frame['name']] = {
+                    'calls': 0, 'total': 0.0, 'max': 0.0, 'rows': 0, 'statements': 0, 'vm_steps': 0
+                }
+            stat['calls'] += 1
+            stat['total'] += elapsed
+            stat['max'] = max(stat['max'], elapsed)
+            stat['rows'] += frame['rows']
+            stat['statements'] += frame['statements']
+            stat['vm_steps'] += frame['vm_steps']
+
+    def _on_trace(self, sql):
+        """SQLite trace 콜백: 현재 메서드의 실행 문장 수 (BEGIN/COMMIT 포함)"""
+        frames = self._frames()
+        if frames:
+            frames[-1]['statements'] += 1
+
+    def _on_progress(self):
+        """SQLite progress 콜백: 현재 메서드가 실행한 VM 명령 수 (근사값)"""
+        frames = self._frames()
+        if frames:
+            frames[-1]['vm_steps'] += self.progress_steps
+        return 0
+
+    def begin_statement(self, sql, parameters, elapsed):
+        """커서에서 실행된 SQL 문 기록 (이후 조회 시간이 더해질 상태 반환)"""
+        key = ' '.join(sql.split())
+        frames = self._frames()
+        state = {
+            'sql': key,
+            'parameters': parameters,
+            'method': frames[-1]['name'] if frames else None,
+            'elapsed': elapsed,
+            'slow_entry': None
+        }
+        with self._lock:
+            stat = self.statements.get(key)
+            if stat is None:
+                stat = self.statements[key] = {'calls': 0, 'total': 0.0, 'max': 0.0, 'rows': 0}
+            stat['calls'] += 1
+            stat['total'] += elapsed
+            stat['max'] = max(stat['max'], elapsed)
+            self._check_slow(state)
+        return state
+
+    def add_fetch(self, state, elapsed, rows):
+        """실행된 SQL 문의 결과 조회 시간/행 수 추가"""
+        state['elapsed'] += elapsed
+        frames = self._frames()
+        if frames:
+            frames[-1]['rows'] += rows
+        with self._lock:
+            stat = self.statements[state['sql']]
+            stat['total'] += elapsed
+            stat['max'] = max(stat['max'], state['elapsed'])
+            stat['rows'] += rows
+            self._check_slow(state)
+
+    def _check_slow(self, state):
+        """실행+조회 시간이 기준을 넘으면 느린 쿼리 로그에 기록 (잠금 안에서 호출)"""
+        ms = state['elapsed'] * 1000
+        if ms < self.slow_ms:
+            return
+        if state['slow_entry'] is None:
+            state['slow_entry'] = {
+                'at': datetime.now().isoformat(timespec='seconds'),
+                'method': state['method'],
+                'sql': state['sql'],
+                'parameters': repr(state['parameters'])[:200],
+                'ms': 0.0
+            }
+            self.slow_queries.append(state['slow_entry'])
+        state['slow_entry']['ms'] = round(ms, 3)
+
+    # ========== 보고 ==========
+    def snapshot(self):
+        """현재 통계 복사본 (시간 단위 ms, 총 시간이 긴 순)"""
+        with self._lock:
+            methods = {
+                name: {
+                    'calls': stat['calls'],
+                    'total_ms': round(stat['total'] * 1000, 3),
+                    'avg_ms': round(stat['total'] * 1000 / stat['calls'], 3),
+                    'max_ms': round(stat['max'] * 1000, 3),
+                    'rows': stat['rows'],
+                    'statements': stat['statements'],
+                    'vm_steps': stat['vm_steps']
+                }
+                for name, stat in sorted(self.methods.items(), key=lambda item: -item[1]['total'])
+            }
+            statements = [
+                {
+                    'sql': sql,
+                    'calls': stat['calls'],
+                    'total_ms': round(stat['total'] * 1000, 3),
+                    'max_ms': round(stat['max'] * 1000, 3),
+                    'rows': stat['rows']
+                }
+                for sql, stat in sorted(self.statements.items(),
+                                        key=lambda item: -item[1]['total'])[:TOP_STATEMENTS]
+            ]
+            slow_queries = [dict(entry) for entry in self.slow_queries]
+
+        return {
+            'since': self.since,
+            'slow_ms': self.slow_ms,
+            'methods': methods,
+            'statements': statements,
+            'slow_queries': slow_queries
+        }
+
+
+def format_stats(snapshot):
+    """db.stats() 결과를 읽기 쉬운 텍스트로 변환"""
+    lines = []
+    cache = snapshot.get('cache')
+    if cache:
+        lines.append(f"조회 캐시: 적중 {cache['hits']:,} / 미적중 {cache['misses']:,} "
+                     f"(적중률 {cache['hit_rate']:.0%}), 항목 {cache['size']}/{cache['max_size']}")
+    contention = snapshot.get('contention')
+    if contention:
+        lines.append(f"쓰기 잠금: 트랜잭션 {contention['write_transactions']:,}, 대기 {contention['waits']:,}회 "
+                     f"(합계 {contention['wait_total_ms']:,.1f}ms, 최대 {contention['wait_max_ms']:.1f}ms), "
+                     f"재시도 {contention['retries']:,}, 실패 {contention['failures']:,}")
+    if not snapshot.get('enabled'):
+        lines.append("계측이 꺼져 있습니다.")
+        return '\n'.join(lines)
+
+    lines.append(f"수집 시작: {snapshot['since']}")
+    lines.append('')
+    lines.append(f"{'메서드':<28}{'호출':>8}{'총(ms)':>12}{'평균':>10}{'최대':>10}{'행':>10}{'문장':>8}")
+    for name, stat in snapshot['methods'].items():
+        lines.append(f"{name:<28}{stat['calls']:>8,}{stat['total_ms']:>12.1f}{stat['avg_ms']:>10.3f}"
+                     f"{stat['max_ms']:>10.3f}{stat['rows']:>10,}{stat['statements']:>8,}")
+
+    lines.append('')
+    lines.append("SQL 문 (총 시간 상위)")
+    for stat in snapshot['statements']:
+        lines.append(f"  {stat['total_ms']:>10.1f}ms  {stat['calls']:>6,}회  최대 {stat['max_ms']:.3f}ms  "
+                     f"{stat['rows']:,}행  {stat['sql'][:100]}")
+
+    lines.append('')
+    lines.append(f"느린 쿼리 ({snapshot['slow_ms']}ms 이상, 최근 {SLOW_LOG_SIZE}개)")
+    for entry in snapshot['slow_queries']:
+        lines.append(f"  [{entry['at']}] {entry['ms']:.1f}ms {entry['method']}: {entry['sql'][:100]}")
+        lines.append(f"      인자: {entry['parameters']}")
+    return '\n'.join(lines)
@@ -0,0 +1,340 @@
+"""
+데이터베이스 병합 모듈
+다른 PC의 typing_practice.db 를 ATTACH 하여 집합 단위 INSERT ... SELECT 로 합친다.
+사용자 ID는 임시 매핑 테이블로 다시 매기고, 전체 병합은 한 트랜잭션으로 실행된다.
+"""
+import os
+import sqlite3
+import tempfile
+
+from database import Database, MIGRATIONS
+
+
+SOURCE = 'merge_src'
+
+# 원본 사용자 -> 대상 사용자 매핑
+# 사용자명과 비밀번호가 모두 같으면 같은 사람으로 보고 합친다.
+# 사용자명만 같으면 다른 사람이므로 '사용자명_원본ID' 로 새로 만든다.
+MAP_USERS_SQL = f'''
+    INSERT INTO temp.merge_users (src_id, dst_id, username, is_new)
+    SELECT s.user_id, same.user_id,
+           CASE WHEN same.user_id IS NULL AND taken.user_id IS NOT NULL
+                THEN s.username || '_' || s.user_id
+                ELSE s.username END,
+           same.user_id IS NULL
+    FROM {SOURCE}.users s
+    LEFT JOIN main.users same ON same.username = s.username AND same.password = s.password
+    LEFT JOIN main.users taken ON taken.username = s.username
+'''
+
+# 바꾼 이름도 이미 있으면 (대상 사용자나 원본의 다른 새 사용자) '_원본ID' 를 한 번 더 붙임
+# 더 바뀌는 행이 없을 때까지 반복한다. 마지막 '_' 뒤가 서로 다른 원본 ID 이므로 바꾼 이름끼리는 겹치지 않는다.
+RENAME_TAKEN_USERS_SQL = f'''
+    UPDATE temp.merge_users
+    SET username = username || '_' || src_id
+    WHERE is_new
+      AND username <> (SELECT username FROM {SOURCE}.users WHERE user_id = merge_users.src_id)
+      AND (username IN (SELECT username FROM main.users)
+           OR username IN (SELECT o.username FROM temp.merge_users o
+                           WHERE o.is_new AND o.src_id <> merge_users.src_id))
+'''
+
+MERGE_STEPS = [
+    # 새 사용자 추가 (누적 점수/시간은 트리거가 일별 집계에서 계산)
+    ('users_added', f'''
+        INSERT INTO main.users
+        (username, password, email, created_at, last_login, last_practice_date, login_streak, theme)
+        SELECT m.username, s.password, s.email, s.created_at, s.last_login, s.last_practice_date,
+               s.login_streak, s.theme
+        FROM {SOURCE}.users s
+        JOIN temp.merge_users m ON m.src_id = s.user_id
+        WHERE m.is_new
+        ORDER BY s.user_id
+    '''),
+    ('', '''
+        UPDATE temp.merge_users
+        SET dst_id = (SELECT user_id FROM main.users WHERE username = merge_users.username)
+        WHERE is_new
+    '''),
+    # 같은 사용자: 날짜는 최근 값, 가입일은 이른 값 (누적 값은 일별 집계를 더할 때 트리거가 더함)
+    ('users_merged', f'''
+        UPDATE main.users
+        SET login_streak = MAX(users.login_streak, s.login_streak),
+            last_login = MAX(COALESCE(users.last_login, s.last_login),
+                             COALESCE(s.last_login, users.last_login)),
+            last_practice_date = MAX(COALESCE(users.last_practice_date, s.last_practice_date),
+                                     COALESCE(s.last_practice_date, users.last_practice_date)),
+            created_at = MIN(users.created_at, s.created_at)
+        FROM {SOURCE}.users s
+        JOIN temp.merge_users m ON m.src_id = s.user_id
+        WHERE users.user_id = m.dst_id AND NOT m.is_new
+    '''),
+    ('practice_records', f'''
+        INSERT INTO main.practice_records
+        (user_id, mode_name, score, accuracy, speed, practice_time, created_at)
+        SELECT m.dst_id, p.mode_name, p.score, p.accuracy, p.speed, p.practice_time, p.created_at
+        FROM {SOURCE}.practice_records p
+        JOIN temp.merge_users m ON m.src_id = p.user_id
+    '''),
+    # 일별 집계는 연습 기록과 같이 더함
+    ('daily_user_stats', f'''
+        INSERT INTO main.daily_user_stats
+        (user_id, stat_date, mode_name, session_count, score_sum, accuracy_sum, speed_sum, time_sum)
+        SELECT m.dst_id, d.stat_date, d.mode_name, d.session_count, d.score_sum,
+               d.accuracy_sum, d.speed_sum, d.time_sum
+        FROM {SOURCE}.daily_user_stats d
+        JOIN temp.merge_users m ON m.src_id = d.user_id
+        WHERE true
+        ON CONFLICT(user_id, stat_date, mode_name)
+        DO UPDATE SET
+            session_count = session_count + excluded.session_count,
+            score_sum = score_sum + excluded.score_sum,
+            accuracy_sum = accuracy_sum + excluded.accuracy_sum,
+            speed_sum = speed_sum + excluded.speed_sum,
+            time_sum = time_sum + excluded.time_sum
+    '''),
+    # 연습 기록 트리거와 같은 MAX 규칙 (원본에서 정리된 기록의 최고 기록까지 반영)
+    ('high_scores', f'''
+        INSERT INTO main.high_scores
+        (user_id, mode_name, high_score, best_accuracy, best_speed, achieved_at)
+        SELECT m.dst_id, h.mode_name, h.high_score, h.best_accuracy, h.best_speed, h.achieved_at
+        FROM {SOURCE}.high_scores h
+        JOIN temp.merge_users m ON m.src_id = h.user_id
+        WHERE true
+        ON CONFLICT(user_id, mode_name)
+        DO UPDATE SET
+            high_score = MAX(high_score, excluded.high_score),
+            best_accuracy = MAX(best_accuracy, excluded.best_accuracy),
+            best_speed = MAX(best_speed, excluded.best_speed),
+            achieved_at = CASE
+                WHEN excluded.high_score > high_score THEN excluded.achieved_at
+                ELSE achieved_at
+            END
+    '''),
+    # 횟수와 시간 히스토그램은 더하고 평균 시간은 입력 횟수로 가중 평균
+    ('key_statistics', f'''
+        INSERT INTO main.key_statistics
+        (user_id, key_char, total_presses, correct_presses, incorrect_presses, avg_time, latency_hist,
+         last_updated)
+        SELECT m.dst_id, k.key_char, k.total_presses, k.correct_presses, k.incorrect_presses,
+               k.avg_time, k.latency_hist, k.last_updated
+        FROM {SOURCE}.key_statistics k
+        JOIN temp.merge_users m ON m.src_id = k.user_id
+        WHERE true
+        ON CONFLICT(user_id, key_char)
+        DO UPDATE SET
+            total_presses = total_presses + excluded.total_presses,
+            correct_presses = correct_presses + excluded.correct_presses,
+            incorrect_presses = incorrect_presses + excluded.incorrect_presses,
+            avg_time = CASE
+                WHEN total_presses + excluded.total_presses > 0
+                THEN (avg_time * total_presses + excluded.avg_time * excluded.total_presses)
+                     / (total_presses + excluded.total_presses)
+                ELSE avg_time
+            END,
+            latency_hist = latency_hist_merge(latency_hist, excluded.latency_hist),
+            last_updated = MAX(last_updated, excluded.last_updated)
+    '''),
+    ('finger_statistics', f'''
+        INSERT INTO main.finger_statistics
+        (user_id, finger_name, total_presses, correct_presses, avg_speed)
+        SELECT m.dst_id, f.finger_name, f.total_presses, f.correct_presses, f.avg_speed
+        FROM {SOURCE}.finger_statistics f
+        JOIN temp.merge_users m ON m.src_id = f.user_id
+        WHERE true
+        ON CONFLICT(user_id, finger_name)
+        DO UPDATE SET
+            total_presses = total_presses + excluded.total_presses,
+            correct_presses = correct_presses + excluded.correct_presses,
+            avg_speed = CASE
+                WHEN total_presses + excluded.total_presses > 0
+                THEN (avg_speed * total_presses + excluded.avg_speed * excluded.total_presses)
+                     / (total_presses + excluded.total_presses)
+                ELSE avg_speed
+            END
+    '''),
+    # 먼저 달성한 날짜 유지
+    ('achievements', f'''
+        INSERT INTO main.achievements (user_id, achievement_name, achievement_description, achieved_at)
+        SELECT m.dst_id, a.achievement_name, a.achievement_description, a.achieved_at
+        FROM {SOURCE}.achievements a
+        JOIN temp.merge_users m ON m.src_id = a.user_id
+        WHERE true
+        ON CONFLICT(user_id, achievement_name)
+        DO UPDATE SET achieved_at = MIN(achieved_at, excluded.achieved_at)
+    '''),
+    # 한쪽이라도 수락했으면 수락 상태
+    ('friendships', f'''
+        INSERT INTO main.friendships (user_id, friend_id, status, requested_at, accepted_at)
+        SELECT a.dst_id, b.dst_id, f.status, f.requested_at, f.accepted_at
+        FROM {SOURCE}.friendships f
+        JOIN temp.merge_users a ON a.src_id = f.user_id
+        JOIN temp.merge_users b ON b.src_id = f.friend_id
+        WHERE a.dst_id != b.dst_id
+        ON CONFLICT(user_id, friend_id)
+        DO UPDATE SET
+            status = CASE WHEN excluded.status = 'accepted' THEN 'accepted' ELSE status END,
+            accepted_at = COALESCE(accepted_at, excluded.accepted_at)
+    '''),
+    # 클랜은 이름이 같으면 같은 클랜
+    ('', f'''
+        INSERT INTO temp.merge_clans (src_id, dst_id, is_new)
+        SELECT c.clan_id, d.clan_id, d.clan_id IS NULL
+        FROM {SOURCE}.clans c
+        LEFT JOIN main.clans d ON d.clan_name = c.clan_name
+    '''),
+    ('clans_added', f'''
+        INSERT INTO main.clans (clan_name, description, leader_id, created_at, total_members)
+        SELECT c.clan_name, c.description, leader.dst_id, c.created_at, 0
+        FROM {SOURCE}.clans c
+        JOIN temp.merge_clans mc ON mc.src_id = c.clan_id
+        JOIN temp.merge_users leader ON leader.src_id = c.leader_id
+        WHERE mc.is_new
+    '''),
+    ('', f'''
+        UPDATE temp.merge_clans
+        SET dst_id = (
+            SELECT d.clan_id
+            FROM {SOURCE}.clans c
+            JOIN main.clans d ON d.clan_name = c.clan_name
+            WHERE c.clan_id = merge_clans.src_id
+        )
+        WHERE is_new
+    '''),
+    # 한 사용자는 한 클랜에만 속하므로 기존 소속 유지 (같은 클랜이면 기여도 합산, 멤버 수는 트리거가 갱신)
+    ('clan_members', f'''
+        INSERT INTO main.clan_members (clan_id, user_id, role, joined_at, contribution)
+        SELECT mc.dst_id, mu.dst_id,
+               CASE WHEN mc.is_new THEN cm.role ELSE 'member' END,
+               cm.joined_at, cm.contribution
+        FROM {SOURCE}.clan_members cm
+        JOIN temp.merge_clans mc ON mc.src_id = cm.clan_id
+        JOIN temp.merge_users mu ON mu.src_id = cm.user_id
+        WHERE mc.dst_id IS NOT NULL
+        ON CONFLICT(user_id)
+        DO UPDATE SET contribution = contribution + excluded.contribution
+        WHERE clan_id = excluded.clan_id
+    '''),
+    # 키 입력 로그는 연습 기록 ID를 다시 매기지 않으므로 연결 없이 가져옴
+    ('session_keystrokes', f'''
+        INSERT INTO main.session_keystrokes
+        (user_id, mode_name, record_id, event_count, duration_ms, created_at, data)
+        SELECT m.dst_id, k.mode_name, NULL, k.event_count, k.duration_ms, k.created_at, k.data
+        FROM {SOURCE}.session_keystrokes k
+        JOIN temp.merge_users m ON m.src_id = k.user_id
+    '''),
+    # 원본에서 정리된 날짜까지는 집계만 있으므로 기준일은 더 늦은 쪽
+    ('', f'''
+        INSERT INTO main.maintenance_state (key, value)
+        SELECT key, value FROM {SOURCE}.maintenance_state
+        WHERE key = 'compacted_before'
+        ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)
+    '''),
+    # 사용자당 한 행인 테이블은 대상에 없을 때만 가져옴
+    ('user_levels', f'''
+        INSERT OR IGNORE INTO main.user_levels (user_id, current_level, current_exp, total_exp)
+        SELECT m.dst_id, l.current_level, l.current_exp, l.total_exp
+        FROM {SOURCE}.user_levels l
+        JOIN temp.merge_users m ON m.src_id = l.user_id
+    '''),
+    ('user_settings', f'''
+        INSERT OR IGNORE INTO main.user_settings (user_id, sound_enabled, volume, font_size)
+        SELECT m.dst_id, s.sound_enabled, s.volume, s.font_size
+        FROM {SOURCE}.user_settings s
+        JOIN temp.merge_users m ON m.src_id = s.user_id
+    '''),
+    ('season_pass', f'''
+        INSERT OR IGNORE INTO main.season_pass (user_id, season_number, tier, season_exp, is_premium)
+        SELECT m.dst_id, p.season_number, p.tier, p.season_exp, p.is_premium
+        FROM {SOURCE}.season_pass p
+        JOIN temp.merge_users m ON m.src_id = p.user_id
+    '''),
+    ('daily_goals', f'''
+        INSERT OR IGNORE INTO main.daily_goals
+        (user_id, goal_date, target_time, target_score, achieved_time, achieved_score, completed)
+        SELECT m.dst_id, g.goal_date, g.target_time, g.target_score,
+               g.achieved_time, g.achieved_score, g.completed
+        FROM {SOURCE}.daily_goals g
+        JOIN temp.merge_users m ON m.src_id = g.user_id
+    '''),
+]
+
+
+def upgraded_copy(source_path, tmp_dir):
+    """원본 파일을 건드리지 않도록 복사본을 만들어 현재 스키마로 마이그레이션"""
+    copy_path = os.path.join(tmp_dir, 'merge_source.db')
+    src = sqlite3.connect(source_path)
+    dst = sqlite3.connect(copy_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+    Database(copy_path).close()
+    return copy_path
+
+
+def merge_database(db, source_path):
+    """다른 데이터베이스 파일의 데이터를 현재 데이터베이스에 병합
+
+    원본 스키마가 오래되었으면 임시 복사본을 마이그레이션한 뒤 병합한다.
+    모든 단계는 한 트랜잭션에서 실행되며, 실패하면 아무것도 바뀌지 않는다.
+    같은 파일을 두 번 병합하면 연습 기록과 누적 점수가 중복된다.
+
+    Returns:
+        {단계 이름: 추가/갱신된 행 수}
+    """
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(source_path)
+    if os.path.abspath(source_path) == os.path.abspath(db.db_name):
+        raise ValueError("현재 데이터베이스 자신은 병합할 수 없습니다")
+
+    with sqlite3.connect(source_path) as probe:
+        source_version = probe.execute('PRAGMA user_version').fetchone()[0]
+    latest_version = MIGRATIONS[-1][0]
+    if source_version > latest_version:
+        raise ValueError(f"원본 스키마 버전({source_version})이 현재 버전({latest_version})보다 높습니다")
+
+    db.flush_key_stats()
+    conn = db.get_connection()
+    counts = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if source_version < latest_version:
+            source_path = upgraded_copy(source_path, tmp_dir)
+
+        # ATTACH 는 트랜잭션 밖에서만 가능
+        conn.execute(f'ATTACH DATABASE ? AS {SOURCE}', (source_path,))
+        try:
+            with db.transaction(immediate=True) as cursor:
+                cursor.execute('''
+                    CREATE TEMP TABLE merge_users (
+                        src_id INTEGER PRIMARY KEY, dst_id INTEGER, username TEXT, is_new INTEGER
+                    )
+                ''')
+                cursor.execute('CREATE TEMP TABLE merge_clans (src_id INTEGER PRIMARY KEY, dst_id INTEGER, is_new INTEGER)')
+                cursor.execute(MAP_USERS_SQL)
+                cursor.execute(RENAME_TAKEN_USERS_SQL)
+                while cursor.rowcount:
+                    cursor.execute(RENAME_TAKEN_USERS_SQL)
+
+                for name, sql in MERGE_STEPS:
+                    cursor.execute(sql)
+                    if name:
+                        counts[name] = cursor.rowcount
+
+                cursor.execute('SELECT COUNT(*) FROM temp.merge_users WHERE is_new AND username NOT IN '
+                               f'(SELECT username FROM {SOURCE}.users)')
+                counts['users_renamed'] = cursor.fetchone()[0]
+
+                cursor.execute('DROP TABLE temp.merge_users')
+                cursor.execute('DROP TABLE temp.merge_clans')
+
+                # 점수/설정이 바뀌었으므로 메모리 캐시는 커밋 후 모두 버림
+                db.call_on_commit(db.cache.clear)
+                db.call_on_commit(lambda: db.leaderboard.invalidate(all_modes=True))
+        finally:
+            conn.execute(f'DETACH DATABASE {SOURCE}')
+
+    return counts
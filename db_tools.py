@@ -0,0 +1,258 @@
+"""
+데이터베이스 관리 명령어 도구
+
+사용법:
+    python db_tools.py backfill-daily-stats [--db typing_practice.db]
+    python db_tools.py rebuild-derived [--check] [--db typing_practice.db]
+    python db_tools.py import-words USER_ID LIST_NAME WORDS.txt [--db typing_practice.db]
+    python db_tools.py import-passages TEXT.txt [--user-id N] [--db typing_practice.db]
+    python db_tools.py search QUERY [--phrase] [--exact] [--words USER_ID] [--db typing_practice.db]
+    python db_tools.py export USER_ID OUT.zip [--format csv|jsonl] [--db typing_practice.db]
+    python db_tools.py merge OTHER.db [--db typing_practice.db]
+    python db_tools.py compact [--days 365] [--batch-size 2000] [--db typing_practice.db]
+    python db_tools.py backup [--dir backups] [--keep 10] [--db typing_practice.db]
+    python db_tools.py restore BACKUP.db [--no-safety-backup] [--db typing_practice.db]
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+from database import Database
+from data_export import FORMATS, export_user_data
+from db_backup import DEFAULT_KEEP, BackupJob, list_backups, restore_backup
+from db_merge import merge_database
+from retention import (
+    DEFAULT_BATCH_SIZE, DEFAULT_RETENTION_DAYS, RetentionJob, enable_incremental_vacuum
+)
+
+
+def cmd_backfill_daily_stats(db, args):
+    """일별 집계 테이블 재계산"""
+    start = time.perf_counter()
+    rows = db.rebuild_daily_stats()
+    elapsed = time.perf_counter() - start
+    print(f"일별 집계 재계산 완료: {rows:,}행 ({elapsed:.2f}초)")
+    return 0
+
+
+def cmd_rebuild_derived(db, args):
+    """파생 값 (누적 점수/시간, 최고 기록, 클랜 멤버 수, 시즌 티어) 점검 또는 재계산"""
+    start = time.perf_counter()
+    if args.check:
+        report = db.verify_derived()
+        elapsed = time.perf_counter() - start
+        for name, result in report.items():
+            print(f"  {name}: 어긋난 행 {result['rows']:,}개")
+            for row in result['examples']:
+                print(f"      {row}")
+        drift = sum(result['rows'] for result in report.values())
+        print(f"점검 완료: 어긋난 행 {drift:,}개 ({elapsed:.2f}초)")
+        return 1 if drift else 0
+
+    fixed = db.rebuild_derived()
+    elapsed = time.perf_counter() - start
+    for name, rows in fixed.items():
+        print(f"  {name}: {rows:,}행 수정")
+    print(f"파생 값 재계산 완료: {sum(fixed.values()):,}행 수정 ({elapsed:.2f}초)")
+    return 0
+
+
+def cmd_import_words(db, args):
+    """텍스트 파일(한 줄에 한 단어)을 사용자 정의 단어 리스트로 가져오기"""
+    start = time.perf_counter()
+    with open(args.path, encoding=args.encoding) as f:
+        result = db.import_custom_words(args.user_id, args.list_name, f)
+    elapsed = time.perf_counter() - start
+    print(f"단어 가져오기 완료: 리스트 {result['list_id']}, "
+          f"{result['word_count']:,}단어 / {result['total_chars']:,}자 ({elapsed:.2f}초)")
+    return 0
+
+
+def read_passages(path, encoding):
+    """빈 줄로 구분한 문단을 (제목, 본문) 으로 (제목은 '파일 이름 번호')"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    paragraph = []
+    number = 0
+    with open(path, encoding=encoding) as f:
+        for line in itertools.chain(f, ['']):
+            if line.strip():
+                paragraph.append(line.strip())
+            elif paragraph:
+                number += 1
+                yield f'{name} {number}', ' '.join(paragraph)
+                paragraph = []
+
+
+def cmd_import_passages(db, args):
+    """텍스트 파일의 문단을 연습 지문으로 가져오기 (검색 색인 포함)"""
+    start = time.perf_counter()
+    result = db.import_practice_passages(args.user_id, read_passages(args.path, args.encoding))
+    elapsed = time.perf_counter() - start
+    print(f"지문 가져오기 완료: {result['passage_count']:,}개 / {result['total_chars']:,}자 ({elapsed:.2f}초)")
+    return 0
+
+
+def cmd_search(db, args):
+    """연습 지문 또는 사용자의 단어 리스트 전문 검색"""
+    start = time.perf_counter()
+    if args.words is not None:
+        rows = db.search_custom_words(args.words, args.query, prefix=not args.exact, limit=args.limit)
+        lines = [f"  [{row['list_name']}] {row['word']}" for row in rows]
+    else:
+        rows = db.search_practice_passages(args.query, prefix=not args.exact, phrase=args.phrase,
+                                           limit=args.limit)
+        lines = [f"  {row['passage_id']:>7} {row['title']}: {row['snippet']}" for row in rows]
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"검색 결과 {len(rows)}건 ({elapsed:.1f}ms)")
+    for line in lines:
+        print(line)
+    return 0
+
+
+def cmd_export(db, args):
+    """사용자 데이터 전체를 zip으로 내보내기"""
+    start = time.perf_counter()
+    counts = export_user_data(db, args.user_id, args.path, args.format, args.batch_size)
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    for name, count in counts.items():
+        print(f"  {name}: {count:,}행")
+    print(f"내보내기 완료: {total:,}행, {elapsed:.2f}초 ({total / max(elapsed, 1e-9):,.0f}행/초)")
+    return 0
+
+
+def cmd_merge(db, args):
+    """다른 데이터베이스 파일을 현재 데이터베이스에 병합"""
+    start = time.perf_counter()
+    counts = merge_database(db, args.source)
+    elapsed = time.perf_counter() - start
+    for name, count in counts.items():
+        print(f"  {name}: {count:,}행")
+    print(f"병합 완료: {elapsed:.2f}초")
+    return 0
+
+
+def cmd_compact(db, args):
+    """보존 기간이 지난 연습 기록 정리 후 빈 공간 반환"""
+    start = time.perf_counter()
+    report = RetentionJob(db, args.days, args.batch_size).run()
+
+    # 기존 파일은 처음 한 번 VACUUM 으로 incremental 모드 전환 (빈 공간도 이때 반환됨)
+    if not report['vacuum_enabled'] and enable_incremental_vacuum(db):
+        print("auto_vacuum 을 INCREMENTAL 로 전환했습니다")
+        report['file_size_after'] = os.path.getsize(db.db_name)
+
+    elapsed = time.perf_counter() - start
+    reclaimed = report['file_size_before'] - report['file_size_after']
+    print(f"기준일 {report['cutoff']} 이전 기록 {report['rows_compacted']:,}행 정리")
+    if report['uncovered_from']:
+        print(f"{report['uncovered_from']} 부터 일별 집계가 빠진 기록이 있어 기준일을 낮췄습니다 "
+              f"(backfill-daily-stats 로 집계를 채운 뒤 다시 실행하면 나머지도 정리)")
+    print(f"반환된 공간: {reclaimed:,}바이트 "
+          f"({report['file_size_before']:,} -> {report['file_size_after']:,}), {elapsed:.2f}초")
+    return 0
+
+
+def cmd_backup(db, args):
+    """앱이 실행 중이어도 안전한 온라인 백업 만들기"""
+    report = BackupJob(db, args.dir, args.keep).run()
+    print(f"백업 완료: {report['path']}")
+    print(f"  {report['pages']:,}페이지 / {report['size']:,}바이트, {report['steps']}단계, "
+          f"{report['elapsed']:.2f}초 (가장 긴 단계 {report['max_step_ms']:.1f}ms)")
+    for path in report['removed']:
+        print(f"  오래된 백업 삭제: {os.path.basename(path)}")
+    print(f"보관 중인 백업: {len(list_backups(db.db_name, args.dir))}개")
+    return 0
+
+
+def cmd_restore(db, args):
+    """백업 파일을 검사한 뒤 현재 데이터베이스에 덮어쓰기"""
+    try:
+        result = restore_backup(db, args.path, safety_backup=not args.no_safety_backup)
+    except ValueError as e:
+        print(e)
+        return 1
+    if result['safety_backup']:
+        print(f"복원 전 데이터베이스 백업: {result['safety_backup']}")
+    print(f"복원 완료: {args.path} (스키마 버전 {result['schema_version']})")
+    print("실행 중인 앱이 있으면 다시 시작하세요.")
+    return 0
+
+
+def build_parser():
+    """명령행 파서 생성"""
+    parser = argparse.ArgumentParser(description="타자 연습 데이터베이스 관리 도구")
+    parser.add_argument('--db', default='typing_practice.db', help="데이터베이스 파일 경로")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    backfill = subparsers.add_parser('backfill-daily-stats', help="연습 기록에서 일별 집계 다시 계산")
+    backfill.set_defaults(func=cmd_backfill_daily_stats)
+
+    rebuild = subparsers.add_parser('rebuild-derived', help="파생 값을 원본 행에서 다시 계산")
+    rebuild.add_argument('--check', action='store_true', help="바꾸지 않고 어긋난 값만 보고")
+    rebuild.set_defaults(func=cmd_rebuild_derived)
+
+    import_words = subparsers.add_parser('import-words', help="텍스트 파일에서 단어 리스트 가져오기")
+    import_words.add_argument('user_id', type=int, help="리스트를 소유할 사용자 ID")
+    import_words.add_argument('list_name', help="새 리스트 이름")
+    import_words.add_argument('path', help="한 줄에 한 단어인 텍스트 파일")
+    import_words.add_argument('--encoding', default='utf-8', help="파일 인코딩")
+    import_words.set_defaults(func=cmd_import_words)
+
+    import_passages = subparsers.add_parser('import-passages', help="텍스트 파일의 문단을 연습 지문으로 가져오기")
+    import_passages.add_argument('path', help="문단을 빈 줄로 구분한 텍스트 파일")
+    import_passages.add_argument('--user-id', type=int, default=None, help="지문을 소유할 사용자 ID (기본: 공용)")
+    import_passages.add_argument('--encoding', default='utf-8', help="파일 인코딩")
+    import_passages.set_defaults(func=cmd_import_passages)
+
+    search = subparsers.add_parser('search', help="연습 지문 또는 단어 리스트 검색")
+    search.add_argument('query', help="검색어")
+    search.add_argument('--phrase', action='store_true', help="낱말이 입력한 순서대로 붙어 있는 지문만")
+    search.add_argument('--exact', action='store_true', help="접두어가 아니라 어절 전체가 같은 것만")
+    search.add_argument('--words', type=int, metavar='USER_ID', default=None, help="이 사용자의 단어 리스트에서 검색")
+    search.add_argument('--limit', type=int, default=20, help="최대 결과 수")
+    search.set_defaults(func=cmd_search)
+
+    export = subparsers.add_parser('export', help="사용자 데이터 전체를 zip으로 내보내기")
+    export.add_argument('user_id', type=int, help="내보낼 사용자 ID")
+    export.add_argument('path', help="만들 zip 파일 경로")
+    export.add_argument('--format', choices=FORMATS, default='csv', help="테이블 파일 형식")
+    export.add_argument('--batch-size', type=int, default=1000, help="한 번에 읽을 행 수")
+    export.set_defaults(func=cmd_export)
+
+    merge = subparsers.add_parser('merge', help="다른 데이터베이스 파일의 데이터 병합")
+    merge.add_argument('source', help="병합할 typing_practice.db 파일 경로")
+    merge.set_defaults(func=cmd_merge)
+
+    compact = subparsers.add_parser('compact', help="오래된 연습 기록 정리 및 빈 공간 반환")
+    compact.add_argument('--days', type=int, default=DEFAULT_RETENTION_DAYS, help="원본 기록 보존 기간 (일)")
+    compact.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                         help="한 트랜잭션에서 삭제할 최대 행 수")
+    compact.set_defaults(func=cmd_compact)
+
+    backup = subparsers.add_parser('backup', help="온라인 백업 만들기 (오래된 백업은 정리)")
+    backup.add_argument('--dir', default=None, help="백업 폴더 (기본: DB 파일 옆 backups)")
+    backup.add_argument('--keep', type=int, default=DEFAULT_KEEP, help="보관할 백업 파일 수")
+    backup.set_defaults(func=cmd_backup)
+
+    restore = subparsers.add_parser('restore', help="무결성 검사 후 백업 파일로 복원")
+    restore.add_argument('path', help="복원할 백업 파일")
+    restore.add_argument('--no-safety-backup', action='store_true', help="복원 전 현재 DB 백업 생략")
+    restore.set_defaults(func=cmd_restore)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    db = Database(args.db)
+    try:
+        return args.func(db, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -238,23 +238,24 @@ class ProgrammingTypingMode:
 
         # 데이터베이스에 저장
         if self.db and self.user_id:
-            self.db.save_practice_record(
-                self.user_id,
-                f"프로그래밍 타이핑 ({self.current_language})",
-                score,
-                accuracy,
-                int(len(self.current_code) / max(elapsed, 1) * 60),
-                int(elapsed / 60)
-            )
-
-            # 경험치 추가
-            exp = int(score / 10)
-            level_result = self.db.add_exp(self.user_id, exp)
-
-            if level_result and level_result['leveled_up']:
+            session = self.db.finalize_session(self.user_id, {
+                'mode_name': f"프로그래밍 타이핑 ({self.current_language})",
+                'score': score,
+                'accuracy': accuracy,
+                'speed': int(len(self.current_code) / max(elapsed, 1) * 60),
+                'practice_time': int(elapsed / 60)
+            })
+
+            if session['leveled_up']:
                 messagebox.showinfo(
                     "레벨 업!",
-                    f"축하합니다! 레벨 {level_result['new_level']}로 올랐습니다!"
+                    f"축하합니다! 레벨 {session['new_level']}로 올랐습니다!"
+                )
+
+            if session['achievements']:
+                messagebox.showinfo(
+                    "업적 달성!",
+                    "새로운 업적을 달성했습니다:\n" + "\n".join(session['achievements'])
                 )
 
         self.load_new_code()
@@ -542,14 +543,13 @@ class BattleRoyaleGame:
 
         # 데이터베이스에 저장
         if self.db and self.user_id and won:
-            self.db.save_practice_record(
-                self.user_id,
-                "배틀 로얄",
-                score,
-                100,
-                int(self.words_typed / max(elapsed, 1) * 60),
-                int(elapsed / 60)
-            )
+            self.db.finalize_session(self.user_id, {
+                'mode_name': "배틀 로얄",
+                'score': score,
+                'accuracy': 100,
+                'speed': int(self.words_typed / max(elapsed, 1) * 60),
+                'practice_time': int(elapsed / 60)
+            })
 
 
 class RPGStoryMode:
@@ -854,14 +854,13 @@ class RPGStoryMode:
 
         # 데이터베이스에 저장
         if self.db and self.user_id:
-            self.db.save_practice_record(
-                self.user_id,
-                "RPG 스토리 모드",
-                total_score,
-                100,
-                0,
-                10
-            )
+            self.db.finalize_session(self.user_id, {
+                'mode_name': "RPG 스토리 모드",
+                'score': total_score,
+                'accuracy': 100,
+                'speed': 0,
+                'practice_time': 10
+            })
 
     def game_over(self):
         """게임 오버"""
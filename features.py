@@ -8,11 +8,13 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 import random
 
+from db_instrumentation import format_stats
+
 
 class LeaderboardWindow:
     """리더보드/랭킹 시스템"""
 
-    def __init__(self, parent, database, user_id):
+    def __init__(self, parent, database, user_id, async_db=None):
         self.window = tk.Toplevel(parent)
         self.window.title("리더보드")
         self.window.geometry("900x700")
@@ -21,6 +23,7 @@ class LeaderboardWindow:
 
         self.db = database
         self.user_id = user_id
+        self.async_db = async_db  # 있으면 조회를 작업 스레드에서 실행
 
         self.create_widgets()
         self.load_leaderboard()
@@ -109,19 +112,49 @@ class LeaderboardWindow:
         self.load_leaderboard()
 
     def load_leaderboard(self):
+        tab = self.current_tab.get()
+
+        if self.async_db:
+            self.async_db.submit(
+                self.fetch_leaderboard, tab,
+                callback=lambda data: self.show_leaderboard(tab, *data)
+            )
+        else:
+            self.show_leaderboard(tab, *self.fetch_leaderboard(tab))
+
+    def fetch_leaderboard(self, tab):
+        """리더보드와 내 순위 조회 (작업 스레드에서도 호출됨)"""
+        mode_name = None if tab == '전체' else tab
+        records = self.db.get_leaderboard(mode_name=mode_name, limit=50)
+        my_rank = self.db.get_user_rank(self.user_id, mode_name) if self.user_id else None
+        return records, my_rank
+
+    def show_leaderboard(self, tab, records, my_rank):
+        """조회 결과 표시"""
+        # 창이 닫혔거나 다른 탭으로 바뀐 뒤 도착한 결과는 무시
+        if not self.window.winfo_exists() or tab != self.current_tab.get():
+            return
+
         # 기존 위젯 제거
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
 
-        tab = self.current_tab.get()
-
         if tab == '전체':
-            records = self.db.get_leaderboard(mode_name=None, limit=50)
             columns = ['순위', '사용자명', '총 점수', '총 연습시간']
         else:
-            records = self.db.get_leaderboard(mode_name=tab, limit=50)
             columns = ['순위', '사용자명', '최고 점수', '최고 정확도', '최고 속도']
 
+        # 내 순위
+        if self.user_id:
+            rank_text = f"내 순위: {my_rank['rank']:,}위 / {my_rank['total']:,}명" if my_rank else "내 순위: 기록 없음"
+            tk.Label(
+                self.scrollable_frame,
+                text=rank_text,
+                font=('맑은 고딕', 11, 'bold'),
+                bg='white',
+                fg='#2C3E50'
+            ).pack(anchor=tk.W, padx=15, pady=(10, 0))
+
         # 헤더
         header_frame = tk.Frame(self.scrollable_frame, bg='#3498DB')
         header_frame.pack(fill=tk.X, padx=15, pady=(10, 0))
@@ -263,9 +296,10 @@ class AchievementsWindow:
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
 
-        # 사용자가 달성한 업적 가져오기
+        # 사용자가 달성한 업적과 진행도 가져오기
         unlocked_achievements = self.db.get_achievements(self.user_id)
         unlocked_names = {ach['achievement_name'] for ach in unlocked_achievements}
+        progress_by_name = {p['name']: p for p in self.db.get_achievement_progress(self.user_id)}
 
         # 진행도 업데이트
         total = len(self.ALL_ACHIEVEMENTS)
@@ -321,6 +355,18 @@ class AchievementsWindow:
                 fg='#7F8C8D'
             ).pack(anchor=tk.W, pady=(5, 0))
 
+            # 진행도 (잠긴 업적)
+            progress = progress_by_name.get(ach['name'])
+            if not is_unlocked and progress:
+                tk.Label(
+                    info_frame,
+                    text=f"진행도: {progress['current']:g} / {progress['threshold']:g} "
+                         f"({progress['progress'] * 100:.0f}%)",
+                    font=('맑은 고딕', 8),
+                    bg=frame['bg'],
+                    fg='#2980B9'
+                ).pack(anchor=tk.W)
+
             # 달성 시간
             if is_unlocked:
                 for unlocked_ach in unlocked_achievements:
@@ -339,7 +385,7 @@ class AchievementsWindow:
 class StatisticsWindow:
     """통계 대시보드 (matplotlib 사용)"""
 
-    def __init__(self, parent, database, user_id):
+    def __init__(self, parent, database, user_id, async_db=None):
         self.window = tk.Toplevel(parent)
         self.window.title("통계 대시보드")
         self.window.geometry("1000x800")
@@ -348,6 +394,7 @@ class StatisticsWindow:
 
         self.db = database
         self.user_id = user_id
+        self.async_db = async_db  # 있으면 조회를 작업 스레드에서 실행
 
         self.create_widgets()
         self.load_statistics()
@@ -405,31 +452,58 @@ class StatisticsWindow:
         close_btn.pack(pady=10)
 
     def load_statistics(self):
+        if self.async_db:
+            self.async_db.submit(
+                self.fetch_statistics,
+                callback=lambda data: self.show_statistics(*data),
+                errback=self.show_error
+            )
+            return
+
+        try:
+            self.show_statistics(*self.fetch_statistics())
+        except Exception as e:
+            self.show_error(e)
+
+    def fetch_statistics(self):
+        """최근 7일 기록과 모드별 분포 조회 (작업 스레드에서도 호출됨)"""
+        history = self.db.get_practice_history(self.user_id, days=7)
+        mode_dist = self.db.get_mode_distribution(self.user_id)
+        return history, mode_dist
+
+    def show_statistics(self, history, mode_dist):
+        """조회 결과로 차트 표시"""
+        if not self.window.winfo_exists():
+            return
+
         # 기존 위젯 제거
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
 
         try:
             # 최근 7일 연습 기록
-            history = self.db.get_practice_history(self.user_id, days=7)
-
             if history:
                 self.create_practice_history_chart(history)
 
             # 모드별 분포
-            mode_dist = self.db.get_mode_distribution(self.user_id)
-
             if mode_dist:
                 self.create_mode_distribution_chart(mode_dist)
 
         except Exception as e:
-            tk.Label(
-                self.scrollable_frame,
-                text=f"통계 로드 중 오류: {str(e)}",
-                font=('맑은 고딕', 12),
-                bg='#E8F4F8',
-                fg='red'
-            ).pack(pady=20)
+            self.show_error(e)
+
+    def show_error(self, e):
+        """통계 로드 오류 표시"""
+        if not self.window.winfo_exists():
+            return
+
+        tk.Label(
+            self.scrollable_frame,
+            text=f"통계 로드 중 오류: {str(e)}",
+            font=('맑은 고딕', 12),
+            bg='#E8F4F8',
+            fg='red'
+        ).pack(pady=20)
 
     def create_practice_history_chart(self, history):
         """최근 7일 연습 기록 차트"""
@@ -664,8 +738,10 @@ class WeaknessAnalysisWindow:
 
         tk.Label(header, text="키", font=('맑은 고딕', 10, 'bold'), bg='#ECF0F1', width=8).pack(side=tk.LEFT, padx=5)
         tk.Label(header, text="총 입력", font=('맑은 고딕', 10, 'bold'), bg='#ECF0F1', width=10).pack(side=tk.LEFT, padx=5)
-        tk.Label(header, text="평균 시간", font=('맑은 고딕', 10, 'bold'), bg='#ECF0F1', width=10).pack(side=tk.LEFT, padx=5)
-        tk.Label(header, text="정확도", font=('맑은 고딕', 10, 'bold'), bg='#ECF0F1', width=10).pack(side=tk.LEFT, padx=5)
+        tk.Label(header, text="중앙값", font=('맑은 고딕', 10, 'bold'), bg='#ECF0F1', width=8).pack(side=tk.LEFT, padx=5)
+        tk.Label(header, text="느릴 때(p90)", font=('맑은 고딕', 10, 'bold'), bg='#ECF0F1', width=10).pack(side=tk.LEFT, padx=5)
+        tk.Label(header, text="일관성", font=('맑은 고딕', 10, 'bold'), bg='#ECF0F1', width=8).pack(side=tk.LEFT, padx=5)
+        tk.Label(header, text="정확도", font=('맑은 고딕', 10, 'bold'), bg='#ECF0F1', width=8).pack(side=tk.LEFT, padx=5)
 
         # 데이터
         for i, key in enumerate(slow_keys):
@@ -675,8 +751,11 @@ class WeaknessAnalysisWindow:
 
             tk.Label(row, text=key['key_char'], font=('맑은 고딕', 12, 'bold'), bg=bg_color, width=8).pack(side=tk.LEFT, padx=5)
             tk.Label(row, text=str(key['total_presses']), font=('맑은 고딕', 10), bg=bg_color, width=10).pack(side=tk.LEFT, padx=5)
-            tk.Label(row, text=f"{key['avg_time']:.3f}s", font=('맑은 고딕', 10), bg=bg_color, fg='#F39C12', width=10).pack(side=tk.LEFT, padx=5)
-            tk.Label(row, text=f"{key['accuracy']:.1f}%", font=('맑은 고딕', 10), bg=bg_color, width=10).pack(side=tk.LEFT, padx=5)
+            consistency = '-' if key['consistency'] is None else f"{key['consistency']}"
+            tk.Label(row, text=f"{key['p50_time']:.3f}s", font=('맑은 고딕', 10), bg=bg_color, fg='#F39C12', width=8).pack(side=tk.LEFT, padx=5)
+            tk.Label(row, text=f"{key['p90_time']:.3f}s", font=('맑은 고딕', 10), bg=bg_color, width=10).pack(side=tk.LEFT, padx=5)
+            tk.Label(row, text=consistency, font=('맑은 고딕', 10), bg=bg_color, width=8).pack(side=tk.LEFT, padx=5)
+            tk.Label(row, text=f"{key['accuracy']:.1f}%", font=('맑은 고딕', 10), bg=bg_color, width=8).pack(side=tk.LEFT, padx=5)
 
         tk.Label(frame, text="", bg='white').pack(pady=5)
 
@@ -813,3 +892,66 @@ class DailyGoalWidget(tk.Frame):
                 messagebox.showerror("오류", "올바른 숫자를 입력하세요.")
 
         ttk.Button(dialog, text="저장", command=save_goal).pack(pady=20)
+
+
+class DatabaseStatsWindow:
+    """데이터베이스 계측 결과 (디버그용)"""
+
+    REFRESH_MS = 2000
+
+    def __init__(self, parent, database):
+        self.window = tk.Toplevel(parent)
+        self.window.title("DB 통계")
+        self.window.geometry("1000x700")
+        self.window.configure(bg='#E8F4F8')
+        self.window.transient(parent)
+
+        self.db = database
+
+        self.create_widgets()
+        self.refresh()
+
+    def create_widgets(self):
+        self.text = scrolledtext.ScrolledText(
+            self.window,
+            font=('Consolas', 10),
+            wrap=tk.NONE
+        )
+        self.text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        button_frame = tk.Frame(self.window, bg='#E8F4F8')
+        button_frame.pack(pady=10)
+
+        tk.Button(
+            button_frame,
+            text="초기화",
+            command=self.reset,
+            font=('맑은 고딕', 11),
+            width=12
+        ).pack(side=tk.LEFT, padx=5)
+
+        tk.Button(
+            button_frame,
+            text="닫기",
+            command=self.window.destroy,
+            bg='#E74C3C',
+            fg='white',
+            font=('맑은 고딕', 11, 'bold'),
+            width=12
+        ).pack(side=tk.LEFT, padx=5)
+
+    def refresh(self):
+        """통계 다시 표시 (창이 열려 있는 동안 주기적으로)"""
+        if not self.window.winfo_exists():
+            return
+        position = self.text.yview()[0]
+        self.text.delete('1.0', tk.END)
+        self.text.insert('1.0', format_stats(self.db.stats()))
+        self.text.yview_moveto(position)
+        self.window.after(self.REFRESH_MS, self.refresh)
+
+    def reset(self):
+        """모은 계측 통계 비우기"""
+        if self.db.instrumentation:
+            self.db.instrumentation.reset()
+        self.refresh()
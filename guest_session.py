@@ -0,0 +1,87 @@
+"""
+게스트 세션 모듈
+게스트는 디스크에 아무것도 쓰지 않는 메모리 데이터베이스를 사용한다.
+스키마가 같으므로 통계, 약점 분석, 목표, 기록 등 모든 기능이 그대로 동작하고,
+게스트가 계정을 만들면 세션 데이터를 백업 API 로 복사해 디스크 DB에 병합한다.
+"""
+import os
+import sqlite3
+import tempfile
+
+from database import Database
+from db_merge import merge_database
+
+
+GUEST_USERNAME = '손님'
+
+
+class GuestSession:
+    """메모리 DB 에 만든 게스트 사용자 하나"""
+
+    def __init__(self):
+        self.db = Database(':memory:')
+        success, self.user_id = self.db.create_user(GUEST_USERNAME, os.urandom(16).hex())
+        if not success:
+            raise RuntimeError(self.user_id)
+
+    def user_info(self):
+        """로그인 콜백에 넘길 사용자 정보"""
+        return {'user_id': self.user_id, 'username': GUEST_USERNAME, 'total_score': 0}
+
+    def has_data(self):
+        """저장할 만한 연습 기록이 있는지"""
+        self.db.flush_key_stats()
+        with self.db.transaction() as cursor:
+            cursor.execute('SELECT EXISTS (SELECT 1 FROM practice_records WHERE user_id = ?)',
+                           (self.user_id,))
+            return bool(cursor.fetchone()[0])
+
+    def promote(self, disk_db, username, password, email=None):
+        """게스트 데이터를 디스크 DB 의 새 계정으로 옮기기
+
+        백업 API 로 메모리 DB 를 임시 파일에 복사하고, 복사본의 게스트 사용자만
+        새 계정 이름/비밀번호로 바꾼 뒤 merge_database 로 한 트랜잭션에 병합한다.
+        메모리 DB 의 게스트 행은 바꾸지 않으므로 실패해도 되돌릴 것이 없다.
+
+        Returns:
+            (True, 새 user_id) 또는 (False, 오류 메시지)
+        """
+        with disk_db.transaction() as cursor:
+            cursor.execute('SELECT 1 FROM users WHERE username = ?', (username,))
+            if cursor.fetchone():
+                return False, "이미 존재하는 사용자명입니다."
+
+        self.db.flush_key_stats()
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                snapshot_path = os.path.join(tmp_dir, 'guest.db')
+                snapshot = sqlite3.connect(snapshot_path)
+                try:
+                    self.db.get_connection().backup(snapshot)
+                    with snapshot:
+                        snapshot.execute(
+                            'UPDATE users SET username = ?, password = ?, email = ? WHERE user_id = ?',
+                            (username, self.db.hash_password(password), email, self.user_id))
+                finally:
+                    snapshot.close()
+                merge_database(disk_db, snapshot_path)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            return False, str(e)
+
+        # 중복 확인 이후 같은 이름이 생겼으면 merge_database 가 '이름_원본ID' (그것도 있으면 더 붙임) 로 바꿈
+        renamed = f'{username}_{self.user_id}'
+        with disk_db.transaction() as cursor:
+            cursor.execute('''
+                SELECT user_id FROM users
+                WHERE (username = ? OR substr(username, 1, ?) = ?) AND password = ?
+                ORDER BY username = ? DESC, user_id DESC
+                LIMIT 1
+            ''', (username, len(renamed), renamed, self.db.hash_password(password), username))
+            row = cursor.fetchone()
+        if row is None:
+            return False, "계정을 만들지 못했습니다."
+        return True, row['user_id']
+
+    def close(self):
+        """메모리 DB 해제 (계정을 만들지 않았으면 게스트 데이터는 사라짐)"""
+        self.db.close()
@@ -0,0 +1,106 @@
+"""
+키 입력 시간 히스토그램 모듈
+키별 입력 간격을 고정 구간 로그 스케일 히스토그램으로 누적한다.
+히스토그램은 key_statistics.latency_hist 에 4바이트 정수 배열 BLOB 으로 저장되며,
+SQL 함수 latency_hist_merge 로 UPSERT 안에서 그대로 합쳐진다.
+
+구간 (BUCKET_COUNT 개):
+    0번: MIN_TIME 미만
+    i번: MIN_TIME * GROWTH^(i-1) 이상 MIN_TIME * GROWTH^i 미만 (구간 폭 약 12%)
+    마지막: 그 이상 전부 (약 13초 이상)
+"""
+import math
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+
+
+BUCKET_COUNT = 64
+MIN_TIME = 0.01                      # 초
+GROWTH = 2 ** (1 / 6)                # 구간 하나당 배율 (6구간마다 2배)
+TYPECODE = 'I'                       # 부호 없는 4바이트 정수
+HIST_BYTES = BUCKET_COUNT * array(TYPECODE).itemsize
+
+# 구간 경계 (i번 구간의 하한은 BOUNDS[i - 1], 상한은 BOUNDS[i])
+BOUNDS = [MIN_TIME * GROWTH ** i for i in range(BUCKET_COUNT - 1)]
+_LOG_GROWTH = math.log(GROWTH)
+
+
+def bucket_index(seconds):
+    """입력 간격(초)이 들어갈 구간 번호"""
+    if seconds < MIN_TIME:
+        return 0
+    return min(BUCKET_COUNT - 1, 1 + int(math.log(seconds / MIN_TIME) / _LOG_GROWTH))
+
+
+def new_histogram():
+    """빈 히스토그램"""
+    return array(TYPECODE, bytes(HIST_BYTES))
+
+
+def to_blob(hist):
+    """히스토그램을 저장용 BLOB 으로 (항상 리틀 엔디언)"""
+    if sys.byteorder == 'big':
+        hist = array(TYPECODE, hist)
+        hist.byteswap()
+    return hist.tobytes()
+
+
+def from_blob(blob):
+    """저장된 BLOB 을 히스토그램으로 (NULL 이거나 크기가 다르면 빈 히스토그램)"""
+    hist = array(TYPECODE)
+    if blob is None or len(blob) != HIST_BYTES:
+        return new_histogram()
+    hist.frombytes(blob)
+    if sys.byteorder == 'big':
+        hist.byteswap()
+    return hist
+
+
+def merge_blobs(current, added):
+    """SQL 함수 latency_hist_merge: 두 히스토그램 BLOB 의 구간별 합"""
+    if current is None:
+        return added
+    if added is None:
+        return current
+    return to_blob(array(TYPECODE, map(int.__add__, from_blob(current), from_blob(added))))
+
+
+def percentiles(hist, quantiles):
+    """히스토그램에서 분위수(초) 목록 계산 (샘플이 없으면 None 목록)
+
+    누적 합 배열을 한 번 만들고 분위수마다 이진 탐색한 뒤,
+    구간 안에서는 로그 스케일로 보간한다.
+    """
+    cumulative = list(accumulate(hist))
+    total = cumulative[-1]
+    if not total:
+        return [None] * len(quantiles)
+
+    results = []
+    for q in quantiles:
+        rank = q * total
+        index = bisect_left(cumulative, rank)
+        below = cumulative[index - 1] if index else 0
+        fraction = (rank - below) / hist[index]
+        if index == 0:
+            results.append(MIN_TIME * fraction)
+        elif index == BUCKET_COUNT - 1:
+            results.append(BOUNDS[-1])
+        else:
+            results.append(BOUNDS[index - 1] * GROWTH ** fraction)
+    return results
+
+
+def latency_summary(blob):
+    """p50/p90/p99 (초) 와 일관성 점수 (p50/p90 비율, 0~100, 높을수록 고름)"""
+    p50, p90, p99 = percentiles(from_blob(blob), (0.5, 0.9, 0.99))
+    if p50 is None:
+        return {'p50_time': None, 'p90_time': None, 'p99_time': None, 'consistency': None}
+    return {
+        'p50_time': round(p50, 4),
+        'p90_time': round(p90, 4),
+        'p99_time': round(p99, 4),
+        'consistency': round(100 * p50 / p90) if p90 else 100
+    }
@@ -0,0 +1,122 @@
+"""
+키 입력 로그 모듈
+세션의 키 입력 이벤트 (기대 글자, 입력 글자, 직전 입력과의 간격 ms) 를
+작은 이진 형식으로 인코딩한다. 세션 하나가 session_keystrokes 의 BLOB 하나가 된다.
+
+형식 (버전 1):
+    b'KS' + 버전(1바이트) + zlib(본문)
+    본문 = varint 사전 크기, 사전 항목들 (varint 바이트 길이 + UTF-8),
+           varint 이벤트 수, 이벤트들
+    이벤트 = varint (기대 글자 번호 << 1 | 오타 여부)
+             [오타면 varint 입력 글자 번호]
+             varint 간격(ms)
+"""
+import time
+import zlib
+
+
+MAGIC = b'KS'
+FORMAT_VERSION = 1
+
+
+def write_varint(out, value):
+    """부호 없는 정수를 LEB128 varint 로 bytearray 에 추가"""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(view, pos):
+    """memoryview 의 pos 에서 varint 읽기 (값, 다음 위치) 반환"""
+    result = 0
+    shift = 0
+    while True:
+        byte = view[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_events(events):
+    """(기대 글자, 입력 글자, 간격 ms) 이벤트 목록을 BLOB 으로 인코딩"""
+    chars = {}
+    body = bytearray()
+    count = 0
+
+    for expected, typed, delta_ms in events:
+        expected_index = chars.setdefault(expected, len(chars))
+        if typed == expected:
+            write_varint(body, expected_index << 1)
+        else:
+            write_varint(body, expected_index << 1 | 1)
+            write_varint(body, chars.setdefault(typed, len(chars)))
+        write_varint(body, max(0, int(delta_ms)))
+        count += 1
+
+    header = bytearray()
+    write_varint(header, len(chars))
+    for char in chars:
+        encoded = char.encode('utf-8')
+        write_varint(header, len(encoded))
+        header += encoded
+    write_varint(header, count)
+
+    return MAGIC + bytes([FORMAT_VERSION]) + zlib.compress(bytes(header + body), 9)
+
+
+def iter_events(blob):
+    """BLOB 의 이벤트를 (기대 글자, 입력 글자, 간격 ms) 튜플로 하나씩 반환
+
+    압축 해제 결과를 memoryview 로 읽으므로 이벤트마다 바이트를 복사하지 않는다.
+    """
+    view = memoryview(blob)
+    if bytes(view[:2]) != MAGIC:
+        raise ValueError("키 입력 로그 형식이 아닙니다")
+    if view[2] != FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 키 입력 로그 버전입니다: {view[2]}")
+
+    data = memoryview(zlib.decompress(view[3:]))
+    size, pos = read_varint(data, 0)
+    chars = []
+    for _ in range(size):
+        length, pos = read_varint(data, pos)
+        chars.append(str(data[pos:pos + length], 'utf-8'))
+        pos += length
+
+    count, pos = read_varint(data, pos)
+    for _ in range(count):
+        code, pos = read_varint(data, pos)
+        expected = chars[code >> 1]
+        if code & 1:
+            typed_index, pos = read_varint(data, pos)
+            typed = chars[typed_index]
+        else:
+            typed = expected
+        delta_ms, pos = read_varint(data, pos)
+        yield expected, typed, delta_ms
+
+
+class KeystrokeRecorder:
+    """연습 중 키 입력 이벤트 수집"""
+
+    def __init__(self):
+        self.events = []
+        self._last_time = None
+
+    def reset(self):
+        """새 세션 시작"""
+        self.events = []
+        self._last_time = None
+
+    def record(self, expected, typed, now=None):
+        """키 입력 하나 기록 (첫 입력의 간격은 0)"""
+        now = time.perf_counter() if now is None else now
+        delta_ms = 0 if self._last_time is None else round((now - self._last_time) * 1000)
+        self._last_time = now
+        self.events.append((expected, typed, delta_ms))
+
+    def __len__(self):
+        return len(self.events)
@@ -0,0 +1,132 @@
+"""
+순위 인덱스 점검 도구
+한 Database 를 두 스레드가 함께 쓰면서 (한쪽은 연습 기록 저장, 다른 쪽은 순위 조회)
+다른 연결 (다른 프로세스 역할) 도 가끔 점수를 바꾸게 한 뒤,
+LeaderboardIndex 가 증분 반영으로 동작하는지 (다시 읽은 횟수) 와
+끝난 뒤 모든 사용자/모드의 순위가 SQL 로 센 순위와 같은지 확인한다.
+
+사용법:
+    python leaderboard_check.py [--users 200] [--writes 2000] [--external-writes 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+
+from database import Database
+
+
+MODES = ['자리 연습', '낱말 연습', '짧은 글 연습']
+SEED = 7
+
+
+def writer(db, user_ids, writes, external_db, external_writes, done):
+    """연습 기록을 저장하고, 중간중간 다른 연결로 점수 변경"""
+    rng = random.Random(SEED)
+    external_every = max(1, writes // (external_writes + 1))
+    try:
+        for i in range(1, writes + 1):
+            db.save_practice_record(rng.choice(user_ids), rng.choice(MODES), rng.randint(0, 1000),
+                                    95.0, 300, 1)
+            if i % external_every == 0 and external_writes:
+                external_writes -= 1
+                external_db.update_user_score(rng.choice(user_ids), rng.randint(1, 500))
+    finally:
+        done.set()
+
+
+def reader(db, user_ids, done, counts, errors):
+    """저장이 끝날 때까지 순위 조회"""
+    rng = random.Random(SEED + 1)
+    try:
+        while not done.is_set():
+            db.get_user_rank(rng.choice(user_ids), rng.choice(MODES + [None]))
+            counts['ranks'] += 1
+    except Exception as e:
+        errors.append(repr(e))
+
+
+def find_wrong_ranks(db, user_ids):
+    """인덱스 순위와 SQL 로 센 순위가 다른 (사용자, 모드) 목록"""
+    problems = []
+    conn = db.get_connection()
+    for mode_name in MODES + [None]:
+        for user_id in user_ids:
+            result = db.get_user_rank(user_id, mode_name)
+            if mode_name is None:
+                row = conn.execute('''
+                    SELECT (SELECT COUNT(*) FROM users WHERE total_score > u.total_score) + 1,
+                           (SELECT COUNT(*) FROM users)
+                    FROM users u WHERE u.user_id = ?
+                ''', (user_id,)).fetchone()
+            else:
+                row = conn.execute('''
+                    SELECT (SELECT COUNT(*) FROM high_scores
+                            WHERE mode_name = h.mode_name AND high_score > h.high_score) + 1,
+                           (SELECT COUNT(*) FROM high_scores WHERE mode_name = h.mode_name)
+                    FROM high_scores h WHERE h.user_id = ? AND h.mode_name = ?
+                ''', (user_id, mode_name)).fetchone()
+            expected = (row[0], row[1]) if row else None
+            actual = (result['rank'], result['total']) if result else None
+            if actual != expected:
+                problems.append(f"사용자 {user_id} {mode_name or '전체'}: 인덱스 {actual} / SQL {expected}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="순위 인덱스 점검")
+    parser.add_argument('--users', type=int, default=200, help="사용자 수")
+    parser.add_argument('--writes', type=int, default=2000, help="저장할 연습 기록 수")
+    parser.add_argument('--external-writes', type=int, default=5, help="다른 연결로 바꿀 점수 횟수")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'leaderboard_check.db')
+        db = Database(db_path)
+        external_db = Database(db_path)
+        try:
+            user_ids = [db.create_user(f'rank{i:03d}', 'pw')[1] for i in range(args.users)]
+            done = threading.Event()
+            counts = {'ranks': 0}
+            errors = []
+            threads = [
+                threading.Thread(target=writer, args=(db, user_ids, args.writes, external_db,
+                                                      args.external_writes, done)),
+                threading.Thread(target=reader, args=(db, user_ids, done, counts, errors)),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            stats = db.leaderboard.stats()
+            problems = find_wrong_ranks(db, user_ids)
+        finally:
+            external_db.close()
+            db.close()
+
+    # 목록마다 처음 한 번 + 다른 연결이 바꿀 때마다 다시 읽기. 다른 연결의 변경 직후에는
+    # 커밋 전 스냅샷으로 읽은 목록을 저장하지 않고 한 번 더 읽을 수 있어 두 배까지 허용
+    max_loads = 2 * (args.external_writes + 1) * (len(MODES) + 1)
+    print(f"순위 조회 {counts['ranks']:,}번, 기록 저장 {args.writes:,}번 (다른 연결 {args.external_writes}번)")
+    print(f"점수 목록 읽기 {stats['loads']}번 (허용 {max_loads}번), 증분 반영 {stats['applied']:,}번")
+
+    failures = []
+    if errors:
+        failures.append(f"조회 오류 {len(errors)}건 (예: {errors[0]})")
+    if stats['loads'] > max_loads:
+        failures.append(f"점수 목록을 {stats['loads']}번 다시 읽었습니다 (증분 반영이 동작하지 않음)")
+    failures.extend(problems[:10])
+
+    for failure in failures:
+        print(f"[실패] {failure}")
+    if failures:
+        return 1
+    print("통과: 증분 반영으로 순위 유지, 모든 순위가 SQL 과 일치")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
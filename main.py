@@ -6,6 +6,7 @@ import tkinter as tk
 from tkinter import ttk, font
 import sys
 import os
+import json
 
 # 모듈 임포트
 from keyboard_widget import VirtualKeyboard
@@ -20,9 +21,14 @@ from games import (
 from quizzes import SpellingQuiz, ChoSeongQuiz
 from auth import AuthScreen
 from database import Database
+from async_database import AsyncDatabase
+from guest_session import GuestSession
+from user_settings import UserSettings
+from retention import RetentionJob
+from db_backup import BackupJob, seconds_since_last_backup
 from features import (
     LeaderboardWindow, AchievementsWindow, StatisticsWindow,
-    WeaknessAnalysisWindow, DailyGoalWidget
+    WeaknessAnalysisWindow, DailyGoalWidget, DatabaseStatsWindow
 )
 from advanced_features import (
     ThemeManager, ThemeSelectorDialog, CustomPracticeMode,
@@ -44,6 +50,12 @@ from additional_features import (
 class TypingPracticeApp:
     """메인 타자 연습 애플리케이션"""
 
+    # 오래된 기록 정리 (유휴 타이머)
+    MAINTENANCE_IDLE_MS = 60 * 1000               # 시작 후/연습 중일 때 다시 확인할 간격
+    MAINTENANCE_STEP_MS = 200                     # 정리 작업 조각 사이 간격
+    MAINTENANCE_INTERVAL_MS = 6 * 60 * 60 * 1000  # 정리 완료 후 다음 정리까지
+    BACKUP_INTERVAL_MS = 24 * 60 * 60 * 1000      # 자동 백업 간격
+
     def __init__(self, root):
         self.root = root
         self.root.title("NAK 타자 연습")
@@ -55,8 +67,21 @@ class TypingPracticeApp:
         self.title_font = font.Font(family="맑은 고딕", size=14, weight="bold")
         self.big_font = font.Font(family="맑은 고딕", size=16, weight="bold")
 
-        # 데이터베이스
-        self.db = Database()
+        # 데이터베이스 (느린 조회는 async_db 작업 스레드로, db_daemon.py 가 실행 중이면 데몬을 거침)
+        self.db = Database(use_daemon=True)
+        self.async_db = AsyncDatabase(self.db, self.root)
+
+        # 게스트는 메모리 DB 를 쓰는 동안 self.db/self.async_db 가 바뀌므로 디스크 DB 를 따로 보관
+        self.disk_db = self.db
+        self.disk_async_db = self.async_db
+        self.guest = None
+
+        # TYPING_DB_STATS=파일경로 이면 DB 계측을 켜고 종료 시 통계를 JSON 으로 저장
+        # (Ctrl+Shift+D: 통계 창)
+        self.db_stats_path = os.environ.get('TYPING_DB_STATS')
+        if self.db_stats_path:
+            self.db.enable_instrumentation()
+            self.root.bind_all('<Control-D>', lambda e: DatabaseStatsWindow(self.root, self.db))
 
         # 사용자 정보
         self.user_id = None
@@ -74,6 +99,18 @@ class TypingPracticeApp:
         # 테마
         self.current_theme = 'light'
 
+        # 사용자 설정 (로그인 시 로드, 변경은 지연 저장)
+        self.settings = None
+
+        # 유휴 시간에 오래된 연습 기록을 조금씩 정리
+        self.retention_job = None
+        self.root.after(self.MAINTENANCE_IDLE_MS, self.run_maintenance_step)
+
+        # 하루에 한 번 온라인 백업 (백업 전용 작업 스레드에서 실행해 다른 조회를 막지 않음)
+        self.backup_job = None
+        self.backup_async = AsyncDatabase(self.disk_db, self.root)
+        self.root.after(self.MAINTENANCE_IDLE_MS, self.run_backup)
+
         # 로그인 화면 표시
         self.show_auth_screen()
 
@@ -83,51 +120,31 @@ class TypingPracticeApp:
 
     def on_login_success(self, user_info):
         """로그인 성공 시 호출되는 콜백"""
+        if user_info.get('user_id') is None:
+            user_info = self.start_guest_session(user_info)
+
         try:
             self.user_id = user_info.get('user_id')
             self.user_name = user_info.get('username', '손님')
             self.user_score = user_info.get('total_score', 0)
 
-            # 로그인 스트릭 업데이트
+            # 로그인 스트릭 업데이트와 업적 체크 (작업 스레드에서 실행)
             if self.user_id:
-                try:
-                    self.db.update_login_streak(self.user_id)
-                except Exception as e:
-                    print(f"로그인 스트릭 업데이트 오류: {e}")
-
-                # 업적 체크
-                try:
-                    unlocked = self.db.check_achievements(self.user_id)
-                    if unlocked:
-                        self.sound_manager.play_achievement_sound()
-                        from tkinter import messagebox
-                        messagebox.showinfo("업적 달성!", f"새로운 업적을 달성했습니다:\n" + "\n".join(unlocked))
-                except Exception as e:
-                    print(f"업적 체크 오류: {e}")
-
-                # 테마 로드
-                try:
-                    self.current_theme = self.db.get_user_theme(self.user_id)
-                except Exception as e:
-                    print(f"테마 로드 오류: {e}")
-                    self.current_theme = 'light'
+                self.async_db.submit(
+                    self.process_login, self.user_id,
+                    callback=self.on_login_processed,
+                    errback=lambda e: print(f"로그인 스트릭/업적 처리 오류: {e}")
+                )
 
-                # 사용자 설정 로드
+                # 사용자 설정과 테마 로드 (한 번 읽어 메모리에 유지)
                 try:
-                    settings = self.db.get_user_settings(self.user_id)
-                    if settings:
-                        self.sound_manager.set_enabled(settings['sound_enabled'])
-                        self.sound_manager.set_volume(settings['volume'])
+                    self.settings = UserSettings(self.db, self.user_id, self.root)
+                    self.current_theme = self.settings.get('theme')
+                    self.sound_manager.set_enabled(self.settings.get('sound_enabled'))
+                    self.sound_manager.set_volume(self.settings.get('volume'))
                 except Exception as e:
                     print(f"사용자 설정 로드 오류: {e}")
-
-                # 스트릭 정보 가져오기
-                try:
-                    user_full_info = self.db.get_user_info(self.user_id)
-                    if user_full_info:
-                        self.login_streak = user_full_info.get('login_streak', 0)
-                except Exception as e:
-                    print(f"스트릭 정보 가져오기 오류: {e}")
+                    self.current_theme = 'light'
 
         except Exception as e:
             print(f"로그인 성공 처리 중 오류: {e}")
@@ -142,6 +159,116 @@ class TypingPracticeApp:
             from tkinter import messagebox
             messagebox.showerror("오류", f"UI 생성 중 오류가 발생했습니다:\n{e}")
 
+    # ========== 게스트 세션 ==========
+    def start_guest_session(self, user_info):
+        """게스트용 메모리 DB 로 전환 (실패하면 DB 없는 기존 게스트로 진행)"""
+        try:
+            self.guest = GuestSession()
+        except Exception as e:
+            print(f"게스트 세션 생성 오류: {e}")
+            return user_info
+
+        self.db = self.guest.db
+        self.async_db = AsyncDatabase(self.db, self.root)
+        return self.guest.user_info()
+
+    def end_guest_session(self):
+        """게스트 메모리 DB 를 닫고 디스크 DB 로 복귀"""
+        if self.guest is None:
+            return
+        self.async_db.close()
+        self.guest.close()
+        self.guest = None
+        self.db = self.disk_db
+        self.async_db = self.disk_async_db
+
+    def show_guest_signup_dialog(self):
+        """게스트 기록을 새 계정으로 저장하는 회원가입 창"""
+        from tkinter import messagebox
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("계정 만들기")
+        dialog.geometry("360x300")
+        dialog.configure(bg='white')
+        dialog.transient(self.root)
+        dialog.grab_set()
+
+        tk.Label(dialog, text="지금까지의 게스트 기록을 새 계정에 저장합니다",
+                 font=('맑은 고딕', 10), bg='white').pack(pady=(15, 10))
+
+        entries = {}
+        for key, label, show in [('username', "사용자명", ''), ('password', "비밀번호", '*'),
+                                 ('confirm', "비밀번호 확인", '*')]:
+            tk.Label(dialog, text=label, font=('맑은 고딕', 10), bg='white').pack(anchor=tk.W, padx=30)
+            entry = tk.Entry(dialog, font=('맑은 고딕', 11), show=show)
+            entry.pack(fill=tk.X, padx=30, pady=(0, 8))
+            entries[key] = entry
+        entries['username'].focus()
+
+        def submit():
+            username = entries['username'].get().strip()
+            password = entries['password'].get()
+
+            if len(username) < 3:
+                messagebox.showwarning("입력 오류", "사용자명은 최소 3자 이상이어야 합니다.", parent=dialog)
+                return
+            if len(password) < 4:
+                messagebox.showwarning("입력 오류", "비밀번호는 최소 4자 이상이어야 합니다.", parent=dialog)
+                return
+            if password != entries['confirm'].get():
+                messagebox.showwarning("입력 오류", "비밀번호가 일치하지 않습니다.", parent=dialog)
+                return
+
+            self.flush_settings()
+            success, result = self.guest.promote(self.disk_db, username, password)
+            if not success:
+                messagebox.showerror("계정 만들기 실패", result, parent=dialog)
+                return
+
+            dialog.destroy()
+            self.end_guest_session()
+            self.settings = None
+            user_info = self.disk_db.get_user_info(result)
+            messagebox.showinfo("계정 만들기 성공", f"'{username}' 계정에 게스트 기록을 저장했습니다!")
+            self.on_login_success(user_info)
+
+        tk.Button(dialog, text="계정 만들기", command=submit, bg='#27AE60', fg='white',
+                  font=('맑은 고딕', 11, 'bold'), cursor='hand2').pack(fill=tk.X, padx=30, pady=10)
+        dialog.bind('<Return>', lambda e: submit())
+
+    def process_login(self, user_id):
+        """로그인 스트릭 갱신과 업적 체크 (작업 스레드에서 호출됨)"""
+        unlocked = self.db.update_login_streak(user_id)
+        unlocked += self.db.check_achievements(user_id)
+        user_full_info = self.db.get_user_info(user_id)
+        login_streak = user_full_info.get('login_streak', 0) if user_full_info else 0
+        return user_id, login_streak, unlocked
+
+    def on_login_processed(self, result):
+        """로그인 처리 결과 반영 (Tk 스레드)"""
+        user_id, login_streak, unlocked = result
+        if user_id != self.user_id:
+            return  # 그 사이 로그아웃됨
+
+        self.login_streak = login_streak
+        self.update_score_label()
+
+        if unlocked:
+            self.sound_manager.play_achievement_sound()
+            from tkinter import messagebox
+            messagebox.showinfo("업적 달성!", f"새로운 업적을 달성했습니다:\n" + "\n".join(unlocked))
+
+    def update_score_label(self):
+        """헤더의 점수/스트릭 표시 갱신"""
+        label = getattr(self, 'user_score_label', None)
+        if not label or not label.winfo_exists():
+            return
+
+        if self.login_streak > 0:
+            label.config(text=f"{self.user_score} | 🔥 {self.login_streak}일 연속", font=('맑은 고딕', 11, 'bold'))
+        else:
+            label.config(text=f"{self.user_score}", font=('맑은 고딕', 14, 'bold'))
+
     def create_ui(self):
         """UI 구성"""
         # 기존 위젯 모두 제거
@@ -353,6 +480,9 @@ class TypingPracticeApp:
 
     def show_start_menu(self):
         """시작 메뉴 화면"""
+        # 진행 중이던 연습의 키 통계 반영
+        self.flush_key_stats()
+
         # 기존 위젯 제거
         for widget in self.main_container.winfo_children():
             widget.destroy()
@@ -390,9 +520,10 @@ class TypingPracticeApp:
             user_score_label = tk.Label(user_info_frame, text=f"{self.user_score}", font=('맑은 고딕', 14, 'bold'), bg='white', fg='#E67E22', cursor='hand2')
         user_score_label.pack(anchor=tk.W)
         user_score_label.bind('<Button-1>', lambda e: self.show_profile_dialog())
+        self.user_score_label = user_score_label
 
         # 로그아웃 버튼 (오른쪽)
-        if self.user_id is not None:  # 게스트가 아닌 경우에만 표시
+        if self.user_id is not None:  # DB 없는 게스트가 아닌 경우에만 표시
             logout_btn = tk.Button(
                 header_frame,
                 text='로그아웃',
@@ -407,6 +538,21 @@ class TypingPracticeApp:
             )
             logout_btn.pack(side=tk.RIGHT, padx=20)
 
+        if self.guest is not None:
+            signup_btn = tk.Button(
+                header_frame,
+                text='계정 만들기',
+                command=self.show_guest_signup_dialog,
+                bg='#27AE60',
+                fg='white',
+                font=('맑은 고딕', 10, 'bold'),
+                relief=tk.RAISED,
+                borderwidth=2,
+                cursor='hand2',
+                width=10
+            )
+            signup_btn.pack(side=tk.RIGHT)
+
         # 메인 타이틀 (중앙)
         tk.Label(
             header_frame,
@@ -758,7 +904,104 @@ class TypingPracticeApp:
         if self.current_mode:
             self.current_mode = None
 
-    def start_mode(self, mode_class, mode_name):
+    def flush_key_stats(self):
+        """버퍼에 누적된 키 통계 반영"""
+        try:
+            self.db.flush_key_stats()
+        except Exception as e:
+            print(f"키 통계 저장 오류: {e}")
+
+    def flush_settings(self):
+        """저장 대기 중인 설정 변경 반영"""
+        if not self.settings:
+            return
+        try:
+            self.settings.flush()
+        except Exception as e:
+            print(f"설정 저장 오류: {e}")
+
+    def dump_db_stats(self):
+        """DB 계측 통계를 JSON 파일로 저장 (계측이 켜진 경우)"""
+        if not self.db_stats_path:
+            return
+        try:
+            with open(self.db_stats_path, 'w', encoding='utf-8') as f:
+                json.dump(self.db.stats(), f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"DB 통계 저장 오류: {e}")
+
+    def run_maintenance_step(self):
+        """연습 중이 아니면 기록 정리 작업 한 조각을 작업 스레드에서 실행"""
+        if self.in_game:
+            self.root.after(self.MAINTENANCE_IDLE_MS, self.run_maintenance_step)
+            return
+
+        # 게스트 메모리 DB 가 아니라 항상 디스크 DB 를 정리
+        if self.retention_job is None:
+            self.retention_job = RetentionJob(self.disk_db)
+        self.disk_async_db.submit(
+            self.retention_job.step,
+            callback=self.on_maintenance_step,
+            errback=self.on_maintenance_error
+        )
+
+    def on_maintenance_step(self, more_work):
+        """정리 작업 조각 완료 (남은 작업이 있으면 이어서 예약)"""
+        if more_work:
+            self.root.after(self.MAINTENANCE_STEP_MS, self.run_maintenance_step)
+            return
+
+        report = self.retention_job.report
+        if report['rows_compacted'] or report['bytes_reclaimed']:
+            print(f"기록 정리: {report['rows_compacted']:,}행, {report['bytes_reclaimed']:,}바이트 반환")
+        self.retention_job = None
+        self.root.after(self.MAINTENANCE_INTERVAL_MS, self.run_maintenance_step)
+
+    def on_maintenance_error(self, error):
+        """정리 작업 실패 (다음 주기에 다시 시도)"""
+        print(f"기록 정리 오류: {error}")
+        self.retention_job = None
+        self.root.after(self.MAINTENANCE_INTERVAL_MS, self.run_maintenance_step)
+
+    def run_backup(self):
+        """마지막 백업이 BACKUP_INTERVAL_MS 보다 오래되었으면 백업 시작"""
+        if self.in_game:
+            self.root.after(self.MAINTENANCE_IDLE_MS, self.run_backup)
+            return
+
+        # 여러 PC 가 같은 DB 를 쓰면 다른 앱이 이미 백업했을 수 있음
+        age = seconds_since_last_backup(self.disk_db.db_name)
+        if age is not None and age * 1000 < self.BACKUP_INTERVAL_MS:
+            self.root.after(int(self.BACKUP_INTERVAL_MS - age * 1000), self.run_backup)
+            return
+
+        self.backup_job = BackupJob(self.disk_db)
+        self.backup_async.submit(
+            self.backup_job.run,
+            callback=self.on_backup_done,
+            errback=self.on_backup_error
+        )
+
+    def on_backup_done(self, report):
+        """백업 완료"""
+        print(f"백업 완료: {report['path']} ({report['size']:,}바이트, {report['elapsed']:.1f}초, "
+              f"가장 긴 단계 {report['max_step_ms']:.1f}ms)")
+        self.backup_job = None
+        self.root.after(self.BACKUP_INTERVAL_MS, self.run_backup)
+
+    def on_backup_error(self, error):
+        """백업 실패 (다음 정리 주기에 다시 시도)"""
+        print(f"백업 오류: {error}")
+        self.backup_job = None
+        self.root.after(self.MAINTENANCE_INTERVAL_MS, self.run_backup)
+
+    def stop_backup(self):
+        """진행 중인 백업을 중단하고 백업 작업 스레드 종료"""
+        if self.backup_job is not None:
+            self.backup_job.cancel()
+        self.backup_async.close()
+
+    def start_mode(self, mode_class, mode_name, **mode_kwargs):
         """연습/게임 모드 시작"""
         self.clear_main_container()
         self.in_game = True
@@ -797,11 +1040,11 @@ class TypingPracticeApp:
         content_frame.pack(fill=tk.BOTH, expand=True)
 
         # 모드 인스턴스 생성
-        self.current_mode = mode_class(content_frame)
+        self.current_mode = mode_class(content_frame, **mode_kwargs)
 
     # 연습 모드 시작 메서드들
     def start_position_practice(self):
-        self.start_mode(PositionPractice, '⌨️ 자리 연습')
+        self.start_mode(PositionPractice, '⌨️ 자리 연습', db=self.db, user_id=self.user_id)
 
     def start_word_practice(self):
         self.start_mode(WordPractice, '📝 낱말 연습')
@@ -841,24 +1084,39 @@ class TypingPracticeApp:
     def logout(self):
         """로그아웃"""
         from tkinter import messagebox
-        if messagebox.askyesno("로그아웃", "로그아웃 하시겠습니까?"):
-            # 메인 컨테이너 제거
-            if hasattr(self, 'main_container'):
-                self.main_container.destroy()
+        if self.guest is not None and self.guest.has_data():
+            answer = messagebox.askyesnocancel(
+                "로그아웃", "게스트 기록은 로그아웃하면 사라집니다.\n계정을 만들어 저장하시겠습니까?")
+            if answer is None:
+                return
+            if answer:
+                self.show_guest_signup_dialog()
+                return
+        elif not messagebox.askyesno("로그아웃", "로그아웃 하시겠습니까?"):
+            return
 
-            # 사용자 정보 초기화
-            self.user_id = None
-            self.user_name = "손님"
-            self.user_score = 0
-            self.login_streak = 0
+        self.flush_key_stats()
+        self.flush_settings()
+        self.settings = None
+        self.end_guest_session()
 
-            # 로그인 화면으로 이동
-            self.show_auth_screen()
+        # 메인 컨테이너 제거
+        if hasattr(self, 'main_container'):
+            self.main_container.destroy()
+
+        # 사용자 정보 초기화
+        self.user_id = None
+        self.user_name = "손님"
+        self.user_score = 0
+        self.login_streak = 0
+
+        # 로그인 화면으로 이동
+        self.show_auth_screen()
 
     # ========== 새 기능 메서드들 ==========
     def show_leaderboard(self):
         """리더보드 표시"""
-        LeaderboardWindow(self.root, self.db, self.user_id)
+        LeaderboardWindow(self.root, self.db, self.user_id, async_db=self.async_db)
 
     def show_achievements(self):
         """업적 표시"""
@@ -874,7 +1132,7 @@ class TypingPracticeApp:
             from tkinter import messagebox
             messagebox.showwarning("알림", "로그인이 필요한 기능입니다.")
             return
-        StatisticsWindow(self.root, self.db, self.user_id)
+        StatisticsWindow(self.root, self.db, self.user_id, async_db=self.async_db)
 
     def show_weakness_analysis(self):
         """약점 분석 표시"""
@@ -896,7 +1154,7 @@ class TypingPracticeApp:
             # 테마 적용 (재시작 필요)
             pass
 
-        ThemeSelectorDialog(self.root, self.db, self.user_id, apply_theme_callback)
+        ThemeSelectorDialog(self.root, self.db, self.user_id, apply_theme_callback, settings=self.settings)
 
     def show_settings(self):
         """설정 다이얼로그 표시"""
@@ -928,10 +1186,17 @@ class TypingPracticeApp:
 
         sound_var = tk.IntVar(value=1 if self.sound_manager.enabled else 0)
 
+        def save_setting(**changes):
+            # 로그아웃/게스트 전환 중에는 지연 저장 객체가 없으므로 바로 기록
+            if self.settings:
+                self.settings.set(**changes)
+            elif self.user_id:
+                self.db.update_user_settings(self.user_id, **changes)
+
         def toggle_sound():
             enabled = sound_var.get() == 1
             self.sound_manager.set_enabled(enabled)
-            self.db.update_user_settings(self.user_id, sound_enabled=enabled)
+            save_setting(sound_enabled=enabled)
             if enabled:
                 self.sound_manager.play_correct_sound()
 
@@ -963,7 +1228,7 @@ class TypingPracticeApp:
 
         def update_volume(val):
             self.sound_manager.set_volume(int(val))
-            self.db.update_user_settings(self.user_id, volume=int(val))
+            save_setting(volume=int(val))  # 지연 저장이면 드래그가 멈춘 뒤 한 번만 저장
 
         volume_scale.config(command=update_volume)
 
@@ -1116,13 +1381,19 @@ class TypingPracticeApp:
             from tkinter import messagebox
             messagebox.showwarning("알림", "로그인이 필요한 기능입니다.")
             return
-        UICustomizer(self.root, self.db, self.user_id)
+        UICustomizer(self.root, self.db, self.user_id, settings=self.settings)
 
 
 def main():
     root = tk.Tk()
     app = TypingPracticeApp(root)
     root.mainloop()
+    app.flush_settings()
+    app.end_guest_session()
+    app.stop_backup()
+    app.async_db.close()
+    app.dump_db_stats()
+    app.db.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+"""
+스키마 마이그레이션 점검 도구
+버전 관리 이전 (user_version 0) 스키마로 만든 데이터베이스에, 앱이 직접 갱신하던 누적 점수가
+기록과 어긋난 사용자와 최고 기록이 빠진 모드를 넣어 둔 뒤 최신 버전으로 올리고,
+파생 값이 원본 기록과 맞는지 (verify_derived) 와 올린 뒤 새 기록이 누적 점수에 더해지는지 확인한다.
+
+사용법:
+    python migration_check.py [--users 50] [--records 20]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+
+from database import MIGRATIONS, Database
+
+
+MODES = ['자리 연습', '낱말 연습', '짧은 글 연습']
+SEED = 11
+
+
+def create_baseline_db(path, users, records):
+    """버전 관리 이전 스키마 (마이그레이션 1 의 테이블) 와 어긋난 파생 값을 가진 데이터베이스
+
+    Returns:
+        {user_id: 기록 점수 합계}
+    """
+    rng = random.Random(SEED)
+    expected = {}
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            for step in MIGRATIONS[0][1]:
+                conn.execute(step)
+            for i in range(users):
+                # 누적 점수를 갱신하지 못한 사용자 (0) 와 일부만 반영된 사용자
+                user_id = conn.execute(
+                    'INSERT INTO users (username, password, total_score) VALUES (?, ?, ?)',
+                    (f'old{i:03d}', 'pw', 0 if i % 2 else rng.randint(0, 500))).lastrowid
+                expected[user_id] = 0
+                for day in range(records):
+                    mode_name = rng.choice(MODES)
+                    score = rng.randint(50, 300)
+                    expected[user_id] += score
+                    conn.execute('''
+                        INSERT INTO practice_records
+                        (user_id, mode_name, score, accuracy, speed, practice_time, created_at)
+                        VALUES (?, ?, ?, 95.0, 200, 60, DATETIME('2024-01-01', ? || ' days'))
+                    ''', (user_id, mode_name, score, day))
+                # 최고 기록은 첫 모드만 (그것도 낮게) 남김
+                conn.execute('''
+                    INSERT INTO high_scores (user_id, mode_name, high_score, best_accuracy, best_speed)
+                    SELECT user_id, mode_name, MIN(score), 0, 0 FROM practice_records
+                    WHERE user_id = ? GROUP BY mode_name LIMIT 1
+                ''', (user_id,))
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == 0
+    finally:
+        conn.close()
+    return expected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="스키마 마이그레이션 점검")
+    parser.add_argument('--users', type=int, default=50, help="기존 사용자 수")
+    parser.add_argument('--records', type=int, default=20, help="사용자당 기존 연습 기록 수")
+    args = parser.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'migration_check.db')
+        expected = create_baseline_db(db_path, args.users, args.records)
+
+        db = Database(db_path)
+        try:
+            version = db.get_schema_version()
+            print(f"스키마 버전 0 -> {version} (사용자 {args.users}명, 기록 {args.users * args.records:,}개)")
+            if version != MIGRATIONS[-1][0]:
+                failures.append(f"최신 버전 {MIGRATIONS[-1][0]} 까지 올리지 못했습니다")
+
+            drift = {name: item['rows'] for name, item in db.verify_derived().items() if item['rows']}
+            print(f"어긋난 파생 값: {drift or '없음'}")
+            if drift:
+                failures.append(f"마이그레이션 후에도 파생 값이 어긋납니다: {drift}")
+
+            user_id = next(iter(expected))
+            db.save_practice_record(user_id, MODES[0], 100, 95.0, 200, 60)
+            total = db.get_user_info(user_id)['total_score']
+            print(f"새 기록 100점 저장 후 누적 점수: {total:,} (기대 {expected[user_id] + 100:,})")
+            if total != expected[user_id] + 100:
+                failures.append(f"누적 점수 {total} 가 기록 합계 {expected[user_id] + 100} 와 다릅니다")
+        finally:
+            db.close()
+
+    for failure in failures:
+        print(f"[실패] {failure}")
+    if failures:
+        return 1
+    print("통과: 기존 데이터의 파생 값이 원본 기록과 일치")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,7 @@ from tkinter import ttk, scrolledtext
 import time
 import random
 from keyboard_widget import VirtualKeyboard
+from keystroke_log import KeystrokeRecorder
 
 
 class BasePractice(tk.Frame):
@@ -90,10 +91,15 @@ class PositionPractice(BasePractice):
         }
     ]
 
-    def __init__(self, parent):
+    def __init__(self, parent, db=None, user_id=None):
         self.current_stage_index = 0
         self.target_text = ""
         self.current_index = 0
+        # 키 통계 기록용 (로그인한 경우에만)
+        self.db = db
+        self.user_id = user_id
+        self.last_key_time = None
+        self.keystrokes = KeystrokeRecorder()
         super().__init__(parent)
 
     def create_widgets(self):
@@ -296,6 +302,8 @@ class PositionPractice(BasePractice):
         self.typed_chars = 0
         self.errors = 0
         self.start_time = None
+        self.last_key_time = None
+        self.keystrokes.reset()
 
         self.update_target_display()
         self.input_entry.delete(0, tk.END)
@@ -337,6 +345,8 @@ class PositionPractice(BasePractice):
             return
 
         expected_char = self.target_text[self.current_index]
+        self.record_key_stat(expected_char, event.char == expected_char)
+        self.keystrokes.record(expected_char, event.char)
 
         # 입력된 글자와 비교
         if event.char == expected_char:
@@ -356,6 +366,22 @@ class PositionPractice(BasePractice):
         # 입력 필드는 항상 비워둠 (한 글자씩 입력)
         self.after(50, lambda: self.input_entry.delete(0, tk.END))
 
+    def record_key_stat(self, expected_char, is_correct):
+        """키/손가락 통계 누적 (DB 버퍼에 기록)"""
+        now = time.time()
+        press_time = now - self.last_key_time if self.last_key_time else 0
+        self.last_key_time = now
+
+        if not self.db or not self.user_id:
+            return
+
+        key = 'Space' if expected_char == ' ' else expected_char
+        self.db.record_key_stat(self.user_id, key, is_correct, press_time)
+
+        finger = VirtualKeyboard.KEY_FINGER_MAP.get(key)
+        if finger:
+            self.db.record_finger_stat(self.user_id, finger, is_correct, press_time)
+
     def update_stats(self):
         """통계 업데이트"""
         cpm, accuracy, elapsed = self.calculate_stats()
@@ -367,6 +393,12 @@ class PositionPractice(BasePractice):
         result_text = f"\n완료!\n타수: {cpm} CPM | 정확도: {accuracy}% | 시간: {elapsed}초"
         self.target_label.config(text=result_text, fg='green')
 
+        # 세션 종료 시 누적된 키 통계와 키 입력 로그 반영
+        if self.db:
+            self.db.flush_key_stats()
+            if self.user_id and self.keystrokes:
+                self.db.save_session_keystrokes(self.user_id, '자리 연습', self.keystrokes.events)
+
 
 class WordPractice(BasePractice):
     """낱말 연습"""
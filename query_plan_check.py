@@ -0,0 +1,203 @@
+"""
+쿼리 실행 계획 점검 도구
+Database의 모든 공개 메서드를 실행하며 SQL을 수집하고,
+EXPLAIN QUERY PLAN 결과에 큰 테이블의 전체 스캔이 있으면 실패로 보고한다.
+
+사용법:
+    python query_plan_check.py
+"""
+import os
+import re
+import sys
+import inspect
+import tempfile
+
+from database import Database
+
+
+# 행 수가 사용자 수나 연습 횟수에 비례해 커지는 테이블
+LARGE_TABLES = {
+    'users', 'practice_records', 'high_scores', 'achievements', 'daily_goals',
+    'key_statistics', 'custom_word_lists', 'user_settings', 'user_levels',
+    'friendships', 'clan_members', 'season_pass', 'finger_statistics',
+    'daily_user_stats', 'custom_words', 'session_keystrokes', 'practice_passages',
+}
+
+# SQL을 실행하지 않거나 연결/스키마를 다루는 메서드
+SKIPPED_METHODS = {
+    'get_connection', 'transaction', 'close', 'init_database', 'migrate',
+    'get_schema_version', 'call_on_commit', 'hash_password',
+    'record_key_stat', 'record_finger_stat',
+    'enable_instrumentation', 'disable_instrumentation', 'stats', 'use_direct_access',
+}
+
+# 전체 테이블을 한 번에 다시 계산하는 관리 작업 (스캔이 의도된 동작)
+MAINTENANCE_METHODS = {
+    'rebuild_daily_stats', 'rebuild_derived', 'verify_derived',
+}
+
+# 실행 계획 점검 대상이 아닌 문장 ('--' 는 FTS5 가 색인 테이블에 내부적으로 실행하는 문장)
+IGNORED_PREFIXES = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'PRAGMA', 'CREATE', '--')
+
+
+def build_calls(db, user_id, friend_id, clan_id):
+    """메서드 이름 -> 샘플 인자로 호출하는 함수"""
+    return {
+        'create_user': lambda: db.create_user('plan_check', 'pw'),
+        'verify_user': lambda: db.verify_user('alice', 'pw'),
+        'update_last_login': lambda: db.update_last_login(user_id),
+        'get_user_info': lambda: db.get_user_info(user_id),
+        'update_user_score': lambda: db.update_user_score(user_id, 10),
+        'save_practice_record': lambda: db.save_practice_record(user_id, '낱말연습', 100, 95.0, 300, 60),
+        'finalize_session': lambda: db.finalize_session(user_id, {
+            'mode_name': '낱말연습', 'score': 120, 'accuracy': 97.0, 'speed': 320, 'practice_time': 5}),
+        'get_user_records': lambda: db.get_user_records(user_id, limit=10),
+        'get_high_scores': lambda: db.get_high_scores(user_id),
+        'get_leaderboard': lambda: (db.get_leaderboard('낱말연습', 10), db.get_leaderboard(None, 10)),
+        'get_leaderboard_page': lambda: (db.get_leaderboard_page('낱말연습', 100, 10, user_id),
+                                         db.get_leaderboard_page(None, 100, 10)),
+        'get_user_rank': lambda: (db.get_user_rank(user_id, '낱말연습'), db.get_user_rank(user_id)),
+        'unlock_achievement': lambda: db.unlock_achievement(user_id, '점검', '실행 계획 점검'),
+        'get_achievements': lambda: db.get_achievements(user_id),
+        'check_achievements': lambda: db.check_achievements(user_id),
+        'get_achievement_progress': lambda: db.get_achievement_progress(user_id),
+        'get_daily_goal': lambda: db.get_daily_goal(user_id),
+        'update_daily_goal': lambda: db.update_daily_goal(user_id, 5, 50),
+        'set_daily_goal_targets': lambda: db.set_daily_goal_targets(user_id, 30, 100),
+        'update_key_stat': lambda: db.update_key_stat(user_id, 'ㄱ', True, 0.2),
+        'flush_key_stats': lambda: (db.record_key_stat(user_id, 'ㄴ', True, 0.2),
+                                    db.record_finger_stat(user_id, 'left_ring', True, 0.2),
+                                    db.flush_key_stats()),
+        'apply_key_stats': lambda: db.apply_key_stats(
+            [(user_id, 'ㄷ', 1, 1, 0, 0.2, None)], [(user_id, 'left_middle', 1, 1, 0.2)]),
+        'get_key_statistics': lambda: db.get_key_statistics(user_id, limit=10),
+        'get_weak_keys': lambda: db.get_weak_keys(user_id),
+        'get_key_latency': lambda: db.get_key_latency(user_id),
+        'get_slow_keys': lambda: db.get_slow_keys(user_id),
+        'save_session_keystrokes': lambda: db.save_session_keystrokes(
+            user_id, '자리 연습', [('ㄱ', 'ㄱ', 0), ('ㄴ', 'ㄷ', 180)]),
+        'get_keystroke_sessions': lambda: db.get_keystroke_sessions(user_id),
+        'iter_session_keystrokes': lambda: list(db.iter_session_keystrokes(1)),
+        'update_login_streak': lambda: db.update_login_streak(user_id),
+        'create_custom_word_list': lambda: db.create_custom_word_list(user_id, '점검', ['가', '나']),
+        'get_custom_word_lists': lambda: db.get_custom_word_lists(user_id),
+        'import_custom_words': lambda: db.import_custom_words(user_id, '가져오기', ['다', '라', '마']),
+        'get_custom_words': lambda: db.get_custom_words(1, offset=1, limit=10),
+        'sample_custom_words': lambda: db.sample_custom_words(1, 2),
+        'delete_custom_word_list': lambda: db.delete_custom_word_list(1),
+        'search_custom_words': lambda: db.search_custom_words(user_id, '가'),
+        'import_practice_passages': lambda: db.import_practice_passages(None, [('점검', '학교에 갑니다.')]),
+        'get_practice_passage': lambda: db.get_practice_passage(1),
+        'search_practice_passages': lambda: (db.search_practice_passages('학교', user_id),
+                                             db.search_practice_passages('학교에 갑니다', phrase=True)),
+        'delete_practice_passage': lambda: db.delete_practice_passage(1),
+        'update_theme': lambda: db.update_theme(user_id, 'dark'),
+        'get_user_theme': lambda: db.get_user_theme(user_id),
+        'get_user_settings': lambda: db.get_user_settings(user_id),
+        'update_user_settings': lambda: db.update_user_settings(user_id, volume=60),
+        'save_user_settings': lambda: db.save_user_settings(user_id, theme='light', font_size=14),
+        'get_practice_history': lambda: db.get_practice_history(user_id, days=7),
+        'get_practice_summary': lambda: db.get_practice_summary(user_id, days=7),
+        'get_mode_distribution': lambda: db.get_mode_distribution(user_id),
+        'get_user_level': lambda: db.get_user_level(user_id),
+        'add_exp': lambda: db.add_exp(user_id, 50),
+        'get_level_leaderboard': lambda: db.get_level_leaderboard(10),
+        'send_friend_request': lambda: db.send_friend_request(user_id, 'bob'),
+        'accept_friend_request': lambda: db.accept_friend_request(friend_id, user_id),
+        'get_friends': lambda: db.get_friends(user_id),
+        'get_friend_requests': lambda: db.get_friend_requests(friend_id),
+        'create_clan': lambda: db.create_clan('점검 클랜', '', friend_id),
+        'join_clan': lambda: db.join_clan(clan_id, user_id),
+        'get_user_clan': lambda: db.get_user_clan(user_id),
+        'get_clan_members': lambda: db.get_clan_members(clan_id),
+        'get_season_pass': lambda: db.get_season_pass(user_id),
+        'add_season_exp': lambda: db.add_season_exp(user_id, 10),
+        'update_finger_stat': lambda: db.update_finger_stat(user_id, 'left_index', True, 0.2),
+        'get_finger_statistics': lambda: db.get_finger_statistics(user_id),
+    }
+
+
+def table_aliases(sql):
+    """SQL의 FROM/JOIN 절에서 별칭 -> 테이블 이름 매핑 추출"""
+    aliases = {}
+    for table, alias in re.findall(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', sql, re.I):
+        aliases[table] = table
+        if alias and alias.upper() not in ('WHERE', 'SET', 'JOIN', 'ON', 'ORDER', 'GROUP',
+                                           'LIMIT', 'VALUES', 'SELECT', 'LEFT', 'INNER'):
+            aliases[alias] = table
+    return aliases
+
+
+def find_full_scans(conn, statements, large_tables=LARGE_TABLES):
+    """큰 테이블을 인덱스 없이 전체 스캔하는 문장 목록 반환"""
+    problems = []
+    for sql in statements:
+        aliases = table_aliases(sql)
+        for row in conn.execute('EXPLAIN QUERY PLAN ' + sql):
+            detail = row[3]
+            match = re.match(r'SCAN (\w+)', detail)
+            if not match or 'USING' in detail:
+                continue
+            table = aliases.get(match.group(1), match.group(1))
+            if table in large_tables:
+                problems.append((sql, detail))
+    return problems
+
+
+def collect_statements(db):
+    """모든 공개 메서드를 실행하며 수행된 SQL 수집"""
+    _, user_id = db.create_user('alice', 'pw')
+    _, friend_id = db.create_user('bob', 'pw')
+    _, clan_id = db.create_clan('클랜', '', user_id)
+    calls = build_calls(db, user_id, friend_id, clan_id)
+
+    public_methods = {
+        name for name, _ in inspect.getmembers(Database, callable)
+        if not name.startswith('_')
+    }
+    missing = sorted(public_methods - SKIPPED_METHODS - MAINTENANCE_METHODS - set(calls))
+    if missing:
+        raise RuntimeError(f"점검 호출이 정의되지 않은 메서드: {', '.join(missing)}")
+
+    statements = []
+    conn = db.get_connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        for name in sorted(calls):
+            calls[name]()
+    finally:
+        conn.set_trace_callback(None)
+
+    seen = set()
+    result = []
+    for sql in statements:
+        sql = ' '.join(sql.split())
+        if sql.upper().startswith(IGNORED_PREFIXES) or sql in seen:
+            continue
+        seen.add(sql)
+        result.append(sql)
+    return result
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, 'plan_check.db'))
+        try:
+            statements = collect_statements(db)
+            problems = find_full_scans(db.get_connection(), statements)
+        finally:
+            db.close()
+
+    print(f"점검한 쿼리: {len(statements)}개")
+    for sql, detail in problems:
+        print(f"[전체 스캔] {detail}\n    {sql}")
+
+    if problems:
+        print(f"실패: 전체 스캔 {len(problems)}건")
+        return 1
+    print("통과: 큰 테이블 전체 스캔 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+연습 기록 보존/정리 모듈
+보존 기간이 지난 practice_records 원본 행을 삭제하고 빈 페이지를 돌려준다.
+일별 집계(daily_user_stats), 최고 기록, 사용자 누적 값은 기록 저장 시점에 이미
+갱신되어 있으므로 원본을 지워도 통계는 그대로 유지된다.
+
+작업은 step() 단위로 잘게 나뉘어 있어 앱의 유휴 타이머에서 조금씩 실행할 수 있다.
+"""
+import os
+from datetime import date, timedelta
+
+from database import UNCOVERED_DAILY_STATS_SQL
+
+
+DEFAULT_RETENTION_DAYS = 365
+DEFAULT_BATCH_SIZE = 2000     # 한 트랜잭션에서 삭제할 최대 행 수
+DEFAULT_VACUUM_PAGES = 256    # incremental_vacuum 한 번에 돌려줄 최대 페이지 수
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def enable_incremental_vacuum(db):
+    """auto_vacuum 을 INCREMENTAL 로 전환 (기존 파일은 VACUUM 한 번 필요, 전환했으면 True)
+
+    VACUUM 은 파일 전체를 다시 쓰므로 명령행 도구에서만 호출한다.
+    """
+    conn = db.get_connection()
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+        return False
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM')
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+    return True
+
+
+class RetentionJob:
+    """오래된 연습 기록 정리 작업
+
+    1. 기준일 이전에 일별 집계가 빠진 날이 있으면 기준일을 그중 가장 이른 날로 낮추고,
+       정리 기준일을 maintenance_state 에 기록 (rebuild_daily_stats 가 이 날짜
+       이전 집계를 지우지 않도록)
+    2. 사용자별로 기준일 이전 기록을 batch_size 행씩 삭제
+    3. auto_vacuum 이 INCREMENTAL 이면 빈 페이지를 vacuum_pages 씩 반환
+
+    집계가 빠진 날의 원본은 지우지 않으므로 backfill-daily-stats 로 채운 뒤 다시 정리할 수 있다.
+
+    step() 한 번은 위 작업 중 한 조각만 실행한다.
+    """
+
+    def __init__(self, db, retention_days=DEFAULT_RETENTION_DAYS,
+                 batch_size=DEFAULT_BATCH_SIZE, vacuum_pages=DEFAULT_VACUUM_PAGES):
+        self.db = db
+        self.cutoff = (date.today() - timedelta(days=retention_days)).isoformat()
+        self.batch_size = batch_size
+        self.vacuum_pages = vacuum_pages
+
+        self.phase = 'start'
+        self._user_ids = []
+        self.report = {
+            'cutoff': self.cutoff,
+            'uncovered_from': None,   # 일별 집계가 빠진 가장 이른 날 (기준일을 이 날로 낮춤)
+            'rows_compacted': 0,
+            'pages_reclaimed': 0,
+            'bytes_reclaimed': 0,
+            'file_size_before': self._file_size(),
+            'file_size_after': None,
+            'vacuum_enabled': None
+        }
+
+    def run(self):
+        """끝날 때까지 실행 (결과 보고 반환)"""
+        while self.step():
+            pass
+        return self.report
+
+    def step(self):
+        """작업 한 조각 실행 (남은 작업이 있으면 True)"""
+        if self.phase == 'start':
+            self._start()
+        elif self.phase == 'compact':
+            self._compact_batch()
+        elif self.phase == 'vacuum':
+            self._vacuum_chunk()
+        return self.phase != 'done'
+
+    def _start(self):
+        """정리 기준일 결정 및 기록, 정리할 사용자 목록 조회"""
+        with self.db.transaction(immediate=True) as cursor:
+            cursor.execute(f'SELECT MIN(stat_date) FROM ({UNCOVERED_DAILY_STATS_SQL})', (self.cutoff,))
+            uncovered_from = cursor.fetchone()[0]
+            if uncovered_from is not None:
+                self.report['uncovered_from'] = uncovered_from
+                self.cutoff = self.report['cutoff'] = uncovered_from
+
+            cursor.execute('''
+                INSERT INTO maintenance_state (key, value) VALUES ('compacted_before', ?)
+                ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)
+            ''', (self.cutoff,))
+            cursor.execute('SELECT user_id FROM users ORDER BY user_id DESC')
+            self._user_ids = [row['user_id'] for row in cursor.fetchall()]
+        self.phase = 'compact'
+
+    def _compact_batch(self):
+        """현재 사용자의 오래된 기록을 최대 batch_size 행 삭제"""
+        if not self._user_ids:
+            self.phase = 'vacuum'
+            return
+
+        user_id = self._user_ids[-1]
+        with self.db.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                DELETE FROM practice_records
+                WHERE record_id IN (
+                    SELECT record_id FROM practice_records
+                    WHERE user_id = ? AND created_at < ?
+                    ORDER BY created_at
+                    LIMIT ?
+                )
+                RETURNING record_id
+            ''', (user_id, self.cutoff, self.batch_size))
+            record_ids = [row[0] for row in cursor.fetchall()]
+
+            # 키 입력 로그는 남기고 삭제된 기록과의 연결만 끊음
+            if record_ids:
+                placeholders = ','.join('?' * len(record_ids))
+                cursor.execute(f'''
+                    UPDATE session_keystrokes SET record_id = NULL
+                    WHERE user_id = ? AND record_id IN ({placeholders})
+                ''', (user_id, *record_ids))
+
+        self.report['rows_compacted'] += len(record_ids)
+        if len(record_ids) < self.batch_size:
+            self._user_ids.pop()
+
+    def _vacuum_chunk(self):
+        """빈 페이지를 최대 vacuum_pages 개 파일에서 반환"""
+        conn = self.db.get_connection()
+        if self.report['vacuum_enabled'] is None:
+            self.report['vacuum_enabled'] = (
+                conn.execute('PRAGMA auto_vacuum').fetchone()[0] == AUTO_VACUUM_INCREMENTAL)
+
+        free_before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if self.report['vacuum_enabled'] and free_before:
+            # execute() 는 이 PRAGMA 를 한 단계(한 페이지)만 실행하므로 executescript 사용
+            conn.executescript(f'PRAGMA incremental_vacuum({int(self.vacuum_pages)});')
+            free_after = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+            self.report['pages_reclaimed'] += free_before - free_after
+            self.report['bytes_reclaimed'] += (free_before - free_after) * page_size
+            if free_after:
+                return
+
+        # WAL 에 남은 변경을 본 파일에 반영해야 파일 크기가 줄어듦
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+        self.report['file_size_after'] = self._file_size()
+        self.phase = 'done'
+
+    def _file_size(self):
+        """데이터베이스 파일 크기 (메모리 DB면 0)"""
+        try:
+            return os.path.getsize(self.db.db_name)
+        except OSError:
+            return 0
@@ -0,0 +1,157 @@
+"""
+전문 검색 점검 도구
+합성 한글 지문을 대량으로 가져온 뒤 검색어 종류별 (흔한/드문 낱말, 여러 낱말, 구절, 한 글자 접두어)
+응답 시간을 측정하고, 지문/단어를 바꾸거나 지운 뒤에도 색인이 맞는지 확인한다.
+
+사용법:
+    python search_check.py [--passages 100000] [--queries 200] [--max-p99-ms 50]
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+from database import Database
+
+
+SEED = 42
+VOCABULARY = 20000
+PARTICLES = ['', '', '', '은', '는', '이', '가', '을', '를', '에', '에서', '의', '와', '도', '으로']
+# 자주 쓰는 음절 (어휘 생성용)
+SYLLABLES = ('가나다라마바사아자차카타파하고노도로모보소오조호구누두루무부수우주기니디리미비시이지'
+             '학교생활문화사람시간세상생각말소리물불나무하늘바다마음사랑친구가족공부일터길집')
+
+
+def percentile(sorted_values, q):
+    """정렬된 값의 분위수 (최근접 순위)"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def make_vocabulary(rng):
+    """1~3음절 낱말 목록 (앞쪽일수록 자주 쓰임)"""
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.choice((1, 2, 2, 2, 3, 3)))))
+    return sorted(words, key=lambda word: rng.random())
+
+
+def passage_rows(rng, vocabulary, count):
+    """지프 분포로 낱말을 고르고 조사를 붙인 합성 지문 (제목, 본문)"""
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    for i in range(count):
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(15, 80))
+        sentence = ' '.join(word + rng.choice(PARTICLES) for word in words)
+        yield f'{words[0]} {words[-1]} {i}', sentence + '.'
+
+
+def query_mix(rng, vocabulary, db, passages):
+    """검색어 종류별 목록: (종류, 검색어, 인자)"""
+    sample_ids = [rng.randint(1, passages) for _ in range(50)]
+    phrases = []
+    for passage_id in sample_ids:
+        words = db.get_practice_passage(passage_id)['content'].split()
+        start = rng.randrange(len(words) - 2)
+        phrases.append(' '.join(words[start:start + 2]))
+    return [
+        ('흔한 낱말', lambda: rng.choice(vocabulary[:20]), {}),
+        ('보통 낱말', lambda: rng.choice(vocabulary[100:2000]), {}),
+        ('드문 낱말', lambda: rng.choice(vocabulary[10000:]), {'prefix': False}),
+        ('낱말 두 개', lambda: ' '.join(rng.sample(vocabulary[:500], 2)), {}),
+        ('구절', lambda: rng.choice(phrases), {'phrase': True}),
+        ('한 글자 접두어', lambda: rng.choice(SYLLABLES), {}),
+    ]
+
+
+def check_sync(db, user_id):
+    """지문/단어를 바꾸거나 지운 뒤 검색 결과가 따라오는지 확인 (문제 목록 반환)"""
+    problems = []
+    marker = '점검용고유낱말'
+    db.import_practice_passages(user_id, [('동기화', f'{marker}이 들어간 지문')])
+    found = db.search_practice_passages(marker)
+    if len(found) != 1:
+        problems.append(f"가져온 지문을 찾지 못함: {found}")
+    else:
+        passage_id = found[0]['passage_id']
+        with db.transaction(immediate=True) as cursor:
+            cursor.execute("UPDATE practice_passages SET content = '바뀐 지문' WHERE passage_id = ?",
+                           (passage_id,))
+        if db.search_practice_passages(marker) or not db.search_practice_passages('바뀐 지문', phrase=True):
+            problems.append("수정한 지문이 색인에 반영되지 않음")
+        db.delete_practice_passage(passage_id)
+        if db.search_practice_passages('바뀐 지문', phrase=True):
+            problems.append("삭제한 지문이 검색됨")
+
+    list_id = db.create_custom_word_list(user_id, '점검', [marker, '사과'])
+    if [row['list_id'] for row in db.search_custom_words(user_id, marker)] != [list_id]:
+        problems.append("단어 리스트 검색 실패")
+    db.delete_custom_word_list(list_id)
+    if db.search_custom_words(user_id, marker):
+        problems.append("삭제한 단어 리스트가 검색됨")
+
+    conn = db.get_connection()
+    for table in ('practice_passages_fts', 'custom_words_fts'):
+        try:
+            conn.execute(f"INSERT INTO {table} ({table}, rank) VALUES ('integrity-check', 1)")
+        except Exception as e:
+            problems.append(f"{table} 무결성 검사 실패: {e}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="전문 검색 점검")
+    parser.add_argument('--passages', type=int, default=100000, help="가져올 합성 지문 수")
+    parser.add_argument('--queries', type=int, default=200, help="검색어 종류별 측정 횟수")
+    parser.add_argument('--max-p99-ms', type=float, default=50, help="허용하는 검색 p99 (ms, 한 글자 접두어 제외)")
+    args = parser.parse_args(argv)
+    rng = random.Random(SEED)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, 'search_check.db'))
+        try:
+            _, user_id = db.create_user('search', 'pw')
+            vocabulary = make_vocabulary(rng)
+
+            start = time.perf_counter()
+            totals = db.import_practice_passages(None, passage_rows(rng, vocabulary, args.passages))
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(db.db_name)
+            print(f"지문 {totals['passage_count']:,}개 / {totals['total_chars']:,}자 가져오기: "
+                  f"{elapsed:.1f}초 ({totals['passage_count'] / elapsed:,.0f}개/초), DB {size / 1e6:.1f}MB")
+
+            failures = []
+            print(f"{'검색어 종류':<12}{'p50':>9}{'p99':>9}{'최대':>9}{'평균 결과':>10}")
+            for name, make_query, kwargs in query_mix(rng, vocabulary, db, totals['passage_count']):
+                samples = []
+                results = 0
+                for _ in range(args.queries):
+                    query = make_query()
+                    start = time.perf_counter()
+                    results += len(db.search_practice_passages(query, user_id=user_id, **kwargs))
+                    samples.append((time.perf_counter() - start) * 1000)
+                samples.sort()
+                p99 = percentile(samples, 0.99)
+                print(f"{name:<12}{percentile(samples, 0.5):>8.2f}ms{p99:>7.2f}ms{samples[-1]:>7.2f}ms"
+                      f"{results / args.queries:>10.1f}")
+                # 한 글자 접두어는 지문 대부분이 일치하므로 기준에서 제외 (보고만 함)
+                if name != '한 글자 접두어' and p99 > args.max_p99_ms:
+                    failures.append(f"{name} 검색 p99 {p99:.1f}ms 가 기준 {args.max_p99_ms:.0f}ms 를 넘었습니다")
+
+            failures.extend(check_sync(db, user_id))
+        finally:
+            db.close()
+
+    for failure in failures:
+        print(f"[실패] {failure}")
+    if failures:
+        return 1
+    print("통과: 검색 응답 시간 기준 이내, 색인이 원본과 일치")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
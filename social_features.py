@@ -10,6 +10,8 @@ from tkinter import ttk, messagebox, filedialog
 import csv
 from datetime import datetime, timedelta
 
+from data_export import EXPORT_TABLES, export_user_data, fetch_batches
+
 
 class FriendsWindow:
     """친구 시스템 창"""
@@ -521,16 +523,29 @@ class StatisticsExporter:
 
     @staticmethod
     def export_to_csv(db, user_id, filepath):
-        """CSV로 내보내기"""
+        """연습 기록 전체를 CSV로 내보내기 (나눠 읽으며 바로 기록)"""
         try:
-            records = db.get_user_records(user_id, limit=1000)
-
-            with open(filepath, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.DictWriter(f, fieldnames=['mode_name', 'score', 'accuracy', 'speed', 'practice_time', 'created_at'])
-                writer.writeheader()
-                writer.writerows(records)
+            sql = dict(EXPORT_TABLES)['practice_records']
+            count = 0
+
+            with open(filepath, 'w', newline='', encoding='utf-8-sig') as f, db.transaction() as cursor:
+                cursor.execute(sql, (user_id,))
+                writer = csv.writer(f)
+                writer.writerow([column[0] for column in cursor.description])
+                for rows in fetch_batches(cursor):
+                    writer.writerows(tuple(row) for row in rows)
+                    count += len(rows)
+
+            return True, f"CSV 파일로 내보내기 완료! ({count:,}개 기록)"
+        except Exception as e:
+            return False, str(e)
 
-            return True, "CSV 파일로 내보내기 완료!"
+    @staticmethod
+    def export_all(db, user_id, filepath, fmt='csv'):
+        """모든 사용자 데이터를 zip으로 내보내기 (테이블별 CSV 또는 gzip JSON Lines)"""
+        try:
+            counts = export_user_data(db, user_id, filepath, fmt)
+            return True, f"전체 데이터 내보내기 완료! ({sum(counts.values()):,}행)"
         except Exception as e:
             return False, str(e)
 
@@ -547,11 +562,12 @@ class StatisticsExporter:
             report += "지난 7일간 연습 기록이 없습니다.\n"
             return report
 
-        total_sessions = sum(h['session_count'] for h in history)
-        total_score = sum(h['total_score'] for h in history)
-        total_time = sum(h['total_time'] for h in history)
-        avg_accuracy = sum(h['avg_accuracy'] for h in history) / len(history)
-        avg_speed = sum(h['avg_speed'] for h in history) / len(history)
+        summary = db.get_practice_summary(user_id, days=7)
+        total_sessions = summary['session_count']
+        total_score = summary['total_score']
+        total_time = summary['total_time']
+        avg_accuracy = summary['avg_accuracy']
+        avg_speed = summary['avg_speed']
 
         report += f"📊 전체 통계\n"
         report += f"  - 총 연습 세션: {total_sessions}회\n"
@@ -583,11 +599,12 @@ class StatisticsExporter:
             report += "지난 30일간 연습 기록이 없습니다.\n"
             return report
 
-        total_sessions = sum(h['session_count'] for h in history)
-        total_score = sum(h['total_score'] for h in history)
-        total_time = sum(h['total_time'] for h in history)
-        avg_accuracy = sum(h['avg_accuracy'] for h in history) / len(history)
-        avg_speed = sum(h['avg_speed'] for h in history) / len(history)
+        summary = db.get_practice_summary(user_id, days=30)
+        total_sessions = summary['session_count']
+        total_score = summary['total_score']
+        total_time = summary['total_time']
+        avg_accuracy = summary['avg_accuracy']
+        avg_speed = summary['avg_speed']
 
         report += f"📊 전체 통계\n"
         report += f"  - 총 연습 세션: {total_sessions}회\n"
@@ -683,6 +700,17 @@ class ReportWindow:
             cursor='hand2'
         ).pack(side=tk.LEFT, padx=5)
 
+        tk.Button(
+            btn_frame,
+            text="전체 내보내기",
+            command=self.export_all,
+            bg='#E67E22',
+            fg='white',
+            font=('맑은 고딕', 11, 'bold'),
+            width=15,
+            cursor='hand2'
+        ).pack(side=tk.LEFT, padx=5)
+
         # 리포트 텍스트 영역
         text_frame = tk.Frame(self.window, bg='#ECF0F1')
         text_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
@@ -725,3 +753,18 @@ class ReportWindow:
                 messagebox.showinfo("성공", message)
             else:
                 messagebox.showerror("오류", f"내보내기 실패: {message}")
+
+    def export_all(self):
+        """전체 데이터 zip 내보내기"""
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".zip",
+            filetypes=[("ZIP files", "*.zip"), ("All files", "*.*")]
+        )
+
+        if filepath:
+            success, message = StatisticsExporter.export_all(self.db, self.user_id, filepath)
+
+            if success:
+                messagebox.showinfo("성공", message)
+            else:
+                messagebox.showerror("오류", f"내보내기 실패: {message}")
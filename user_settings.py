@@ -0,0 +1,106 @@
+"""
+사용자 설정 모듈
+로그인 시 설정을 한 번 읽어 메모리에 두고, 변경은 즉시 메모리에 반영한 뒤
+입력이 잠잠해지면 한 번에 DB에 기록한다 (지연 쓰기).
+"""
+
+
+class UserSettings:
+    """사용자 설정 (메모리 + 지연 쓰기)
+
+    set() 은 값을 바로 바꾸고 저장을 예약한다. 마지막 변경 뒤 delay_ms 동안
+    추가 변경이 없으면 바뀐 항목만 한 트랜잭션으로 기록한다.
+    로그아웃/종료 시에는 flush() 로 남은 변경을 바로 기록한다.
+    """
+
+    # user_settings 테이블에 저장되는 항목 (theme 은 users 테이블)
+    SETTING_FIELDS = ('sound_enabled', 'volume', 'font_size')
+    DEFAULTS = {'sound_enabled': 1, 'volume': 50, 'font_size': 12, 'theme': 'light'}
+
+    def __init__(self, db, user_id, root=None, delay_ms=500):
+        """
+        Args:
+            db: Database 인스턴스
+            user_id: 사용자 ID
+            root: 저장 예약에 사용할 Tk 위젯 (없으면 flush() 호출 시에만 기록)
+            delay_ms: 마지막 변경 후 저장까지 기다리는 시간
+        """
+        self.db = db
+        self.user_id = user_id
+        self.root = root
+        self.delay_ms = delay_ms
+
+        self.values = dict(self.DEFAULTS)
+        self._dirty = set()
+        self._after_id = None
+        self.writes = 0  # 실제 DB 기록 횟수
+
+        self.load()
+
+    def load(self):
+        """DB에서 설정 읽기 (기록되지 않은 변경은 버림)"""
+        self.cancel_pending()
+        self._dirty.clear()
+
+        settings = self.db.get_user_settings(self.user_id)
+        if settings:
+            self.values.update(settings)
+        self.values['theme'] = self.db.get_user_theme(self.user_id)
+
+    def get(self, name):
+        """설정 값 조회"""
+        return self.values.get(name, self.DEFAULTS.get(name))
+
+    def set(self, **changes):
+        """설정 변경 (메모리에 바로 반영하고 저장 예약)"""
+        for name, value in changes.items():
+            if name not in self.DEFAULTS:
+                raise KeyError(f"알 수 없는 설정 항목: {name}")
+            if self.values.get(name) != value:
+                self.values[name] = value
+                self._dirty.add(name)
+
+        if self._dirty:
+            self._schedule_flush()
+
+    def flush(self):
+        """바뀐 설정을 DB에 기록 (기록했으면 True)"""
+        self.cancel_pending()
+        if not self._dirty:
+            return False
+
+        dirty, self._dirty = self._dirty, set()
+        setting_changes = {name: self.values[name] for name in self.SETTING_FIELDS if name in dirty}
+        theme = self.values['theme'] if 'theme' in dirty else None
+
+        try:
+            # 데몬 사용 시 클라이언트 트랜잭션으로 감싸면 데몬 쓰기와 잠금을 다투므로 한 번의 호출로 저장
+            self.db.save_user_settings(self.user_id, theme=theme, **setting_changes)
+        except Exception:
+            # 실패한 항목은 다음 저장 때 다시 시도
+            self._dirty |= dirty
+            raise
+
+        self.writes += 1
+        return True
+
+    def cancel_pending(self):
+        """예약된 저장 취소"""
+        if self._after_id is not None and self.root is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = None
+
+    def _schedule_flush(self):
+        """마지막 변경 기준으로 저장 다시 예약 (디바운스)"""
+        if self.root is None:
+            return
+        self.cancel_pending()
+        self._after_id = self.root.after(self.delay_ms, self._flush_scheduled)
+
+    def _flush_scheduled(self):
+        """예약된 저장 실행 (Tk 콜백)"""
+        self._after_id = None
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"설정 저장 오류: {e}")
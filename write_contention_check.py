@@ -0,0 +1,236 @@
+"""
+다중 프로세스 쓰기 경합 점검 도구
+여러 프로세스가 같은 typing_practice.db 에 동시에 연습 종료 작업
+(키 통계 반영, finalize_session) 을 실행한 뒤,
+잃어버린 갱신이 없는지와 커밋 지연 시간 p99 가 기준 이하인지 확인한다.
+같은 계정을 두 PC에서 동시에 쓰는 경우도 재현하도록 사용자 하나를 여러 프로세스가 공유한다.
+
+--daemon 을 주면 데이터베이스 데몬 (db_daemon.py) 을 띄우고 모든 프로세스가 데몬을 거쳐 쓴다.
+
+사용법:
+    python write_contention_check.py [--processes 50] [--sessions 20] [--think-ms 200] [--max-p99-ms 500]
+                                     [--daemon]
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from database import Database
+from db_daemon import DatabaseDaemon
+
+
+KEYS = list('ㅂㅈㄷㄱㅅㅛㅕㅑㅐㅔㅁㄴㅇㄹㅎㅗㅓㅏㅣ')
+MODES = ['자리 연습', '낱말 연습', '짧은 글 연습']
+KEYS_PER_SESSION = 60
+
+
+def percentile(sorted_values, q):
+    """정렬된 값의 분위수 (최근접 순위)"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def worker(db_path, user_id, sessions, think_time, seed, barrier, results, use_daemon=False):
+    """연습 종료 작업을 sessions 번 실행하고 보낸 값 합계와 커밋 지연 시간 보고"""
+    rng = random.Random(seed)
+    db = Database(db_path, use_daemon=use_daemon)
+    if use_daemon and db.daemon is None:
+        raise RuntimeError("데이터베이스 데몬에 연결하지 못했습니다")
+    sent = {'score': 0, 'practice_time': 0, 'exp': 0, 'records': 0, 'presses': 0}
+    latencies = []
+    errors = []
+
+    db.get_connection()
+    barrier.wait()  # 모든 프로세스가 준비되면 동시에 시작
+    db.update_login_streak(user_id)
+    for _ in range(sessions):
+        time.sleep(rng.uniform(0, 2 * think_time))  # 세션 사이 연습 시간 (실제보다 훨씬 짧게)
+        events = []
+        for _ in range(KEYS_PER_SESSION):
+            key = rng.choice(KEYS)
+            correct = rng.random() > 0.05
+            db.record_key_stat(user_id, key, correct, rng.lognormvariate(-1.6, 0.3))
+            events.append((key, key if correct else rng.choice(KEYS), rng.randint(80, 400)))
+
+        score = rng.randint(50, 500)
+        practice_time = rng.randint(1, 5)
+        try:
+            start = time.perf_counter()
+            db.flush_key_stats()
+            latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            db.finalize_session(user_id, {
+                'mode_name': rng.choice(MODES),
+                'score': score,
+                'accuracy': rng.uniform(80, 100),
+                'speed': rng.randint(100, 400),
+                'practice_time': practice_time,
+                'keystrokes': events
+            })
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(repr(e))
+            continue
+
+        sent['score'] += score
+        sent['practice_time'] += practice_time
+        sent['exp'] += score // 10
+        sent['records'] += 1
+        sent['presses'] += KEYS_PER_SESSION
+
+    contention = db.contention.stats()
+    db.close()
+    results.put({'user_id': user_id, 'sent': sent, 'latencies': latencies,
+                 'errors': errors, 'contention': contention})
+
+
+def run_check(db_path, processes, users, sessions, think_time, use_daemon=False):
+    """작업 프로세스를 동시에 실행하고 결과 수집 (use_daemon 이면 데몬 통계도 반환)"""
+    db = Database(db_path)
+    user_ids = [db.create_user(f'lab{i:02d}', 'pw')[1] for i in range(users)]
+    db.close()
+
+    daemon = None
+    if use_daemon:
+        daemon = DatabaseDaemon(db_path)
+        daemon.start()
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(processes + 1)
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(target=worker, args=(db_path, user_ids[i % users], sessions, think_time, i,
+                                         barrier, results, use_daemon))
+        for i in range(processes)
+    ]
+    for process in workers:
+        process.start()
+
+    barrier.wait(timeout=120)  # 모든 프로세스가 연결을 열 때까지 대기
+    started = time.perf_counter()
+    reports = []
+    while len(reports) < len(workers):
+        try:
+            reports.append(results.get(timeout=1.0))
+        except queue.Empty:
+            if not any(process.is_alive() for process in workers):
+                break  # 결과 없이 죽은 프로세스가 있음
+    elapsed = time.perf_counter() - started
+    for process in workers:
+        process.join()
+
+    daemon_stats = None
+    if daemon is not None:
+        daemon_stats = daemon.stats()
+        daemon.shutdown()
+    return reports, elapsed, daemon_stats
+
+
+def find_lost_updates(db_path, reports):
+    """프로세스가 보낸 값 합계와 DB 에 남은 값 비교 (차이 목록 반환)"""
+    expected = {}
+    for report in reports:
+        totals = expected.setdefault(report['user_id'], dict.fromkeys(report['sent'], 0))
+        for name, value in report['sent'].items():
+            totals[name] += value
+
+    db = Database(db_path)
+    problems = []
+    try:
+        with db.transaction() as cursor:
+            for user_id, totals in expected.items():
+                cursor.execute('''
+                    SELECT u.total_score,
+                           (SELECT COUNT(*) FROM practice_records WHERE user_id = u.user_id) AS records,
+                           (SELECT COALESCE(SUM(total_presses), 0) FROM key_statistics
+                            WHERE user_id = u.user_id) AS presses,
+                           (SELECT total_exp FROM user_levels WHERE user_id = u.user_id) AS exp,
+                           (SELECT COALESCE(SUM(achieved_time), 0) FROM daily_goals
+                            WHERE user_id = u.user_id) AS practice_time,
+                           (SELECT COALESCE(SUM(session_count), 0) FROM daily_user_stats
+                            WHERE user_id = u.user_id) AS daily_sessions
+                    FROM users u WHERE u.user_id = ?
+                ''', (user_id,))
+                row = dict(cursor.fetchone())
+                checks = [
+                    ('total_score', row['total_score'], totals['score']),
+                    ('practice_records', row['records'], totals['records']),
+                    ('key_statistics', row['presses'], totals['presses']),
+                    ('user_levels.total_exp', row['exp'], totals['exp']),
+                    ('daily_goals.achieved_time', row['practice_time'], totals['practice_time']),
+                    ('daily_user_stats', row['daily_sessions'], totals['records']),
+                ]
+                for name, actual, wanted in checks:
+                    if actual != wanted:
+                        problems.append(f"사용자 {user_id} {name}: DB {actual} / 보낸 값 {wanted}")
+    finally:
+        db.close()
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="다중 프로세스 쓰기 경합 점검")
+    parser.add_argument('--processes', type=int, default=50, help="동시에 실행할 작업 프로세스 수")
+    parser.add_argument('--users', type=int, default=None, help="사용자 수 (기본: 프로세스 수의 절반)")
+    parser.add_argument('--sessions', type=int, default=20, help="프로세스당 연습 세션 수")
+    parser.add_argument('--think-ms', type=float, default=200,
+                        help="세션 사이 평균 간격 (ms, 0 이면 쉬지 않고 쓰기)")
+    parser.add_argument('--max-p99-ms', type=float, default=500, help="허용하는 커밋 지연 시간 p99 (ms)")
+    parser.add_argument('--daemon', action='store_true', help="데이터베이스 데몬을 거쳐 쓰기")
+    args = parser.parse_args(argv)
+    users = args.users or max(1, args.processes // 2)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'contention_check.db')
+        reports, elapsed, daemon_stats = run_check(db_path, args.processes, users, args.sessions,
+                                                   args.think_ms / 1000, args.daemon)
+        problems = find_lost_updates(db_path, reports)
+
+    latencies = sorted(value * 1000 for report in reports for value in report['latencies'])
+    errors = [error for report in reports for error in report['errors']]
+    contention = {}
+    for report in reports:
+        for name, value in report['contention'].items():
+            contention[name] = max(contention.get(name, 0), value) if name == 'wait_max_ms' \
+                else contention.get(name, 0) + value
+    p99 = percentile(latencies, 0.99)
+
+    print(f"프로세스 {args.processes}개, 사용자 {users}명, 세션 {args.processes * args.sessions:,}개 "
+          f"({elapsed:.2f}초, 쓰기 트랜잭션 {len(latencies) / elapsed:,.0f}건/초)")
+    print(f"커밋 지연 (ms): p50 {percentile(latencies, 0.5):.1f} / p95 {percentile(latencies, 0.95):.1f} / "
+          f"p99 {p99:.1f} / 최대 {latencies[-1] if latencies else 0:.1f}")
+    print(f"잠금 대기: {contention['waits']:,}회 (합계 {contention['wait_total_ms']:,.0f}ms, "
+          f"최대 {contention['wait_max_ms']:.1f}ms), 재시도 {contention['retries']}회, "
+          f"실패 {contention['failures']}회")
+    if daemon_stats is not None:
+        print(f"데몬: 쓰기 {daemon_stats['writes']:,}건을 커밋 {daemon_stats['commits']:,}번에 반영 "
+              f"(커밋당 평균 {daemon_stats['writes_per_commit']}건, 최대 {daemon_stats['max_batch']}건)")
+
+    failures = []
+    if len(reports) < args.processes:
+        failures.append(f"작업 프로세스 {args.processes - len(reports)}개가 결과 없이 종료되었습니다")
+    if errors:
+        failures.append(f"쓰기 오류 {len(errors)}건 (예: {errors[0]})")
+    failures.extend(problems)
+    if p99 > args.max_p99_ms:
+        failures.append(f"커밋 지연 p99 {p99:.1f}ms 가 기준 {args.max_p99_ms:.0f}ms 를 넘었습니다")
+
+    for failure in failures:
+        print(f"[실패] {failure}")
+    if failures:
+        return 1
+    print("통과: 잃어버린 갱신 없음, 커밋 지연 기준 이내")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())